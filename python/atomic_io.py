@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Crash-Safe File Writes
+
+Writes go to a temporary file in the target directory, are flushed to disk and then
+renamed over the target, so a killed process leaves either the old or the new file,
+never a truncated one.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+# mkstemp creates owner-only files, new files get the mode open() would have given them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_open(filename, mode="w"):
+    """Open a temporary file that atomically replaces filename when the block completes, for streamed writes."""
+    directory = os.path.dirname(filename) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        file_mode = os.stat(filename).st_mode & 0o777
+    except FileNotFoundError:
+        file_mode = 0o666 & ~_UMASK
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else "utf-8") as f:
+            os.fchmod(f.fileno(), file_mode)
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def atomic_write_bytes(filename, payload):
+    """Atomically replace filename with payload."""
+    with atomic_open(filename, "wb") as f:
+        f.write(payload)
+
+
+def atomic_write_text(filename, text):
+    """Atomically replace filename with text."""
+    atomic_write_bytes(filename, text.encode("utf-8"))
+
+
+def encode_json(data):
+    """Encode data as compact UTF-8 JSON, so it can be serialized away from the thread that writes it."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def atomic_write_json(filename, data):
+    """Atomically replace filename with compact JSON."""
+    atomic_write_bytes(filename, encode_json(data))
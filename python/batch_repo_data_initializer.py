@@ -11,13 +11,36 @@ optimized for GitHub Actions free plan constraints:
 
 import argparse
 import json
+import multiprocessing
 import os
+import signal
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
-
-from repo_data_initializer import GitHubFetcher
+from concurrent.futures import ProcessPoolExecutor
+
+from checkpoint import CheckpointJournal, checkpoint_path
+from cursor_state import METRICS, load_cursor_state, resume_cursor, save_cursor_state
+from github_client import configure_pool, get_github_tokens
+from job_planner import (
+    ACTIONS_JOB_LIMIT_MINUTES,
+    DEFAULT_DEADLINE_MARGIN,
+    DEFAULT_PAGE_SECONDS,
+    RunDeadline,
+    check_limits,
+    critical_path_pages,
+    estimate_batch_run,
+    plan_jobs,
+    print_estimate,
+    print_plan,
+    print_plan_table,
+    summarize_plan,
+)
+from pipeline import DEFAULT_AGGREGATE_WORKERS, DEFAULT_QUEUE_DEPTH, Done, StagedPipeline
+from rate_limiter import TokenPool
+from repo_data_initializer import METRIC_FETCHERS, METRIC_LABELS, GitHubFetcher, aggregate_walks
+from run_metrics import DEFAULT_REPORT_FILE, get_run_metrics, observed_request_seconds, start_run, write_run_reports
+from sharding import SHARD_STRATEGIES, parse_shard, select_shard, shard_filename, shard_label
+from sqlite_store import RepoDataStore
 
 
 def debug_print(message, debug=False):
@@ -26,8 +49,8 @@ def debug_print(message, debug=False):
         print(message)
 
 
-def filter_repositories(all_repos, output_dir, debug=False):
-    """Filter out repositories that already have data files to avoid subprocess overhead."""
+def filter_repositories(all_repos, output_dir, debug=False, incremental=False, store=None):
+    """Filter out repositories that already have data files or store entries, unless re-synced incrementally."""
     repos_to_process = []
     skipped_repos = []
 
@@ -50,7 +73,8 @@ def filter_repositories(all_repos, output_dir, debug=False):
                     continue
 
             output_filename = f"{output_dir}/{owner}_{repo}.json"
-            if os.path.exists(output_filename):
+            exists = store.has_repo(owner, repo) if store else os.path.exists(output_filename)
+            if exists and not incremental:
                 debug_print(f"[SKIP] {owner}/{repo} - File already exists", debug)
                 skipped_repos.append(
                     {"url": url, "status": "skipped", "reason": "file_exists", "owner": owner, "repo": repo}
@@ -65,20 +89,65 @@ def filter_repositories(all_repos, output_dir, debug=False):
     return repos_to_process, skipped_repos
 
 
-def process_repository(url, output_dir, token, delay=0, debug=False):
-    """Process a single repository with optional delay for rate limiting."""
+def fetch_repository(
+    url,
+    output_dir,
+    token,
+    scheduler=None,
+    debug=False,
+    incremental=False,
+    split_threshold=0,
+    journal=None,
+    store=None,
+    token_pool=None,
+    deadline=None,
+    estimated_pages=None,
+):
+    """
+    Fetch stage: walk the connections of a repository, pacing every request through the shared
+    rate-limit scheduler or token pool.
+
+    Returns the payload the aggregators merge, or a Done result for a repository that ends here.
+    """
+    owner, repo = None, None
     try:
-        if delay > 0:
-            time.sleep(delay)
-
-        # Additional rate limiting for GitHub Actions environment
-        # Add small delay between API calls within each repository
-        api_delay = 0.2
-
-        fetcher = GitHubFetcher(token, debug)
+        fetcher = GitHubFetcher(
+            token,
+            debug,
+            scheduler=scheduler,
+            split_threshold=split_threshold,
+            token_pool=token_pool,
+            deadline=deadline,
+        )
         owner, repo = fetcher.parse_url(url)
+        output_filename = f"{output_dir}/{owner}_{repo}.json"
+
+        # Repositories saved before an interruption are not fetched again
+        if journal and journal.is_repo_done(f"{owner}/{repo}"):
+            debug_print(f"[SKIP] {owner}/{repo} - Completed before the interruption", debug)
+            return Done({"url": url, "status": "skipped", "reason": "checkpoint", "owner": owner, "repo": repo})
 
-        print(f"[START] Processing {owner}/{repo}")
+        # A time-budgeted run only starts repositories that can finish before its deadline
+        if deadline and not deadline.can_finish(estimated_pages or 1):
+            print(
+                f"[DEFER] {owner}/{repo} - ~{estimated_pages or 1} pages do not fit in the "
+                f"{max(deadline.remaining(), 0):.0f}s left"
+            )
+            return Done({"url": url, "status": "deferred", "reason": "deadline", "owner": owner, "repo": repo})
+
+        # Existing files are re-synced from their saved cursors, only new edges are paged
+        existing_data = {}
+        previous_state = {}
+        if incremental and store:
+            existing_data = store.load_repo_data(owner, repo) or {}
+            if existing_data:
+                previous_state = load_cursor_state(output_dir, owner, repo)
+        elif incremental and os.path.exists(output_filename):
+            with open(output_filename, "r", encoding="utf-8") as f:
+                existing_data = json.load(f)
+            previous_state = load_cursor_state(output_dir, owner, repo)
+
+        print(f"[START] Processing {owner}/{repo}{' (incremental)' if previous_state else ''}")
 
         # Test API connection first
         test_query = """
@@ -88,6 +157,7 @@ def process_repository(url, output_dir, token, delay=0, debug=False):
             stargazerCount
             forkCount
           }
+          rateLimit { cost remaining resetAt }
         }
         """
 
@@ -95,121 +165,150 @@ def process_repository(url, output_dir, token, delay=0, debug=False):
         if not test_data or not test_data.get("repository"):
             error_msg = f"Cannot access repository {owner}/{repo}"
             print(f"[ERROR] {error_msg}")
-            return {"url": url, "status": "error", "reason": error_msg}
+            return Done({"url": url, "status": "error", "reason": error_msg})
 
         repo_info = test_data["repository"]
         debug_print(
             f"[INFO] {owner}/{repo} - Stars: {repo_info['stargazerCount']}, Forks: {repo_info['forkCount']}", debug
         )
 
-        # Fetch all data with delays between calls for GitHub Actions
+        # Walk stargazers, forks, issues and PRs concurrently under the shared rate-limit budget
         # If any fetch fails due to rate limiting or errors, don't create the file
-        stargazers = None
-        forks = None
-        issues = None
-        pull_requests = None
-
-        try:
-            debug_print(f"[FETCH] {owner}/{repo} - Fetching stargazers...", debug)
-            stargazers = fetcher.fetch_stargazers(owner, repo)
-            time.sleep(api_delay)
-        except Exception as e:
-            error_msg = f"Error fetching stargazers for {owner}/{repo}: {e}"
-            print(f"[ERROR] {error_msg}")
-            return {"url": url, "status": "error", "reason": error_msg}
-
-        try:
-            debug_print(f"[FETCH] {owner}/{repo} - Fetching forks...", debug)
-            forks = fetcher.fetch_forks(owner, repo)
-            time.sleep(api_delay)
-        except Exception as e:
-            error_msg = f"Error fetching forks for {owner}/{repo}: {e}"
-            print(f"[ERROR] {error_msg}")
-            return {"url": url, "status": "error", "reason": error_msg}
+        debug_print(f"[FETCH] {owner}/{repo} - Fetching stargazers, forks, issues and pull requests...", debug)
+        cursors = {metric: resume_cursor(previous_state, metric) for metric in METRICS}
+        walks, errors = fetcher.fetch_metrics(owner, repo, cursors, journal)
 
-        try:
-            debug_print(f"[FETCH] {owner}/{repo} - Fetching issues...", debug)
-            issues = fetcher.fetch_issues(owner, repo)
-            time.sleep(api_delay)
-        except Exception as e:
-            error_msg = f"Error fetching issues for {owner}/{repo}: {e}"
-            print(f"[ERROR] {error_msg}")
-            return {"url": url, "status": "error", "reason": error_msg}
+        # Walks stopped by the deadline resume from the checkpoint journal in the next run
+        if errors and deadline and deadline.expired():
+            print(f"[DEFER] {owner}/{repo} - Deadline reached, walk progress kept in the checkpoint journal")
+            return Done({"url": url, "status": "deferred", "reason": "deadline", "owner": owner, "repo": repo})
 
-        try:
-            debug_print(f"[FETCH] {owner}/{repo} - Fetching pull requests...", debug)
-            pull_requests = fetcher.fetch_pull_requests(owner, repo)
-        except Exception as e:
-            error_msg = f"Error fetching pull requests for {owner}/{repo}: {e}"
-            print(f"[ERROR] {error_msg}")
-            return {"url": url, "status": "error", "reason": error_msg}
+        for metric, error in errors.items():
+            print(f"[ERROR] Error fetching {METRIC_LABELS[metric]} for {owner}/{repo}: {error}")
 
-        # Verify we have valid data - prevent creating files with suspicious data
-        # Ensure all fetch operations returned valid data (not None)
-        if stargazers is None or forks is None or issues is None or pull_requests is None:
-            error_msg = f"One or more fetch operations returned None for {owner}/{repo} - data collection failed"
-            print(f"[ERROR] {error_msg}")
-            return {"url": url, "status": "error", "reason": error_msg}
+        # A re-sync still saves the metrics that succeeded, a new file needs all of them
+        if errors and not existing_data:
+            error_msg = f"Error fetching {', '.join(sorted(errors))} for {owner}/{repo}"
+            return Done({"url": url, "status": "error", "reason": error_msg})
 
         # Check if basic repository info (stars/forks) are missing, which indicates API issues
-        raw_stars_count = len(stargazers)
-        raw_forks_count = len(forks)
+        raw_stars_count = sum(walks.get("stars", {}).values())
+        raw_forks_count = sum(walks.get("forks", {}).values())
 
         # For new repositories, having zero issues/PRs is normal, but zero stars/forks is suspicious
-        if raw_stars_count == 0 and raw_forks_count == 0:
+        # A resumed walk legitimately finds no new edges
+        resumed = "stars" in previous_state or "forks" in previous_state
+        if raw_stars_count == 0 and raw_forks_count == 0 and not resumed:
             error_msg = (
                 f"Repository {owner}/{repo} has zero stars and forks - possible API error or inaccessible repository"
             )
             print(f"[WARNING] {error_msg}")
-            return {"url": url, "status": "error", "reason": error_msg}
-
-        # Group by date
-        stars_by_date = fetcher.group_by_date(stargazers, "starredAt") if stargazers else {}
-        forks_by_date = fetcher.group_by_date(forks, "createdAt") if forks else {}
-        issues_by_date = fetcher.group_by_date(issues, "createdAt") if issues else {}
-        pull_requests_by_date = fetcher.group_by_date(pull_requests, "createdAt") if pull_requests else {}
-
-        # Calculate totals from grouped data to ensure accuracy
-        total_stars = sum(stars_by_date.values()) if stars_by_date else 0
-        total_forks = sum(forks_by_date.values()) if forks_by_date else 0
-        total_issues = sum(issues_by_date.values()) if issues_by_date else 0
-        total_pull_requests = sum(pull_requests_by_date.values()) if pull_requests_by_date else 0
-
-        output_data = {
-            "total_stars": total_stars,
-            "total_forks": total_forks,
-            "total_issues": total_issues,
-            "total_pull_requests": total_pull_requests,
-            "fetched_at": datetime.now().isoformat(),
-            "stars_by_date": dict(sorted(stars_by_date.items())),
-            "forks_by_date": dict(sorted(forks_by_date.items())),
-            "issues_by_date": dict(sorted(issues_by_date.items())),
-            "pull_requests_by_date": dict(sorted(pull_requests_by_date.items())),
-        }
-
-        # Save data only if all operations succeeded
-        output_filename = f"{output_dir}/{owner}_{repo}.json"
-        try:
-            fetcher.save_data(output_data, output_filename)
-        except Exception as e:
-            error_msg = f"Failed to save data for {owner}/{repo}: {e}"
-            print(f"[ERROR] {error_msg}")
-            return {"url": url, "status": "error", "reason": error_msg}
+            return Done({"url": url, "status": "error", "reason": error_msg})
 
-        debug_print(f"[SUCCESS] {owner}/{repo} - Stars: {total_stars}, Forks: {total_forks}", debug)
         return {
             "url": url,
-            "status": "success",
-            "total_stars": total_stars,
-            "total_forks": total_forks,
-            "total_issues": total_issues,
-            "total_pull_requests": total_pull_requests,
+            "owner": owner,
+            "repo": repo,
+            "output_filename": output_filename,
+            "walk_state": fetcher.walk_state,
+            "walks": walks,
+            "errors": errors,
+            "existing_data": existing_data,
+            "previous_state": previous_state,
         }
 
     except Exception as e:
+        if deadline and deadline.expired():
+            print(f"[DEFER] {url} - Deadline reached")
+            return Done({"url": url, "status": "deferred", "reason": "deadline", "owner": owner, "repo": repo})
         error_msg = f"Error processing {url}: {e}"
         print(f"[ERROR] {error_msg}")
-        return {"url": url, "status": "error", "reason": str(e)}
+        return Done({"url": url, "status": "error", "reason": str(e)})
+
+
+def aggregate_repository(payload, encode=True, pool=None):
+    """
+    Aggregate stage: merge the walked counts into the date buckets and encode the document for the writer.
+
+    With a process pool the work runs outside this process, so aggregation of large histories does
+    not hold the GIL the fetch workers need. The walks and, for incremental runs, the existing history
+    are sent to the process once; only the encoded document, its totals and the cursor state come back.
+    """
+    # Group by date and merge resumed walks into the existing buckets, full walks replace them
+    walk_args = (
+        payload["walk_state"],
+        payload["walks"],
+        # Only the failed metric names are needed, errors may not pickle
+        sorted(payload["errors"]),
+        payload["existing_data"],
+        payload["previous_state"],
+        encode,
+    )
+    with get_run_metrics().stage("aggregation"):
+        if pool:
+            output_data, encoded, cursor_state = pool.submit(aggregate_walks, *walk_args, summarize=True).result()
+        else:
+            output_data, encoded, cursor_state = aggregate_walks(*walk_args)
+
+    # Only the document moves on, the walks and the previous data are released here
+    return {
+        "url": payload["url"],
+        "owner": payload["owner"],
+        "repo": payload["repo"],
+        "output_filename": payload["output_filename"],
+        "errors": payload["errors"],
+        "output_data": output_data,
+        "encoded": encoded,
+        "cursor_state": cursor_state,
+    }
+
+
+def write_repository(payload, output_dir, journal=None, store=None, debug=False):
+    """Writer stage: save the document, cursor state and journal progress of a repository."""
+    url, owner, repo, errors = payload["url"], payload["owner"], payload["repo"], payload["errors"]
+    output_data = payload["output_data"]
+    metrics = get_run_metrics()
+
+    # Save data only if all operations succeeded
+    try:
+        if store:
+            with metrics.stage("write"):
+                store.save_repo_data(owner, repo, output_data)
+        else:
+            GitHubFetcher.save_data(output_data, payload["output_filename"], payload["encoded"])
+        with metrics.stage("write"):
+            save_cursor_state(output_dir, owner, repo, payload["cursor_state"])
+        if journal and errors:
+            journal.drop_metrics(f"{owner}/{repo}", [metric for metric in METRICS if metric not in errors])
+        elif journal:
+            journal.mark_repo_done(f"{owner}/{repo}")
+    except Exception as e:
+        error_msg = f"Failed to save data for {owner}/{repo}: {e}"
+        print(f"[ERROR] {error_msg}")
+        return {"url": url, "status": "error", "reason": error_msg}
+
+    if errors:
+        error_msg = f"Kept previous data for failed metrics of {owner}/{repo}: {', '.join(sorted(errors))}"
+        return {"url": url, "status": "error", "reason": error_msg}
+
+    debug_print(
+        f"[SUCCESS] {owner}/{repo} - Stars: {output_data['total_stars']}, Forks: {output_data['total_forks']}", debug
+    )
+    return {
+        "url": url,
+        "status": "success",
+        "total_stars": output_data["total_stars"],
+        "total_forks": output_data["total_forks"],
+        "total_issues": output_data["total_issues"],
+        "total_pull_requests": output_data["total_pull_requests"],
+    }
+
+
+def stage_error(payload, error):
+    """Turn an exception escaping a pipeline stage into an error result."""
+    url = payload if isinstance(payload, str) else payload["url"]
+    print(f"[ERROR] Unexpected error processing {url}: {error}")
+    return {"url": url, "status": "error", "reason": str(error)}
 
 
 def main():
@@ -219,19 +318,141 @@ def main():
     parser.add_argument(
         "--workers", type=int, default=3, help="Number of concurrent workers (CPU cores) to use (default: 3)"
     )
+    parser.add_argument(
+        "--aggregate-workers",
+        type=int,
+        default=DEFAULT_AGGREGATE_WORKERS,
+        help=f"Threads merging and encoding fetched repositories for the single writer "
+        f"(default: {DEFAULT_AGGREGATE_WORKERS})",
+    )
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        default=DEFAULT_QUEUE_DEPTH,
+        help=f"Fetched repositories buffered between stages before the fetch workers wait "
+        f"(default: {DEFAULT_QUEUE_DEPTH})",
+    )
+    parser.add_argument(
+        "--aggregate-processes",
+        type=int,
+        default=0,
+        help="Merge and encode fetched repositories in this many worker processes instead of threads, "
+        "so aggregating large histories does not hold the GIL the fetch workers need (default: 0, off)",
+    )
     parser.add_argument("--debug", action="store_true", help="Enable debug output for detailed processing information")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Re-sync existing data files from saved pagination cursors instead of skipping them",
+    )
+    parser.add_argument(
+        "--split-threshold",
+        type=int,
+        default=0,
+        help="Walk connections with more edges than this from both ends or as search ranges (default: 0, off)",
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="Discard the checkpoint journal of an interrupted run and start over"
+    )
+    parser.add_argument(
+        "--store", help="Read and write repository data through this SQLite store instead of repo_data JSON files"
+    )
+    parser.add_argument(
+        "--tokens-file",
+        default="access_tokens.txt",
+        help="File with one GitHub token per line for the token pool, GITHUB_TOKENS takes precedence",
+    )
+    parser.add_argument(
+        "--report", default=DEFAULT_REPORT_FILE, help=f"JSON run report file (default: {DEFAULT_REPORT_FILE})"
+    )
+    parser.add_argument("--prometheus", help="Also write the run metrics as a Prometheus textfile")
+    parser.add_argument(
+        "--job-order",
+        choices=["longest", "config"],
+        default="longest",
+        help="Start the repositories with the most estimated pages first, or keep repositories.json order "
+        "and skip the planning query (default: longest)",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Dry run: estimate pages, GraphQL points and wall-clock time from repository totals, then exit",
+    )
+    parser.add_argument("--plan-tokens", type=int, help="Token count to plan for (default: the tokens available)")
+    parser.add_argument(
+        "--page-seconds",
+        type=float,
+        help=f"Seconds per GraphQL page to plan with (default: mean of the previous run report, "
+        f"else {DEFAULT_PAGE_SECONDS})",
+    )
+    parser.add_argument(
+        "--job-limit",
+        type=int,
+        default=ACTIONS_JOB_LIMIT_MINUTES,
+        help=f"Job time limit in minutes the plan is checked against (default: {ACTIONS_JOB_LIMIT_MINUTES})",
+    )
+    parser.add_argument(
+        "--deadline",
+        help="Stop starting repositories that cannot finish before this ISO 8601 time (UTC unless an offset is given)",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        help="Like --deadline, in minutes from the start of the run, e.g. 55 for a 60-minute job",
+    )
+    parser.add_argument(
+        "--deadline-margin",
+        type=int,
+        default=DEFAULT_DEADLINE_MARGIN,
+        help=f"Seconds before the deadline at which walks stop, left for saving and later steps "
+        f"(default: {DEFAULT_DEADLINE_MARGIN})",
+    )
+    parser.add_argument("--shard", help="Process only shard i/N of the repositories, e.g. 2/4 (1-based)")
+    parser.add_argument(
+        "--shard-strategy",
+        choices=SHARD_STRATEGIES,
+        default="hash",
+        help="Partition repositories by a stable hash or balance shards by pages estimated from existing data "
+        "files, which only helps with --incremental (default: hash)",
+    )
     args = parser.parse_args()
 
     # Validate worker count
-    if args.workers <= 0:
+    if args.workers <= 0 or args.aggregate_workers <= 0:
         print("ERROR: Number of workers must be greater than 0")
         sys.exit(1)
+    if args.aggregate_processes < 0:
+        print("ERROR: Number of aggregate processes cannot be negative")
+        sys.exit(1)
+    if args.queue_depth <= 0:
+        print("ERROR: Queue depth must be greater than 0")
+        sys.exit(1)
 
-    # Get GitHub token
-    token = GitHubFetcher.get_token()
-    if not token:
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        # Shards run side by side, each writes its own report for merge_shards.py to combine
+        if args.report == DEFAULT_REPORT_FILE:
+            args.report = shard_filename(args.report, shard)
+
+    # Page estimates fall back to the latency of the previous run until this run has walked pages
+    page_seconds = args.page_seconds or observed_request_seconds(args.report) or DEFAULT_PAGE_SECONDS
+    try:
+        deadline = RunDeadline.parse(args.deadline, args.time_budget, args.deadline_margin, page_seconds)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    # Get GitHub tokens, several tokens are pooled so their budgets add up
+    tokens = get_github_tokens(args.tokens_file)
+    if not tokens:
         print("ERROR: GitHub token required")
         sys.exit(1)
+    token = tokens[0]
 
     # Load repositories
     try:
@@ -256,9 +477,37 @@ def main():
     output_dir = "repo_data"
     os.makedirs(output_dir, exist_ok=True)
 
+    if shard:
+        all_repos = select_shard(all_repos, shard, args.shard_strategy, output_dir)
+        print(f"Shard {shard[0]}/{shard[1]} ({args.shard_strategy}): {len(all_repos)} repositories")
+
+    # Progress of an interrupted run is resumed unless a fresh start is requested
+    journal = CheckpointJournal(checkpoint_path(output_dir, f"batch-{shard_label(shard)}" if shard else "batch"))
+    if args.fresh:
+        journal.clear()
+    done_count, in_progress_count = journal.summary()
+    if done_count or in_progress_count:
+        print(f"Resuming from checkpoint: {done_count} repositories done, {in_progress_count} in progress")
+
+    # Flush walk progress when the job is cancelled so the next run resumes from it
+    def handle_termination(signum, frame):
+        print("\n[INTERRUPTED] Saving checkpoint journal before exit")
+        try:
+            journal.flush()
+        except Exception as e:
+            print(f"[ERROR] Failed to save checkpoint journal: {e}")
+        finally:
+            # Exit even when the flush fails, the fetch workers would otherwise keep running
+            os._exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, handle_termination)
+
+    # Each repository is written to the store in its own transaction as soon as it completes
+    store = RepoDataStore(args.store) if args.store else None
+
     # Pre-filter repositories to skip those that already have data files
     print("Pre-filtering repositories to skip existing files...")
-    repos_to_process, skipped_repos = filter_repositories(all_repos, output_dir, args.debug)
+    repos_to_process, skipped_repos = filter_repositories(all_repos, output_dir, args.debug, args.incremental, store)
 
     print(f"Repositories to process: {len(repos_to_process)}")
     print(f"Repositories already processed (skipped): {len(skipped_repos)}")
@@ -276,37 +525,119 @@ def main():
     # Add skipped repositories to results first
     results.extend(skipped_repos)
 
-    print(f"Starting batch processing with {max_workers} concurrent workers...")
+    metrics = start_run("batch_repo_data_initializer")
+
+    # One scheduler per token shared by all workers spends each budget without tripping rate limits
+    token_pool = TokenPool(tokens)
+    if len(token_pool) > 1:
+        print(f"Routing requests across a pool of {len(token_pool)} tokens")
+
+    # Every metric walk of every worker pages through the shared session, size its pool so none waits
+    configure_pool(max_workers * len(METRIC_FETCHERS))
+
+    # A giant repository submitted last would keep one worker busy long after the others finish
+    estimated_pages = {}
+    if args.job_order == "longest" or args.plan or deadline:
+        print("Planning jobs from repository totals...")
+        jobs = plan_jobs(repos_to_process, token, output_dir, args.incremental, store)
+        plan = summarize_plan(jobs)
+        print_plan(plan)
+        metrics.set_info("plan", plan)
+        estimated_pages = {job["url"]: critical_path_pages(job, args.split_threshold) for job in jobs}
+        if args.job_order == "longest":
+            repos_to_process = [job["url"] for job in jobs]
+
+    if args.plan:
+        estimate = estimate_batch_run(
+            jobs, max_workers, args.plan_tokens or len(token_pool), page_seconds, args.split_threshold
+        )
+        print()
+        print_plan_table(jobs)
+        print()
+        print_estimate(estimate, check_limits(estimate, args.job_limit))
+        if store:
+            store.close()
+        return
 
+    print(f"Starting batch processing with {max_workers} concurrent workers...")
+    if deadline:
+        print(f"Time budget: {deadline.remaining() / 60:.1f} minutes for new work")
     start_time = time.time()
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all jobs with longer delays to respect GitHub API rate limits
-        # GitHub GraphQL API allows 5,000 points per hour per token
-        future_to_url = {
-            executor.submit(process_repository, url, output_dir, token, i * 1.0, args.debug): url
-            for i, url in enumerate(repos_to_process)
-        }
+    total_processing = len(repos_to_process)
+    completed_processing = 0
 
-        # Collect results as they complete
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
-            try:
-                result = future.result()
-                results.append(result)
-
-                # Progress indicator (count only the processing jobs, not pre-skipped ones)
-                completed_processing = len(results) - len(skipped_repos)
-                total_processing = len(repos_to_process)
-                print(
-                    f"[PROGRESS] {completed_processing}/{total_processing} processed ({completed_processing / total_processing * 100:.1f}%)"
-                )
+    def report_progress(result):
+        # Called by the single writer thread only, so the count needs no lock
+        nonlocal completed_processing
+        completed_processing += 1
+        print(
+            f"[PROGRESS] {completed_processing}/{total_processing} processed "
+            f"({completed_processing / total_processing * 100:.1f}%)"
+        )
+        budget = token_pool.status()
+        if budget["remaining"] is not None:
+            debug_print(f"[RATE] {budget['remaining']} GraphQL points remaining", args.debug)
+
+    # Spawned rather than forked, the fetch workers are already running when the first process starts
+    aggregate_pool = None
+    if args.aggregate_processes:
+        aggregate_pool = ProcessPoolExecutor(
+            max_workers=args.aggregate_processes, mp_context=multiprocessing.get_context("spawn")
+        )
+        print(f"Aggregating in {args.aggregate_processes} worker processes")
+
+    # Fetch workers only walk the API, aggregators merge and encode, one writer saves every repository
+    pipeline = StagedPipeline(
+        lambda payload: aggregate_repository(payload, encode=not store, pool=aggregate_pool),
+        lambda payload: write_repository(payload, output_dir, journal, store, args.debug),
+        # Each aggregator thread waits on one process, keep enough of them to use every process
+        max(args.aggregate_workers, args.aggregate_processes),
+        args.queue_depth,
+        on_result=report_progress,
+        on_error=stage_error,
+    )
 
-            except Exception as e:
-                print(f"[ERROR] Unexpected error processing {url}: {e}")
-                results.append({"url": url, "status": "error", "reason": str(e)})
+    # GitHub GraphQL API allows 5,000 points per hour per token, the scheduler paces all workers against it
+    results.extend(
+        pipeline.run(
+            repos_to_process,
+            lambda url: fetch_repository(
+                url,
+                output_dir,
+                token,
+                None,
+                args.debug,
+                args.incremental,
+                args.split_threshold,
+                journal,
+                store,
+                token_pool,
+                deadline,
+                estimated_pages.get(url),
+            ),
+            max_workers,
+        )
+    )
+    if aggregate_pool:
+        aggregate_pool.shutdown()
 
     end_time = time.time()
+    if store:
+        store.close()
+
+    metrics.set_info("rate_limit", token_pool.status())
+    metrics.set_info("tokens", token_pool.usage())
+    if shard:
+        metrics.set_info("shard", {"index": shard[0], "count": shard[1], "strategy": args.shard_strategy})
+    metrics.set_info(
+        "repositories",
+        {
+            status: sum(1 for r in results if r["status"] == status)
+            for status in ("success", "skipped", "deferred", "error")
+        },
+    )
+    write_run_reports(args.report, args.prometheus)
 
     # Print summary
     print(f"\n{'=' * 60}")
@@ -317,10 +648,13 @@ def main():
 
     success_count = sum(1 for r in results if r["status"] == "success")
     skip_count = sum(1 for r in results if r["status"] == "skipped")
+    deferred_count = sum(1 for r in results if r["status"] == "deferred")
     error_count = sum(1 for r in results if r["status"] == "error")
 
     print(f"Successfully processed: {success_count}")
-    print(f"Skipped (already exists): {skip_count}")
+    print(f"Skipped (already exists or checkpointed): {skip_count}")
+    if deadline:
+        print(f"Deferred to the next run (deadline): {deferred_count}")
     print(f"Errors: {error_count}")
 
     if error_count > 0:
@@ -343,15 +677,33 @@ def main():
     print(f"Total issues collected: {total_stats['issues']:,}")
     print(f"Total pull requests collected: {total_stats['pull_requests']:,}")
 
+    print("\nTOKEN USAGE:")
+    for usage in token_pool.usage():
+        remaining = "unknown" if usage["remaining"] is None else f"{usage['remaining']:,}"
+        print(
+            f"{usage['token']}: {usage['requests']:,} requests, {usage['cost']:,} points, "
+            f"{usage['rate_limited']} rate limited, {remaining} remaining"
+        )
+
     # Performance summary for GitHub Actions
     avg_time_per_repo = (end_time - start_time) / len(all_repos) if all_repos else 0
     print(f"Average time per repository: {avg_time_per_repo:.2f} seconds")
     print(f"Estimated GitHub Actions minutes used: {(end_time - start_time) / 60:.1f} minutes")
 
+    # A completed run starts the next one from scratch, a failed or deferred one resumes from the journal
+    if error_count == 0 and deferred_count == 0:
+        journal.clear()
+    else:
+        journal.flush()
+        print(f"\nCheckpoint journal kept at {journal.path}, re-run to resume")
+
     # Exit with error code if any repositories failed
     if error_count > 0:
         print(f"\n❌ {error_count} repositories failed to process")
         sys.exit(1)
+    elif deferred_count > 0:
+        # Not a failure, a scheduled follow-up run continues where this one stopped
+        print(f"\n⏸️ Deadline reached, {deferred_count} repositories deferred to the next run")
     else:
         print("\n✅ All repositories processed successfully!")
         print("\n📊 Resource usage optimized for GitHub Actions free plan")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Batch Checkpoint Journal
+
+Records per-repository and per-metric progress of a batch run (walk cursor plus the
+per-day counts folded so far), so a restarted batch resumes every walk where it stopped
+instead of re-fetching from the first page.
+"""
+
+import json
+import os
+import threading
+import time
+
+from atomic_io import atomic_write_json
+
+CHECKPOINT_DIR = ".checkpoints"
+DEFAULT_FLUSH_INTERVAL = 30.0
+
+
+def checkpoint_path(output_dir, name="batch"):
+    """Return the journal file of a batch run writing into output_dir."""
+    return os.path.join(output_dir, CHECKPOINT_DIR, f"{name}.json")
+
+
+class CheckpointJournal:
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.repos = {}
+        self._last_snapshot = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the journal of an interrupted run, if any."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.repos = json.load(f).get("repos", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.repos = {}
+
+    def summary(self):
+        """Return (done, in_progress) repository counts."""
+        with self._lock:
+            done = sum(1 for entry in self.repos.values() if entry.get("status") == "done")
+            return done, len(self.repos) - done
+
+    def is_repo_done(self, key):
+        with self._lock:
+            return self.repos.get(key, {}).get("status") == "done"
+
+    def metric_progress(self, key, metric):
+        """Return saved {"counts", "walk_state", "done"} of a metric walk, or None."""
+        with self._lock:
+            return self.repos.get(key, {}).get("metrics", {}).get(metric)
+
+    def update_metric(self, key, metric, counts, walk_state, done=False, force=False):
+        """Snapshot a walk's progress, writing the journal at most once per flush interval per walk unless forced."""
+        now = time.monotonic()
+        with self._lock:
+            if not (done or force) and now - self._last_snapshot.get((key, metric), 0.0) < self.flush_interval:
+                return
+            self._last_snapshot[(key, metric)] = now
+
+            entry = self.repos.setdefault(key, {"status": "in_progress", "metrics": {}})
+            entry["metrics"][metric] = {
+                "counts": dict(counts),
+                "walk_state": dict(walk_state) if walk_state else None,
+                "done": done,
+            }
+            self._write()
+
+    def mark_repo_done(self, key):
+        """Mark a repository as saved and drop its walk progress."""
+        with self._lock:
+            self.repos[key] = {"status": "done"}
+            self._write()
+
+    def drop_metrics(self, key, metrics):
+        """Forget walks whose results were saved, keeping the progress of the others."""
+        with self._lock:
+            entry = self.repos.get(key)
+            if not entry or "metrics" not in entry:
+                return
+            for metric in metrics:
+                entry["metrics"].pop(metric, None)
+            self._write()
+
+    def flush(self):
+        with self._lock:
+            self._write()
+
+    def clear(self):
+        """Remove the journal once the batch has completed."""
+        with self._lock:
+            self.repos = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _write(self):
+        atomic_write_json(self.path, {"updated_at": time.time(), "repos": self.repos})
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Columnar Compact Storage for repo_data Time Series
+
+An optional binary layout for repo_data/{owner}_{repo}.json (stored as .rdc):
+- Fixed 76-byte header with the four totals and fetched_at, readable without
+  decoding any series
+- Per metric, an epoch-day base followed by zigzag varint delta-encoded day offsets
+  and zigzag varint counts
+- Remaining top-level keys and key order in a small JSON block so conversion back
+  to JSON is lossless
+
+Usage:
+    python/columnar_format.py to-columnar [--input-dir repo_data] [--output-dir repo_data]
+    python/columnar_format.py to-json [--input-dir repo_data] [--output-dir repo_data]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from datetime import date
+
+from atomic_io import atomic_write_bytes, atomic_write_json
+from cursor_state import METRICS
+
+COLUMNAR_EXTENSION = ".rdc"
+MAGIC = b"RDC1"
+VERSION = 1
+TOTAL_KEYS = tuple(f"total_{metric}" for metric in METRICS)
+SERIES_KEYS = tuple(f"{metric}_by_date" for metric in METRICS)
+
+# magic, version, flags, four totals, fetched_at, extra block length
+HEADER = struct.Struct("<4sHH4q32sI")
+SERIES_HEADER = struct.Struct("<BIiI")
+FLAG_FETCHED_AT = 1 << len(METRICS)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _encode_varints(values):
+    out = bytearray()
+    for value in values:
+        value = (value << 1) ^ (value >> 63)  # zigzag
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _decode_varints(buffer, count, offset=0):
+    values = []
+    for _ in range(count):
+        shift = 0
+        result = 0
+        while True:
+            byte = buffer[offset]
+            offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append((result >> 1) ^ -(result & 1))
+    return values, offset
+
+
+def _day_number(day_key):
+    return date.fromisoformat(day_key).toordinal() - EPOCH_ORDINAL
+
+
+def _day_key(day_number):
+    return date.fromordinal(day_number + EPOCH_ORDINAL).isoformat()
+
+
+def _encode_series(series):
+    if series is None:
+        return SERIES_HEADER.pack(0, 0, 0, 0)
+
+    days = [_day_number(day_key) for day_key in series]
+    deltas = [later - earlier for earlier, later in zip(days, days[1:])]
+    payload = _encode_varints(deltas) + _encode_varints(series.values())
+    return SERIES_HEADER.pack(1, len(days), days[0] if days else 0, len(payload)) + payload
+
+
+def encode(data):
+    """Encode a repo_data document into the columnar layout."""
+    flags = 0
+    totals = []
+    for index, key in enumerate(TOTAL_KEYS):
+        if key in data:
+            flags |= 1 << index
+        totals.append(data.get(key, 0))
+
+    fetched_at = data.get("fetched_at")
+    if fetched_at is not None:
+        flags |= FLAG_FETCHED_AT
+    fetched_at_bytes = (fetched_at or "").encode("utf-8")
+    if len(fetched_at_bytes) > 32:
+        raise ValueError(f"fetched_at does not fit in the columnar header: {fetched_at}")
+
+    fixed_keys = set(TOTAL_KEYS) | set(SERIES_KEYS) | {"fetched_at"}
+    extra = {
+        "key_order": list(data.keys()),
+        "extra": {key: value for key, value in data.items() if key not in fixed_keys},
+    }
+    extra_bytes = json.dumps(extra, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    header = HEADER.pack(MAGIC, VERSION, flags, *totals, fetched_at_bytes, len(extra_bytes))
+    return header + extra_bytes + b"".join(_encode_series(data.get(key)) for key in SERIES_KEYS)
+
+
+def _decode_header(buffer):
+    magic, version, flags, *rest = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a columnar repo_data file")
+
+    totals, (fetched_at, extra_length) = rest[: len(METRICS)], rest[len(METRICS) :]
+    header = {key: total for index, (key, total) in enumerate(zip(TOTAL_KEYS, totals)) if flags & (1 << index)}
+    if flags & FLAG_FETCHED_AT:
+        header["fetched_at"] = fetched_at.rstrip(b"\0").decode("utf-8")
+    return header, extra_length
+
+
+def decode(buffer):
+    """Decode a columnar buffer back into the repo_data document."""
+    header, extra_length = _decode_header(buffer)
+    offset = HEADER.size
+    extra = json.loads(buffer[offset : offset + extra_length].decode("utf-8"))
+    offset += extra_length
+
+    values = dict(header)
+    values.update(extra["extra"])
+    for key in SERIES_KEYS:
+        present, count, base_day, payload_length = SERIES_HEADER.unpack_from(buffer, offset)
+        offset += SERIES_HEADER.size
+        if present:
+            deltas, position = _decode_varints(buffer, count - 1 if count else 0, offset)
+            counts, _ = _decode_varints(buffer, count, position)
+            days = [base_day]
+            for delta in deltas:
+                days.append(days[-1] + delta)
+            values[key] = {_day_key(day): value for day, value in zip(days[:count], counts)}
+        offset += payload_length
+
+    return {key: values[key] for key in extra["key_order"]}
+
+
+def read_header(filename):
+    """Read totals and fetched_at from a columnar file without decoding the series."""
+    with open(filename, "rb") as f:
+        header, _ = _decode_header(f.read(HEADER.size))
+    return header
+
+
+def read_summary(filename):
+    """Read the header and the non-series keys of a columnar file, skipping every series."""
+    with open(filename, "rb") as f:
+        header, extra_length = _decode_header(f.read(HEADER.size))
+        header.update(json.loads(f.read(extra_length).decode("utf-8"))["extra"])
+    return header
+
+
+def load_columnar(filename):
+    with open(filename, "rb") as f:
+        return decode(f.read())
+
+
+def save_columnar(filename, data):
+    """Atomically write a repo_data document in the columnar layout."""
+    atomic_write_bytes(filename, encode(data))
+
+
+def convert_directory(input_dir, output_dir, to_columnar, verify=True):
+    """Convert every repo_data file in input_dir, returning (converted, input_bytes, output_bytes)."""
+    if to_columnar:
+        source_extension, target_extension = ".json", COLUMNAR_EXTENSION
+    else:
+        source_extension, target_extension = COLUMNAR_EXTENSION, ".json"
+    converted = 0
+    input_bytes = 0
+    output_bytes = 0
+
+    for filename in sorted(os.listdir(input_dir)):
+        if not filename.endswith(source_extension):
+            continue
+
+        source = os.path.join(input_dir, filename)
+        target = os.path.join(output_dir, filename[: -len(source_extension)] + target_extension)
+
+        if to_columnar:
+            with open(source, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            save_columnar(target, data)
+            if verify and load_columnar(target) != data:
+                raise ValueError(f"Round trip mismatch for {source}")
+        else:
+            data = load_columnar(source)
+            atomic_write_json(target, data)
+
+        converted += 1
+        input_bytes += os.path.getsize(source)
+        output_bytes += os.path.getsize(target)
+
+    return converted, input_bytes, output_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert repo_data files between JSON and the columnar layout")
+    parser.add_argument("direction", choices=["to-columnar", "to-json"], help="Conversion direction")
+    parser.add_argument("--input-dir", default="repo_data", help="Directory with the source files")
+    parser.add_argument("--output-dir", default="repo_data", help="Directory for the converted files")
+    args = parser.parse_args()
+
+    try:
+        converted, input_bytes, output_bytes = convert_directory(
+            args.input_dir, args.output_dir, args.direction == "to-columnar"
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Converted {converted} files: {input_bytes:,} bytes -> {output_bytes:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Pagination Cursor State
+
+Persists the last endCursor and last-seen timestamp of every metric walk next to the
+repo_data files, so re-syncs resume after the last known edge and only merge the delta
+into the existing *_by_date buckets.
+"""
+
+import json
+import os
+
+from atomic_io import atomic_write_json
+
+CURSOR_STATE_DIR = ".cursors"
+METRICS = ("stars", "forks", "issues", "pull_requests")
+
+
+def cursor_state_path(output_dir, owner, repo):
+    """Return the cursor state file kept alongside repo_data/{owner}_{repo}.json."""
+    return os.path.join(output_dir, CURSOR_STATE_DIR, f"{owner}_{repo}.json")
+
+
+def load_cursor_state(output_dir, owner, repo):
+    """Load saved walk state per metric, empty when the repository was never walked with cursors."""
+    try:
+        with open(cursor_state_path(output_dir, owner, repo), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_cursor_state(output_dir, owner, repo, state):
+    """Save walk state per metric."""
+    atomic_write_json(cursor_state_path(output_dir, owner, repo), state)
+
+
+def resume_cursor(state, metric):
+    """Return the cursor to resume a metric walk from, None for a full walk."""
+    return (state.get(metric) or {}).get("end_cursor")
+
+
+def merge_walk(by_date, new_counts, previous, walk):
+    """
+    Merge per-day counts from a walk into existing buckets and return (buckets, state).
+
+    A walk without previous state is a full walk and replaces the buckets. A resumed walk
+    keeps every day before the last seen day, adds the new edges of that day to the count
+    already walked, and rebuilds the later days from the new edges, which yields the same
+    buckets as a full re-walk.
+    """
+    if not previous or not previous.get("last_seen"):
+        merged = dict(new_counts)
+    else:
+        last_day = previous["last_seen"][:10]
+        merged = {day: count for day, count in by_date.items() if day < last_day}
+        merged[last_day] = previous.get("last_day_count", 0) + new_counts.get(last_day, 0)
+        merged.update({day: count for day, count in new_counts.items() if day > last_day})
+
+    state = dict(previous or {})
+    if walk and walk.get("end_cursor"):
+        state.update(walk)
+    if not state.get("last_seen"):
+        return dict(sorted(merged.items())), None
+
+    state["last_day_count"] = merged.get(state["last_seen"][:10], 0)
+    return dict(sorted(merged.items())), state
@@ -6,17 +6,56 @@ Fetches current repository data (stars, forks, issues, pull requests) from GitHu
 updates local JSON files, and generates README with current rankings.
 """
 
+import argparse
+import asyncio
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 import requests
+from atomic_io import atomic_write_bytes, encode_json
+from github_client import GITHUB_API_URL, GITHUB_GRAPHQL_URL, build_headers, get_github_token, get_session
+from http_cache import get_http_cache, get_json
+from pipeline import StagedPipeline
 from readme_generator import generate_readme_english, generate_readme_korean
+from run_metrics import DEFAULT_REPORT_FILE, get_run_metrics, observed_request_seconds, start_run, write_run_reports
+from sharding import SHARD_STRATEGIES, parse_shard, select_shard, shard_filename
+from sqlite_store import RepoDataStore
+from totals_index import get_totals_index
+
+# Batched snapshot queries put many repositories into one aliased GraphQL document.
+# Each repository contributes four totalCount connections; keeping the document under
+# this budget keeps it well inside GitHub's query cost and server-side timeout limits.
+SNAPSHOT_CONNECTIONS_PER_REPO = 4
+SNAPSHOT_MAX_CONNECTIONS_PER_QUERY = 100
+
+SNAPSHOT_FRAGMENT = """
+fragment RepositorySnapshot on Repository {
+    url
+    stargazerCount
+    forkCount
+    pushedAt
+    issues(states: [OPEN, CLOSED]) {
+        totalCount
+    }
+    openIssues: issues(states: [OPEN]) {
+        totalCount
+    }
+    pullRequests(states: [OPEN, CLOSED, MERGED]) {
+        totalCount
+    }
+    openPullRequests: pullRequests(states: [OPEN]) {
+        totalCount
+    }
+}
+"""
 
 
-def load_repositories_config(filename: str = "repositories.json") -> List[str]:
-    """Load all repository URLs from JSON file and check for existing data files."""
+def load_repositories_config(filename: str = "repositories.json", store: Optional[RepoDataStore] = None) -> List[str]:
+    """Load all repository URLs from JSON file and check for existing data files or store entries."""
     try:
         with open(filename, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -37,7 +76,7 @@ def load_repositories_config(filename: str = "repositories.json") -> List[str]:
         existing_urls = []
         repo_data_dir = "repo_data"
 
-        if not os.path.exists(repo_data_dir):
+        if store is None and not os.path.exists(repo_data_dir):
             raise FileNotFoundError(f"Directory '{repo_data_dir}' not found")
 
         for url in all_urls:
@@ -46,7 +85,11 @@ def load_repositories_config(filename: str = "repositories.json") -> List[str]:
                 owner, repo = repo_path.split("/")
                 repo_file = f"{repo_data_dir}/{owner}_{repo}.json"
 
-                if os.path.exists(repo_file):
+                if store is not None and store.has_repo(owner, repo):
+                    existing_urls.append(url)
+                elif store is not None:
+                    print(f"Skipping {owner}/{repo}: No data found in store {store.path}")
+                elif os.path.exists(repo_file):
                     existing_urls.append(url)
                 else:
                     print(f"Skipping {owner}/{repo}: No data file found at {repo_file}")
@@ -66,30 +109,25 @@ def load_repositories_config(filename: str = "repositories.json") -> List[str]:
         raise ValueError(f"Invalid JSON format in '{filename}': {e}")
 
 
-def get_github_token() -> Optional[str]:
-    """Get GitHub token from environment or file."""
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        return token
-    try:
-        with open("access_token.txt", "r") as f:
-            return f.read().strip()
-    except FileNotFoundError:
-        return None
-
-
-def get_repository_data(owner: str, repo: str, token: Optional[str] = None) -> Optional[Dict]:
+def get_repository_data(
+    owner: str, repo: str, token: Optional[str] = None, session: Optional[requests.Session] = None
+) -> Optional[Dict]:
     """Get complete repository data from GitHub API."""
-    headers = {"User-Agent": "Python-Framework-Tracker"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
+    http = session or get_session()
+    headers = build_headers(token)
+    metrics = get_run_metrics()
+    full_name = f"{owner}/{repo}"
 
     try:
-        # Get basic repository data
-        repo_url = f"https://api.github.com/repos/{owner}/{repo}"
-        response = requests.get(repo_url, headers=headers)
-        response.raise_for_status()
-        repo_data = response.json()
+        # Get basic repository data, revalidated against the cached copy so unchanged repositories cost no quota
+        repo_url = f"{GITHUB_API_URL}/repos/{owner}/{repo}"
+        started = time.perf_counter()
+        try:
+            repo_data = get_json(http, repo_url, headers)
+        except requests.exceptions.RequestException:
+            metrics.observe_request("rest", time.perf_counter() - started, repo=full_name)
+            raise
+        metrics.observe_request("rest", time.perf_counter() - started, "ok", full_name)
 
         # Use GitHub GraphQL API for accurate counts with REST API fallback
         total_pulls = 0
@@ -102,7 +140,6 @@ def get_repository_data(owner: str, repo: str, token: Optional[str] = None) -> O
         if token and len(token.strip()) > 0:
             try:
                 # Primary: Use GraphQL API for accurate counts
-                graphql_url = "https://api.github.com/graphql"
                 query = f"""{{
                     repository(owner: "{owner}", name: "{repo}") {{
                         issues(states: [OPEN, CLOSED]) {{
@@ -114,7 +151,15 @@ def get_repository_data(owner: str, repo: str, token: Optional[str] = None) -> O
                     }}
                 }}"""
 
-                graphql_response = requests.post(graphql_url, json={"query": query}, headers=headers)
+                started = time.perf_counter()
+                try:
+                    graphql_response = http.post(GITHUB_GRAPHQL_URL, json={"query": query}, headers=headers)
+                except requests.exceptions.RequestException:
+                    metrics.observe_request("graphql", time.perf_counter() - started, repo=full_name)
+                    raise
+                metrics.observe_request(
+                    "graphql", time.perf_counter() - started, graphql_response.status_code, full_name
+                )
                 graphql_response.raise_for_status()
                 response_data = graphql_response.json()
 
@@ -128,19 +173,29 @@ def get_repository_data(owner: str, repo: str, token: Optional[str] = None) -> O
 
             except requests.exceptions.RequestException:
                 # Fallback: Use Search API
+                metrics.count_retry("search_fallback")
                 try:
-                    search_prs_url = f"https://api.github.com/search/issues?q=repo:{owner}/{repo}+type:pr"
-                    prs_response = requests.get(search_prs_url, headers=headers)
+                    search_prs_url = f"{GITHUB_API_URL}/search/issues?q=repo:{owner}/{repo}+type:pr"
+                    started = time.perf_counter()
+                    prs_response = http.get(search_prs_url, headers=headers)
+                    metrics.observe_request(
+                        "search", time.perf_counter() - started, prs_response.status_code, full_name
+                    )
                     prs_response.raise_for_status()
                     total_pulls = prs_response.json().get("total_count", 0)
 
-                    search_issues_url = f"https://api.github.com/search/issues?q=repo:{owner}/{repo}+type:issue"
-                    issues_response = requests.get(search_issues_url, headers=headers)
+                    search_issues_url = f"{GITHUB_API_URL}/search/issues?q=repo:{owner}/{repo}+type:issue"
+                    started = time.perf_counter()
+                    issues_response = http.get(search_issues_url, headers=headers)
+                    metrics.observe_request(
+                        "search", time.perf_counter() - started, issues_response.status_code, full_name
+                    )
                     issues_response.raise_for_status()
                     total_issues = issues_response.json().get("total_count", 0)
 
                 except requests.exceptions.RequestException:
                     # Final fallback: use repository data (only open issues, no PRs)
+                    metrics.count_retry("open_issues_fallback")
                     total_issues = max(0, repo_data.get("open_issues_count", 0))
                     total_pulls = 0
         else:
@@ -165,102 +220,290 @@ def get_repository_data(owner: str, repo: str, token: Optional[str] = None) -> O
         return None
 
 
-def update_repo_data_file(owner: str, repo: str, current_data: Dict) -> None:
-    """Update repository data file with current differences in stars, forks, issues, and pull requests."""
+def parse_repository_url(url: str) -> Tuple[str, str]:
+    """Extract owner and repo name from a GitHub repository URL."""
+    repo_path = url.replace("https://github.com/", "")
+    owner, repo = repo_path.split("/")
+    return owner, repo
+
+
+def chunk_repositories_by_cost(
+    repos: List[Tuple[str, str]], max_cost: int = SNAPSHOT_MAX_CONNECTIONS_PER_QUERY
+) -> List[List[Tuple[str, str]]]:
+    """Split repositories into chunks whose estimated snapshot query cost stays under max_cost."""
+    per_chunk = max(1, max_cost // SNAPSHOT_CONNECTIONS_PER_REPO)
+    return [repos[i : i + per_chunk] for i in range(0, len(repos), per_chunk)]
+
+
+def build_snapshot_query(repos: List[Tuple[str, str]]) -> str:
+    """Build one aliased GraphQL document that fetches snapshot counts for every repository."""
+    aliases = []
+    for index, (owner, repo) in enumerate(repos):
+        aliases.append(
+            f"    repo{index}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) "
+            "{ ...RepositorySnapshot }"
+        )
+    return "query {\n" + "\n".join(aliases) + "\n    rateLimit { cost remaining resetAt }\n}\n" + SNAPSHOT_FRAGMENT
+
+
+def snapshot_to_repository_data(repo: str, snapshot: Dict) -> Dict:
+    """Convert a GraphQL repository snapshot into the dict shape returned by get_repository_data."""
+    open_issues = snapshot["openIssues"]["totalCount"]
+    open_pulls = snapshot["openPullRequests"]["totalCount"]
+    return {
+        "name": repo,
+        "html_url": snapshot.get("url", ""),
+        "stars": snapshot.get("stargazerCount", 0),
+        "forks": snapshot.get("forkCount", 0),
+        # REST open_issues_count includes open pull requests, keep the same meaning
+        "open_issues": open_issues + open_pulls,
+        "total_issues": snapshot["issues"]["totalCount"],
+        "total_pull_requests": snapshot["pullRequests"]["totalCount"],
+        "last_commit": snapshot.get("pushedAt") or "",
+        "fetched_at": datetime.now().isoformat(),
+    }
+
+
+def get_repository_snapshots(
+    repos: List[Tuple[str, str]],
+    token: str,
+    on_snapshot: Optional[Callable[[str, str, Optional[Dict]], None]] = None,
+) -> Dict[Tuple[str, str], Optional[Dict]]:
+    """
+    Get repository data for many repositories with one GraphQL request per cost-bounded chunk.
+
+    on_snapshot is called with the owner, name and data of every repository as soon as its chunk completes.
+    """
+    session = get_session()
+    headers = build_headers(token)
+    metrics = get_run_metrics()
+    results = {}
+
+    for chunk in chunk_repositories_by_cost(repos):
+        query = build_snapshot_query(chunk)
+        try:
+            started = time.perf_counter()
+            try:
+                response = session.post(GITHUB_GRAPHQL_URL, json={"query": query}, headers=headers)
+            except requests.exceptions.RequestException:
+                metrics.observe_request("graphql", time.perf_counter() - started)
+                raise
+            metrics.observe_request("graphql", time.perf_counter() - started, response.status_code)
+            response.raise_for_status()
+            response_data = response.json()
+
+            # Missing repositories come back as null aliases alongside errors, other errors void the chunk
+            data = response_data.get("data") or {}
+            if "errors" in response_data and not data:
+                raise requests.exceptions.RequestException(f"GraphQL error: {response_data['errors']}")
+
+            rate_limit = data.get("rateLimit") or {}
+            metrics.observe_rate_limit(rate_limit)
+            if rate_limit:
+                print(
+                    f"Snapshot batch of {len(chunk)} repositories cost {rate_limit.get('cost')} points "
+                    f"({rate_limit.get('remaining')} remaining)"
+                )
+
+            for index, (owner, repo) in enumerate(chunk):
+                snapshot = data.get(f"repo{index}")
+                if not snapshot:
+                    print(f"Warning: Failed to fetch data for {owner}/{repo}: not returned by batched query")
+                    results[(owner, repo)] = None
+                    continue
+                results[(owner, repo)] = snapshot_to_repository_data(repo, snapshot)
+
+        except requests.exceptions.RequestException as e:
+            # Fallback: fetch this chunk one repository at a time
+            print(f"Warning: Batched snapshot query failed, falling back to per-repository requests: {e}")
+            for owner, repo in chunk:
+                results[(owner, repo)] = get_repository_data(owner, repo, token, session)
+
+        if on_snapshot:
+            for owner, repo in chunk:
+                on_snapshot(owner, repo, results[(owner, repo)])
+
+    return results
+
+
+def prepare_repo_data_update(
+    owner: str, repo: str, current_data: Dict, store: Optional[RepoDataStore] = None
+) -> Optional[Dict]:
+    """Add today's differences in stars, forks, issues and pull requests to the saved data, without writing it."""
     repo_file = f"repo_data/{owner}_{repo}.json"
     today = datetime.now().strftime("%Y-%m-%d")
 
-    if not os.path.exists(repo_file):
+    if store is None and not os.path.exists(repo_file):
         print(f"Skipping {owner}/{repo}: No existing data file")
-        return
+        return None
 
-    try:
-        # Load existing data
+    # Load existing data, the store only needs the totals to add today's differences
+    if store is not None:
+        repo_data = store.load_totals(owner, repo)
+        if repo_data is None:
+            print(f"Skipping {owner}/{repo}: No existing data in store")
+            return None
+    else:
         with open(repo_file, "r", encoding="utf-8") as f:
             repo_data = json.load(f)
 
-        # Calculate differences
-        previous_stars = repo_data.get("total_stars", 0)
-        previous_forks = repo_data.get("total_forks", 0)
-        previous_issues = repo_data.get("total_issues", 0)
-        previous_prs = repo_data.get("total_pull_requests", 0)
-
-        current_stars = current_data["stars"]
-        current_forks = current_data["forks"]
-        current_issues = current_data["total_issues"]
-        current_prs = current_data["total_pull_requests"]
+    # Calculate differences
+    previous_stars = repo_data.get("total_stars", 0)
+    previous_forks = repo_data.get("total_forks", 0)
+    previous_issues = repo_data.get("total_issues", 0)
+    previous_prs = repo_data.get("total_pull_requests", 0)
+
+    current_stars = current_data["stars"]
+    current_forks = current_data["forks"]
+    current_issues = current_data["total_issues"]
+    current_prs = current_data["total_pull_requests"]
+
+    star_diff = current_stars - previous_stars
+    fork_diff = current_forks - previous_forks
+    issue_diff = current_issues - previous_issues
+    pr_diff = current_prs - previous_prs
+
+    # Track if any changes occurred
+    has_changes = False
+
+    # Update data if there are differences
+    if star_diff != 0:
+        if "stars_by_date" not in repo_data:
+            repo_data["stars_by_date"] = {}
+        repo_data["stars_by_date"][today] = star_diff
+        repo_data["total_stars"] = current_stars
+        has_changes = True
+
+    if fork_diff != 0:
+        if "forks_by_date" not in repo_data:
+            repo_data["forks_by_date"] = {}
+        repo_data["forks_by_date"][today] = fork_diff
+        repo_data["total_forks"] = current_forks
+        has_changes = True
+
+    if issue_diff != 0:
+        if "issues_by_date" not in repo_data:
+            repo_data["issues_by_date"] = {}
+        repo_data["issues_by_date"][today] = issue_diff
+        repo_data["total_issues"] = current_issues
+        has_changes = True
+
+    if pr_diff != 0:
+        if "pull_requests_by_date" not in repo_data:
+            repo_data["pull_requests_by_date"] = {}
+        repo_data["pull_requests_by_date"][today] = pr_diff
+        repo_data["total_pull_requests"] = current_prs
+        has_changes = True
+
+    if has_changes:
+        repo_data["fetched_at"] = current_data["fetched_at"]
+
+        changes = []
+        if star_diff != 0:
+            changes.append(f"stars: {previous_stars} -> {current_stars} ({star_diff:+d})")
+        if fork_diff != 0:
+            changes.append(f"forks: {previous_forks} -> {current_forks} ({fork_diff:+d})")
+        if issue_diff != 0:
+            changes.append(f"issues: {previous_issues} -> {current_issues} ({issue_diff:+d})")
+        if pr_diff != 0:
+            changes.append(f"PRs: {previous_prs} -> {current_prs} ({pr_diff:+d})")
+
+        message = f"Updated {owner}/{repo}: {', '.join(changes)}"
+    else:
+        message = (
+            f"No changes for {owner}/{repo}: {current_stars} stars, {current_forks} forks, "
+            f"{current_issues} issues, {current_prs} PRs"
+        )
+
+    return {
+        "owner": owner,
+        "repo": repo,
+        "repo_file": repo_file,
+        "repo_data": repo_data,
+        "current_data": current_data,
+        "changed": has_changes,
+        "message": message,
+        # Serialized here so the writer only moves bytes to disk
+        "encoded": encode_json(repo_data) if has_changes and store is None else None,
+    }
+
+
+def write_repo_data_update(update: Dict, store: Optional[RepoDataStore] = None) -> None:
+    """Save an update built by prepare_repo_data_update and index its totals."""
+    owner, repo = update["owner"], update["repo"]
+    repo_file, repo_data, current_data = update["repo_file"], update["repo_data"], update["current_data"]
+
+    if update["changed"]:
+        # Save updated data, a killed run leaves the previous file intact
+        with get_run_metrics().stage("write"):
+            if store is not None:
+                store.save_repo_data(owner, repo, repo_data, replace_series=False)
+            else:
+                atomic_write_bytes(repo_file, update["encoded"])
+    print(update["message"])
+
+    # The totals index also keeps the live values README generation shows
+    if store is None:
+        get_totals_index("repo_data").update(
+            repo_file,
+            repo_data,
+            update["encoded"],
+            last_commit=current_data.get("last_commit"),
+            open_issues=current_data.get("open_issues"),
+        )
+
+
+def update_repo_data_file(owner: str, repo: str, current_data: Dict, store: Optional[RepoDataStore] = None) -> None:
+    """Update repository data file with current differences in stars, forks, issues, and pull requests."""
+    try:
+        update = prepare_repo_data_update(owner, repo, current_data, store)
+        if update:
+            write_repo_data_update(update, store)
+    except Exception as e:
+        print(f"Failed to update {owner}/{repo}: {e}")
 
-        star_diff = current_stars - previous_stars
-        fork_diff = current_forks - previous_forks
-        issue_diff = current_issues - previous_issues
-        pr_diff = current_prs - previous_prs
 
-        # Track if any changes occurred
-        has_changes = False
+def build_update_pipeline(store: Optional[RepoDataStore] = None) -> StagedPipeline:
+    """
+    Build the pipeline the fetch engines feed with {"owner", "repo", "current_data"} payloads.
 
-        # Update data if there are differences
-        if star_diff != 0:
-            if "stars_by_date" not in repo_data:
-                repo_data["stars_by_date"] = {}
-            repo_data["stars_by_date"][today] = star_diff
-            repo_data["total_stars"] = current_stars
-            has_changes = True
+    Aggregators diff and encode the data files, the single writer saves them. The writer owns the
+    store, whose transaction holds its lock, so with a store the writer also loads the totals.
+    """
 
-        if fork_diff != 0:
-            if "forks_by_date" not in repo_data:
-                repo_data["forks_by_date"] = {}
-            repo_data["forks_by_date"][today] = fork_diff
-            repo_data["total_forks"] = current_forks
-            has_changes = True
+    def aggregate(payload: Dict) -> Dict:
+        if store is None:
+            payload["update"] = prepare_repo_data_update(payload["owner"], payload["repo"], payload["current_data"])
+        return payload
 
-        if issue_diff != 0:
-            if "issues_by_date" not in repo_data:
-                repo_data["issues_by_date"] = {}
-            repo_data["issues_by_date"][today] = issue_diff
-            repo_data["total_issues"] = current_issues
-            has_changes = True
+    def write(payload: Dict) -> Dict:
+        if store is not None:
+            update_repo_data_file(payload["owner"], payload["repo"], payload["current_data"], store)
+        elif payload["update"]:
+            write_repo_data_update(payload["update"])
+        return payload["current_data"]
 
-        if pr_diff != 0:
-            if "pull_requests_by_date" not in repo_data:
-                repo_data["pull_requests_by_date"] = {}
-            repo_data["pull_requests_by_date"][today] = pr_diff
-            repo_data["total_pull_requests"] = current_prs
-            has_changes = True
-
-        if has_changes:
-            repo_data["fetched_at"] = current_data["fetched_at"]
-
-            # Save updated data
-            with open(repo_file, "w", encoding="utf-8") as f:
-                json.dump(repo_data, f, ensure_ascii=False, separators=(",", ":"))
-
-            changes = []
-            if star_diff != 0:
-                changes.append(f"stars: {previous_stars} -> {current_stars} ({star_diff:+d})")
-            if fork_diff != 0:
-                changes.append(f"forks: {previous_forks} -> {current_forks} ({fork_diff:+d})")
-            if issue_diff != 0:
-                changes.append(f"issues: {previous_issues} -> {current_issues} ({issue_diff:+d})")
-            if pr_diff != 0:
-                changes.append(f"PRs: {previous_prs} -> {current_prs} ({pr_diff:+d})")
-
-            print(f"Updated {owner}/{repo}: {', '.join(changes)}")
-        else:
-            print(
-                f"No changes for {owner}/{repo}: {current_stars} stars, {current_forks} forks, {current_issues} issues, {current_prs} PRs"
-            )
+    def report_error(payload: Dict, error: Exception) -> Dict:
+        # A repository whose file failed to update is still shown in the README
+        print(f"Failed to update {payload['owner']}/{payload['repo']}: {error}")
+        return payload["current_data"]
 
-    except Exception as e:
-        print(f"Failed to update {owner}/{repo}: {e}")
+    return StagedPipeline(
+        aggregate,
+        write,
+        on_error=report_error,
+        write_context=store.transaction if store is not None else None,
+    ).start()
 
 
-def fetch_all_repository_data(repo_urls: List[str]) -> List[Dict]:
+def fetch_all_repository_data(repo_urls: List[str], store: Optional[RepoDataStore] = None) -> List[Dict]:
     """Fetch current data for all repositories and update local files."""
     token = get_github_token()
     if not token:
         print("Warning: No GitHub token found. API rate limits may apply.")
 
-    all_repo_data = []
+    session = get_session()
+    pipeline = build_update_pipeline(store)
 
     for url in repo_urls:
         try:
@@ -271,47 +514,215 @@ def fetch_all_repository_data(repo_urls: List[str]) -> List[Dict]:
             print(f"Fetching data for {owner}/{repo}...")
 
             # Get current repository data from GitHub API
-            current_data = get_repository_data(owner, repo, token)
+            current_data = get_repository_data(owner, repo, token, session)
             if not current_data:
                 continue
 
-            # Update local repo data file with star differences
-            update_repo_data_file(owner, repo, current_data)
-
-            # Add to results for README generation
-            all_repo_data.append(current_data)
+            # Update local repo data file with star differences while the next repository is fetched
+            pipeline.put({"owner": owner, "repo": repo, "current_data": current_data})
 
         except Exception as e:
             print(f"Failed to process {url}: {e}")
             continue
 
-    return all_repo_data
+    # Results for README generation
+    return pipeline.close()
+
+
+def fetch_all_repository_data_batched(repo_urls: List[str], store: Optional[RepoDataStore] = None) -> List[Dict]:
+    """Fetch current data for all repositories using batched GraphQL snapshots and update local files."""
+    token = get_github_token()
+    if not token:
+        print("Warning: No GitHub token found. Batched GraphQL snapshots need a token, using serial fetch.")
+        return fetch_all_repository_data(repo_urls, store)
+
+    repos = []
+    for url in repo_urls:
+        try:
+            repos.append(parse_repository_url(url))
+        except ValueError:
+            print(f"Failed to process {url}: invalid URL format")
+
+    print(f"Fetching snapshot data for {len(repos)} repositories in batched GraphQL queries...")
+    pipeline = build_update_pipeline(store)
+
+    def update_snapshot(owner: str, repo: str, current_data: Optional[Dict]) -> None:
+        if current_data:
+            pipeline.put({"owner": owner, "repo": repo, "current_data": current_data})
+
+    # Files of a chunk are updated while the next chunk is fetched
+    get_repository_snapshots(repos, token, update_snapshot)
+    return pipeline.close()
+
+
+async def fetch_all_repository_data_async(
+    repo_urls: List[str], concurrency: int = 8, store: Optional[RepoDataStore] = None
+) -> List[Dict]:
+    """Fetch current data for all repositories concurrently and update local files as results arrive."""
+    token = get_github_token()
+    if not token:
+        print("Warning: No GitHub token found. API rate limits may apply.")
+
+    loop = asyncio.get_running_loop()
+    # Every request of get_repository_data targets the one GitHub API host, so this also bounds it
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # requests is blocking, so calls run on a worker pool sharing one keep-alive session
+    session = get_session(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def fetch_one(owner: str, repo: str) -> Tuple[str, str, Optional[Dict]]:
+        async with semaphore:
+            print(f"Fetching data for {owner}/{repo}...")
+            current_data = await loop.run_in_executor(executor, get_repository_data, owner, repo, token, session)
+        return owner, repo, current_data
+
+    tasks = []
+    for url in repo_urls:
+        try:
+            owner, repo = parse_repository_url(url)
+        except ValueError:
+            print(f"Failed to process {url}: invalid URL format")
+            continue
+        tasks.append(asyncio.create_task(fetch_one(owner, repo)))
+
+    pipeline = build_update_pipeline(store)
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            try:
+                owner, repo, current_data = await next_result
+                if not current_data:
+                    continue
+
+                # A full queue blocks the handoff, not the event loop driving the other fetches
+                payload = {"owner": owner, "repo": repo, "current_data": current_data}
+                await loop.run_in_executor(None, pipeline.put, payload)
+
+            except Exception as e:
+                print(f"Failed to process repository: {e}")
+                continue
+    finally:
+        executor.shutdown(wait=True)
+
+    return pipeline.close()
 
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Fetch repository data and generate README files")
+    parser.add_argument(
+        "--engine",
+        choices=["serial", "batched", "async"],
+        default="serial",
+        help="Fetch engine: one request per repository (serial), aliased GraphQL snapshots (batched) "
+        "or concurrent requests on a pooled session (async)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Maximum concurrent repositories for the async engine (default: 8)"
+    )
+    parser.add_argument(
+        "--store", help="Read and write repository data through this SQLite store instead of repo_data JSON files"
+    )
+    parser.add_argument(
+        "--report", default=DEFAULT_REPORT_FILE, help=f"JSON run report file (default: {DEFAULT_REPORT_FILE})"
+    )
+    parser.add_argument("--prometheus", help="Also write the run metrics as a Prometheus textfile")
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Dry run: estimate requests, GraphQL points and wall-clock time of the run, then exit",
+    )
+    parser.add_argument(
+        "--shard",
+        help="Fetch only shard i/N of the repositories, e.g. 2/4, the README is generated by merge_shards.py",
+    )
+    parser.add_argument(
+        "--shard-strategy",
+        choices=SHARD_STRATEGIES,
+        default="hash",
+        help="Partition repositories by a stable hash or balance shards by estimated pages (default: hash)",
+    )
+    args = parser.parse_args()
+
+    if args.concurrency <= 0:
+        print("Error: --concurrency must be greater than 0")
+        exit(1)
+
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"Error: {e}")
+            exit(1)
+        if args.report == DEFAULT_REPORT_FILE:
+            args.report = shard_filename(args.report, shard)
+
+    store = RepoDataStore(args.store) if args.store else None
+    metrics = start_run(f"fetcher_{args.engine}")
+
     try:
         # Load repository configuration for all categories with existing data files
-        repo_urls = load_repositories_config()
+        repo_urls = load_repositories_config(store=store)
+        if shard:
+            repo_urls = select_shard(repo_urls, shard, args.shard_strategy)
+            metrics.set_info("shard", {"index": shard[0], "count": shard[1], "strategy": args.shard_strategy})
+            print(f"Shard {shard[0]}/{shard[1]} ({args.shard_strategy}): {len(repo_urls)} repositories")
+
+        if args.plan:
+            # job_planner imports this module for the snapshot query
+            from job_planner import check_limits, estimate_daily_run, print_estimate
+
+            endpoint = "graphql" if args.engine == "batched" else "rest"
+            request_seconds = observed_request_seconds(args.report, endpoint)
+            estimate = estimate_daily_run(len(repo_urls), args.engine, args.concurrency, request_seconds=request_seconds)
+            print_estimate(estimate, check_limits(estimate))
+            return
 
-        # Fetch current data for all repositories
+        # Fetch current data for all repositories, the writer commits the store updates of the run together
         print("Fetching current repository data from GitHub...")
-        repo_data = fetch_all_repository_data(repo_urls)
+        if args.engine == "batched":
+            repo_data = fetch_all_repository_data_batched(repo_urls, store)
+        elif args.engine == "async":
+            repo_data = asyncio.run(fetch_all_repository_data_async(repo_urls, args.concurrency, store))
+        else:
+            repo_data = fetch_all_repository_data(repo_urls, store)
+
+        http_cache = get_http_cache()
+        if http_cache is not None and args.engine != "batched":
+            cache_stats = http_cache.stats()
+            metrics.set_info("http_cache", cache_stats)
+            print(
+                f"HTTP cache: {cache_stats['not_modified']} not modified, {cache_stats['fetched']} fetched "
+                f"({cache_stats['entries']} entries, {cache_stats['bytes']:,} bytes)"
+            )
 
         if not repo_data:
             print("No repository data fetched. Exiting.")
             return
 
+        # A shard only sees its own repositories, the README is generated once after merging
+        if shard:
+            print("Shard complete, run merge_shards.py on all shard outputs to generate the README files")
+            return
+
         # Generate both English and Korean README files
         print("Generating README files...")
-        generate_readme_english(repo_data)
-        generate_readme_korean(repo_data)
+        with metrics.stage("readme"):
+            generate_readme_english(repo_data)
+            generate_readme_korean(repo_data)
 
         print("All tasks completed successfully!")
 
     except Exception as e:
         print(f"Error: {e}")
         exit(1)
+    finally:
+        if store:
+            store.close()
+        # A dry run leaves the report of the last real run in place
+        if not args.plan:
+            write_run_reports(args.report, args.prometheus)
 
 
 if __name__ == "__main__":
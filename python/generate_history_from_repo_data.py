@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Repository History Aggregator
+
+Converts the daily *_by_date deltas of every repo_data/*.json file into cumulative totals
+and writes them to repository_histories.json:
+- Every repository is placed on a shared epoch-day axis
+- Cumulative sums of all four metrics run as one NumPy operation per chunk of repositories
+- Output is streamed one repository per line, so memory is bounded by the chunk size
+
+Each repository lists the days on which any metric changed and the cumulative stars,
+forks, issues and pull requests at the end of those days.
+
+A manifest of every input file (mtime, size, content hash, last aggregated day and running
+totals) is kept in repo_data/.history, so later runs only append the new days of changed
+files and copy every other line of repository_histories.json as it is.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+from atomic_io import atomic_open, atomic_write_json
+from cursor_state import METRICS
+
+DEFAULT_INPUT_DIR = "repo_data"
+DEFAULT_OUTPUT_FILE = "repository_histories.json"
+DEFAULT_CHUNK_SIZE = 500
+HISTORY_STATE_DIR = ".history"
+
+
+def list_repo_files(input_dir):
+    """Return the repo_data JSON files of input_dir in a stable order."""
+    return sorted(filename for filename in os.listdir(input_dir) if filename.endswith(".json") and "_" in filename)
+
+
+def repo_name(filename):
+    """Map {owner}_{repo}.json to owner/repo."""
+    owner, repo = filename[: -len(".json")].split("_", 1)
+    return f"{owner}/{repo}"
+
+
+def repo_filename(name):
+    """Map owner/repo back to {owner}_{repo}.json."""
+    return f"{name.replace('/', '_', 1)}.json"
+
+
+def load_documents(input_dir, filenames):
+    """Load repo_data files, returning (filename, data, fingerprint) with the mtime, size and hash read."""
+    documents = []
+    for filename in filenames:
+        try:
+            with open(os.path.join(input_dir, filename), "rb") as f:
+                content = f.read()
+                stat = os.fstat(f.fileno())
+            fingerprint = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": hashlib.sha256(content).hexdigest(),
+            }
+            documents.append((filename, json.loads(content), fingerprint))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Failed to load data from {filename}: {e}")
+    return documents
+
+
+def series_hash(data, through_day=None):
+    """Hash the *_by_date entries up to and including through_day, or all of them."""
+    digest = hashlib.sha256()
+    for metric in METRICS:
+        series = data.get(f"{metric}_by_date") or {}
+        entries = sorted((day, count) for day, count in series.items() if through_day is None or day <= through_day)
+        digest.update(json.dumps([metric, entries], separators=(",", ":")).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def series_after(data, last_day):
+    """Return the *_by_date entries after last_day."""
+    after = {}
+    for metric in METRICS:
+        series = data.get(f"{metric}_by_date") or {}
+        after[f"{metric}_by_date"] = {day: count for day, count in series.items() if day > last_day}
+    return after
+
+
+def aggregate_histories(documents):
+    """
+    Turn daily deltas into cumulative totals for a list of (name, repo_data) documents.
+
+    Returns (name, days, cumulative) per document, where days are epoch-day numbers of the
+    days on which any metric changed and cumulative is a (len(days), 4) array in METRICS
+    order.
+    """
+    repo_ids = []
+    days = []
+    metric_ids = []
+    values = []
+    first_days = np.zeros(len(documents), dtype=np.int64)
+    spans = np.zeros(len(documents), dtype=np.int64)
+    for repo_id, (_, data) in enumerate(documents):
+        repo_days = []
+        for metric_id, metric in enumerate(METRICS):
+            series = data.get(f"{metric}_by_date")
+            if not series:
+                continue
+            repo_days.append(np.array(list(series), dtype="datetime64[D]").astype(np.int64))
+            repo_ids.append(np.full(len(series), repo_id, dtype=np.int64))
+            metric_ids.append(np.full(len(series), metric_id, dtype=np.int64))
+            values.append(np.fromiter(series.values(), dtype=np.int64, count=len(series)))
+        if repo_days:
+            first_days[repo_id] = min(metric_days.min() for metric_days in repo_days)
+            spans[repo_id] = max(metric_days.max() for metric_days in repo_days) - first_days[repo_id] + 1
+            days.extend(repo_days)
+
+    empty = (np.empty(0, dtype=np.int64), np.empty((0, len(METRICS)), dtype=np.int64))
+    if not days:
+        return [(name, *empty) for name, _ in documents]
+
+    repo_ids = np.concatenate(repo_ids)
+    days = np.concatenate(days)
+    metric_ids = np.concatenate(metric_ids)
+    values = np.concatenate(values)
+
+    # Every repository owns a contiguous block of rows on the epoch-day axis, one column per metric,
+    # so each delta lands in its row by offset arithmetic instead of a sort
+    row_offsets = np.cumsum(spans) - spans
+    rows = row_offsets[repo_ids] + days - first_days[repo_ids]
+    cumulative = np.zeros((int(spans.sum()), len(METRICS)), dtype=np.int64)
+    cumulative[rows, metric_ids] = values
+    present = np.zeros(len(cumulative), dtype=bool)
+    present[rows] = True
+
+    # Segmented cumulative sum: one cumsum over all rows, minus the running total before each repository
+    np.cumsum(cumulative, axis=0, out=cumulative)
+    before = np.zeros((len(documents), len(METRICS)), dtype=np.int64)
+    has_rows_before = row_offsets > 0
+    before[has_rows_before] = cumulative[row_offsets[has_rows_before] - 1]
+    cumulative -= np.repeat(before, spans, axis=0)
+
+    # Keep only the days on which a metric changed
+    kept_rows = np.flatnonzero(present)
+    kept_days = kept_rows - np.repeat(row_offsets - first_days, spans)[kept_rows]
+    cumulative = cumulative[kept_rows]
+    bounds = np.searchsorted(kept_rows, np.r_[row_offsets, row_offsets[-1] + spans[-1]])
+
+    return [
+        (name, kept_days[bounds[repo_id] : bounds[repo_id + 1]], cumulative[bounds[repo_id] : bounds[repo_id + 1]])
+        for repo_id, (name, _) in enumerate(documents)
+    ]
+
+
+def day_strings(first_day, last_day):
+    """Return ISO dates of an epoch-day range, indexed by day - first_day."""
+    return np.arange(first_day, last_day + 1).astype("datetime64[D]").astype(str).astype(object)
+
+
+def history_entry(days, cumulative, dates=None, first_day=0):
+    """Build the repository_histories.json entry of one repository."""
+    if dates is None:
+        first_day = int(days.min()) if len(days) else 0
+        dates = day_strings(first_day, int(days.max()) if len(days) else -1)
+    entry = {"dates": dates[days - first_day].tolist()}
+    for metric_id, metric in enumerate(METRICS):
+        entry[metric] = cumulative[:, metric_id].tolist()
+    return entry
+
+
+def format_history_line(name, entry):
+    return f"{json.dumps(name, ensure_ascii=False)}:{json.dumps(entry, separators=(',', ':'))}"
+
+
+def write_histories(output_file, lines, generated_at):
+    """
+    Stream history lines into output_file, one repository per line.
+
+    The file stays valid JSON and is replaced atomically once every line is written.
+    """
+    count = 0
+    with atomic_open(output_file) as f:
+        f.write(f'{{"generated_at":{json.dumps(generated_at)},"repositories":{{\n')
+        for line in lines:
+            f.write(f",{line}\n" if count else f"{line}\n")
+            count += 1
+        f.write("}}\n")
+    return count
+
+
+def read_generated_at(output_file):
+    """Read generated_at from the first line of a history file, None when it cannot be read."""
+    try:
+        with open(output_file, "r", encoding="utf-8") as f:
+            return json.loads(f.readline().rstrip("\n") + "}}").get("generated_at")
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def manifest_path(input_dir):
+    return os.path.join(input_dir, HISTORY_STATE_DIR, "manifest.json")
+
+
+def load_manifest(input_dir):
+    try:
+        with open(manifest_path(input_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def manifest_entry(fingerprint, data, days, cumulative):
+    """Record what was aggregated from a file: its fingerprint, last day, running totals and series hash."""
+    if not len(days):
+        return {**fingerprint, "last_day": None, "totals": [0] * len(METRICS), "series_sha256": series_hash(data)}
+
+    last_day = str(np.datetime64(int(days[-1]), "D"))
+    return {
+        **fingerprint,
+        "last_day": last_day,
+        "totals": cumulative[-1].tolist(),
+        "series_sha256": series_hash(data, last_day),
+    }
+
+
+def generate_history_lines(input_dir, filenames, chunk_size=DEFAULT_CHUNK_SIZE, manifest_files=None):
+    """
+    Yield the history line of every file, aggregating chunk_size repositories at a time.
+
+    When manifest_files is given, the manifest entry of every aggregated file is stored in it.
+    """
+    for chunk_start in range(0, len(filenames), chunk_size):
+        documents = load_documents(input_dir, filenames[chunk_start : chunk_start + chunk_size])
+        histories = aggregate_histories([(repo_name(filename), data) for filename, data, _ in documents])
+
+        # Dates are formatted once per chunk and looked up by day
+        chunk_days = [days for _, days, _ in histories if len(days)]
+        first_day = min((int(days[0]) for days in chunk_days), default=0)
+        dates = day_strings(first_day, max((int(days[-1]) for days in chunk_days), default=-1))
+        for (filename, data, fingerprint), (name, days, cumulative) in zip(documents, histories):
+            if manifest_files is not None:
+                manifest_files[filename] = manifest_entry(fingerprint, data, days, cumulative)
+            yield format_history_line(name, history_entry(days, cumulative, dates, first_day))
+
+
+def build_histories(input_dir, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Aggregate every repo_data file into output_file and record the manifest, returning the repository count."""
+    files = {}
+    generated_at = datetime.now().isoformat()
+    lines = generate_history_lines(input_dir, list_repo_files(input_dir), chunk_size, files)
+    count = write_histories(output_file, lines, generated_at)
+    atomic_write_json(
+        manifest_path(input_dir),
+        {"output": os.path.normpath(output_file), "generated_at": generated_at, "files": files},
+    )
+    return count
+
+
+def merge_history_lines(output_file, updates, removed, added):
+    """
+    Yield the lines of an existing history file with updates applied.
+
+    Unchanged repositories are copied as they are, appended days are added to the end of
+    their arrays, replaced and added repositories are written from their new histories.
+    """
+    decoder = json.JSONDecoder()
+    pending = sorted(added, key=repo_filename)
+    with open(output_file, "r", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("}}"):
+                break
+            line = line.removeprefix(",")
+            name, end = decoder.raw_decode(line)
+
+            # Files are kept in filename order, new repositories are merged into place
+            while pending and repo_filename(pending[0]) < repo_filename(name):
+                added_name = pending.pop(0)
+                yield format_history_line(added_name, history_entry(*updates[added_name][1:]))
+
+            if name in removed:
+                continue
+            if name not in updates:
+                yield line
+                continue
+
+            kind, days, cumulative = updates[name]
+            if kind == "replace":
+                yield format_history_line(name, history_entry(days, cumulative))
+                continue
+            entry = json.loads(line[end + 1 :])
+            for key, values in history_entry(days, cumulative).items():
+                entry[key].extend(values)
+            yield format_history_line(name, entry)
+
+    for added_name in pending:
+        yield format_history_line(added_name, history_entry(*updates[added_name][1:]))
+
+
+def update_histories(input_dir, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Bring output_file up to date with the repo_data files changed since the last run.
+
+    Files whose mtime and size match the manifest are not read. A changed file whose entries
+    up to the last aggregated day still hash the same only gets its later days appended,
+    starting from the saved running totals; any other change rebuilds that repository.
+    Returns counts per outcome, or None when there is no usable previous run.
+    """
+    manifest = load_manifest(input_dir)
+    if (
+        not manifest
+        or manifest.get("output") != os.path.normpath(output_file)
+        or manifest.get("generated_at") != read_generated_at(output_file)
+    ):
+        return None
+
+    previous = manifest["files"]
+    filenames = list_repo_files(input_dir)
+    files = {}
+    candidates = []
+    for filename in filenames:
+        entry = previous.get(filename)
+        stat = os.stat(os.path.join(input_dir, filename))
+        if entry and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+            files[filename] = entry
+        else:
+            candidates.append(filename)
+
+    current = set(filenames)
+    removed = {repo_name(filename) for filename in previous if filename not in current}
+    stats = {"unchanged": len(files), "appended": 0, "rebuilt": 0, "added": 0, "removed": len(removed)}
+    updates = {}
+    added = []
+
+    for chunk_start in range(0, len(candidates), chunk_size):
+        documents = []
+        chunk = candidates[chunk_start : chunk_start + chunk_size]
+        for filename, data, fingerprint in load_documents(input_dir, chunk):
+            entry = previous.get(filename)
+            if entry and entry["sha256"] == fingerprint["sha256"]:
+                files[filename] = {**entry, **fingerprint}
+                stats["unchanged"] += 1
+            elif entry and entry["last_day"] and series_hash(data, entry["last_day"]) == entry["series_sha256"]:
+                documents.append((filename, data, fingerprint, series_after(data, entry["last_day"]), entry))
+            else:
+                documents.append((filename, data, fingerprint, data, None))
+
+        histories = aggregate_histories([(repo_name(filename), subset) for filename, _, _, subset, _ in documents])
+        for (filename, data, fingerprint, _, entry), (name, days, cumulative) in zip(documents, histories):
+            if entry is None:
+                files[filename] = manifest_entry(fingerprint, data, days, cumulative)
+                updates[name] = ("replace", days, cumulative)
+                if filename in previous:
+                    stats["rebuilt"] += 1
+                else:
+                    stats["added"] += 1
+                    added.append(name)
+            elif len(days):
+                cumulative = cumulative + np.asarray(entry["totals"], dtype=np.int64)
+                files[filename] = manifest_entry(fingerprint, data, days, cumulative)
+                updates[name] = ("append", days, cumulative)
+                stats["appended"] += 1
+            else:
+                files[filename] = {**entry, **fingerprint}
+                stats["unchanged"] += 1
+
+    # Files that failed to load keep their previous line and are retried on the next run
+    for filename in candidates:
+        if filename not in files and filename in previous:
+            files[filename] = previous[filename]
+
+    generated_at = manifest["generated_at"]
+    if updates or removed:
+        generated_at = datetime.now().isoformat()
+        write_histories(output_file, merge_history_lines(output_file, updates, removed, added), generated_at)
+    atomic_write_json(
+        manifest_path(input_dir),
+        {"output": os.path.normpath(output_file), "generated_at": generated_at, "files": files},
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate daily repository data into cumulative histories")
+    parser.add_argument("--input-dir", default=DEFAULT_INPUT_DIR, help="Directory with repo_data JSON files")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_FILE, help="History file to write")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Repositories aggregated per NumPy pass (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="Rebuild every history instead of updating the changed repositories"
+    )
+    args = parser.parse_args()
+
+    if args.chunk_size <= 0:
+        print("Error: --chunk-size must be greater than 0")
+        sys.exit(1)
+    if not os.path.isdir(args.input_dir):
+        print(f"Error: Directory '{args.input_dir}' not found")
+        sys.exit(1)
+
+    start_time = time.time()
+    stats = None if args.full else update_histories(args.input_dir, args.output, args.chunk_size)
+    if stats is None:
+        count = build_histories(args.input_dir, args.output, args.chunk_size)
+        print(f"Aggregated {count} repositories into {args.output} in {time.time() - start_time:.2f} seconds")
+    else:
+        print(
+            f"Updated {args.output} in {time.time() - start_time:.2f} seconds: "
+            f"{stats['appended']} appended, {stats['rebuilt']} rebuilt, {stats['added']} added, "
+            f"{stats['removed']} removed, {stats['unchanged']} unchanged"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Shared GitHub HTTP transport
+
+Provides token resolution, reusable request headers and a pooled keep-alive
+session so every script reuses TCP/TLS connections to the GitHub API.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Overridable with the same variables GitHub Actions sets, e.g. to point every script at github_standin.py
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.environ.get("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+DEFAULT_USER_AGENT = "Python-Framework-Tracker"
+DEFAULT_POOL_SIZE = 10
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+
+def get_github_token() -> Optional[str]:
+    """Get GitHub token from environment or file."""
+    token = os.environ.get("GITHUB_TOKEN")
+    if token:
+        return token
+    try:
+        with open("access_token.txt", "r") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def get_github_tokens(filename: str = "access_tokens.txt") -> List[str]:
+    """
+    Get every GitHub token available for a token pool.
+
+    Reads GITHUB_TOKENS (separated by commas or whitespace), then a file with one token per
+    line, and falls back to the single token of get_github_token.
+    """
+    tokens = os.environ.get("GITHUB_TOKENS", "").replace(",", " ").split()
+    if not tokens:
+        try:
+            with open(filename, "r") as f:
+                tokens = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+        except FileNotFoundError:
+            pass
+    if not tokens:
+        token = get_github_token()
+        tokens = [token] if token else []
+    # The same token listed twice shares one budget, keep it once
+    return list(dict.fromkeys(tokens))
+
+
+def build_headers(token: Optional[str] = None, user_agent: str = DEFAULT_USER_AGENT) -> Dict[str, str]:
+    """Build request headers with optional bearer authentication."""
+    headers = {"User-Agent": user_agent}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def mount_pool(session: requests.Session, pool_size: int) -> None:
+    """Mount connection pools of pool_size for https and http endpoints, closing the adapters they replace."""
+    for prefix in ("https://", "http://"):
+        previous = session.adapters.get(prefix)
+        session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        if previous is not None:
+            # Releases the idle connections of the old pool, connections in use close when returned
+            previous.close()
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Create a keep-alive session whose connection pool can serve pool_size concurrent requests."""
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    mount_pool(session, pool_size)
+    return session
+
+
+def get_session(pool_size: Optional[int] = None) -> requests.Session:
+    """Get the shared session, growing its connection pool when more concurrent workers need it."""
+    global _session, _session_pool_size
+
+    with _session_lock:
+        wanted = pool_size or DEFAULT_POOL_SIZE
+        if _session is None:
+            _session = create_session(wanted)
+            _session_pool_size = wanted
+        elif wanted > _session_pool_size:
+            mount_pool(_session, wanted)
+            _session_pool_size = wanted
+        return _session
+
+
+def configure_pool(workers: int) -> requests.Session:
+    """
+    Size the shared connection pool for the given number of concurrent workers.
+
+    Call it before the workers start, growing the pool later replaces the adapter under requests in flight.
+    """
+    return get_session(max(workers, 1))
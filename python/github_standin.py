@@ -0,0 +1,678 @@
+#!/usr/bin/env python3
+"""
+GitHub API Stand-in Server
+
+A local HTTP server that answers the GraphQL and REST requests made by the fetchers, so
+they can be exercised and benchmarked without network access or a token. Three sources
+of responses are supported:
+
+- synthetic: deterministic repositories generated from the owner/name and a seed, with
+  cursor pagination over stargazers, forks, issues and pull requests, search ranges and
+  the aliased snapshot queries
+- replay: responses recorded into a JSONL cassette, served in the order they were recorded
+- record: requests proxied to an upstream API and appended to a cassette
+
+Latency, server errors, secondary rate limits and the primary rate limit (with its
+X-RateLimit-* headers and 403 once exhausted) can be injected on top of any source.
+
+Point the scripts at it through the endpoint override of github_client:
+
+    python/github_standin.py --port 8765 --stars 5000 --latency-ms 40 &
+    GITHUB_API_URL=http://127.0.0.1:8765 GITHUB_GRAPHQL_URL=http://127.0.0.1:8765/graphql \\
+        GITHUB_TOKEN=offline python/fetcher.py
+"""
+
+import argparse
+import base64
+import bisect
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_START = "2015-01-01T00:00:00Z"
+DEFAULT_END = "2025-01-01T00:00:00Z"
+
+# Synthetic connection sizes, scaled per repository by 0.5x to 1.5x from its name
+DEFAULT_COUNTS = {"stars": 2000, "forks": 400, "issues": 800, "pull_requests": 600}
+CONNECTIONS = {"stargazers": "stars", "forks": "forks", "issues": "issues", "pullRequests": "pull_requests"}
+
+# Rate limit resources as GitHub reports them: (limit, window in seconds)
+DEFAULT_RATE_LIMITS = {"core": (5000, 3600), "graphql": (5000, 3600), "search": (30, 60)}
+SEARCH_RESULT_LIMIT = 1000
+
+# Response headers worth keeping in a cassette
+RECORDED_HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Last-Modified",
+    "Retry-After",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+    "X-RateLimit-Used",
+    "X-RateLimit-Resource",
+)
+
+REPOSITORY_PATTERN = re.compile(
+    r'(?:(\w+)\s*:\s*)?\brepository\(\s*owner:\s*(\$\w+|"[^"]*")\s*,\s*name:\s*(\$\w+|"[^"]*")\s*\)\s*\{'
+)
+CONNECTION_PATTERN = re.compile(
+    r"(?:(\w+)\s*:\s*)?\b(stargazers|forks|issues|pullRequests)\b\s*(?:\(([^()]*)\))?\s*\{"
+)
+SEARCH_PATTERN = re.compile(r"(?:(\w+)\s*:\s*)?\bsearch\(([^()]*)\)\s*\{")
+FRAGMENT_SPREAD_PATTERN = re.compile(r"\.\.\.\s*([A-Za-z_]\w*)")
+PR_STATES = ("OPEN", "CLOSED", "MERGED", "CLOSED", "MERGED", "OPEN", "CLOSED", "MERGED", "CLOSED", "MERGED")
+ISSUE_STATES = ("OPEN", "CLOSED", "CLOSED", "CLOSED", "CLOSED")
+
+
+def parse_timestamp(value):
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+
+
+def format_timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def encode_cursor(position):
+    return base64.b64encode(f"cursor:v2:{position}".encode("ascii")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Return the position a cursor points at, -1 for no cursor."""
+    if not cursor:
+        return -1
+    try:
+        return int(base64.b64decode(cursor).decode("ascii").rsplit(":", 1)[1])
+    except (ValueError, IndexError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def selection_body(text, start):
+    """Return the text of the selection set whose opening brace is at start."""
+    depth = 0
+    for index in range(start, len(text)):
+        if text[index] == "{":
+            depth += 1
+        elif text[index] == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1 : index]
+    return text[start + 1 :]
+
+
+def fragment_body(query, name):
+    match = re.search(r"fragment\s+" + re.escape(name) + r"\s+on\s+\w+\s*\{", query)
+    return selection_body(query, match.end() - 1) if match else ""
+
+
+class StandinConfig:
+    def __init__(
+        self,
+        counts=None,
+        start=DEFAULT_START,
+        end=DEFAULT_END,
+        seed=0,
+        latency_ms=0.0,
+        jitter_ms=0.0,
+        error_rate=0.0,
+        secondary_rate_limit_rate=0.0,
+        rate_limits=None,
+        replay=None,
+        record=None,
+        upstream=None,
+        synthetic_fallback=True,
+    ):
+        self.counts = dict(DEFAULT_COUNTS, **(counts or {}))
+        self.start = parse_timestamp(start)
+        self.end = parse_timestamp(end)
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.secondary_rate_limit_rate = secondary_rate_limit_rate
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS, **(rate_limits or {}))
+        self.replay = replay
+        self.record = record
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.synthetic_fallback = synthetic_fallback
+
+
+class SyntheticRepository:
+    """A repository whose edges are computed from their index instead of being stored."""
+
+    def __init__(self, owner, name, config):
+        digest = hashlib.sha256(f"{config.seed}:{owner}/{name}".lower().encode("utf-8")).digest()
+        scale = 0.5 + int.from_bytes(digest[:4], "big") / 0xFFFFFFFF
+        self.owner = owner
+        self.name = name
+        self.counts = {metric: int(count * scale) for metric, count in config.counts.items()}
+        self.start = config.start
+        self.end = config.end
+
+    def timestamp(self, metric, index):
+        """Edges are spread evenly over the repository lifetime in index order."""
+        count = self.counts[metric]
+        return self.start + (index + 1) * (self.end - self.start) // (count + 1)
+
+    def state(self, metric, index):
+        states = PR_STATES if metric == "pull_requests" else ISSUE_STATES
+        return states[index % len(states)]
+
+    def count_states(self, metric, states):
+        count = self.counts[metric]
+        if metric not in ("issues", "pull_requests") or not states:
+            return count
+        cycle = PR_STATES if metric == "pull_requests" else ISSUE_STATES
+        return sum(
+            (count - residue + len(cycle) - 1) // len(cycle)
+            for residue, state in enumerate(cycle)
+            if state in states and count > residue
+        )
+
+    def index_range(self, metric, lo, hi):
+        """Return the [first, last) indexes of edges created within [lo, hi] seconds."""
+        indexes = range(self.counts[metric])
+        first = bisect.bisect_left(indexes, lo, key=lambda index: self.timestamp(metric, index))
+        last = bisect.bisect_right(indexes, hi, key=lambda index: self.timestamp(metric, index))
+        return first, last
+
+    def edge(self, metric, index):
+        created_at = format_timestamp(self.timestamp(metric, index))
+        node_id = f"{metric}:{self.owner}/{self.name}:{index}"
+        if metric == "stars":
+            return {"starredAt": created_at, "node": {"id": node_id}}
+        node = {"id": node_id, "createdAt": created_at}
+        if metric in ("issues", "pull_requests"):
+            state = self.state(metric, index)
+            # Closed and merged items are closed a day after creation
+            closed_at = format_timestamp(self.timestamp(metric, index) + 86400) if state != "OPEN" else None
+            node.update({"state": state, "closedAt": closed_at})
+            if metric == "pull_requests":
+                node["mergedAt"] = closed_at if state == "MERGED" else None
+        return {"node": node}
+
+    def rest(self):
+        open_issues = self.count_states("issues", ("OPEN",)) + self.count_states("pull_requests", ("OPEN",))
+        return {
+            "name": self.name,
+            "full_name": f"{self.owner}/{self.name}",
+            "html_url": f"https://github.com/{self.owner}/{self.name}",
+            "stargazers_count": self.counts["stars"],
+            "forks_count": self.counts["forks"],
+            "open_issues_count": open_issues,
+            "created_at": format_timestamp(self.start),
+            "pushed_at": format_timestamp(self.end),
+        }
+
+
+class GraphQLResolver:
+    """Answers the query shapes the fetchers send by matching their selections, not a full GraphQL engine."""
+
+    def __init__(self, config):
+        self.config = config
+
+    def repository(self, owner, name):
+        return SyntheticRepository(owner, name, self.config)
+
+    def resolve(self, query, variables, rate_limit):
+        data = {}
+        for match in REPOSITORY_PATTERN.finditer(query):
+            alias = match.group(1) or "repository"
+            owner = self._value(match.group(2), variables)
+            name = self._value(match.group(3), variables)
+            selection = selection_body(query, match.end() - 1)
+            for spread in FRAGMENT_SPREAD_PATTERN.findall(selection):
+                selection += fragment_body(query, spread)
+            data[alias] = self._repository(self.repository(owner, name), selection, variables)
+
+        for match in SEARCH_PATTERN.finditer(query):
+            alias = match.group(1) or "search"
+            data[alias] = self._search(match.group(2), variables)
+
+        if re.search(r"\brateLimit\b", query):
+            data["rateLimit"] = rate_limit
+        return data
+
+    @staticmethod
+    def _value(token, variables):
+        token = token.strip()
+        if token.startswith("$"):
+            return variables.get(token[1:])
+        if token == "null":
+            return None
+        return json.loads(token)
+
+    def _repository(self, repo, selection, variables):
+        result = {
+            "name": repo.name,
+            "url": f"https://github.com/{repo.owner}/{repo.name}",
+            "createdAt": format_timestamp(repo.start),
+            "pushedAt": format_timestamp(repo.end),
+            "stargazerCount": repo.counts["stars"],
+            "forkCount": repo.counts["forks"],
+        }
+        for match in CONNECTION_PATTERN.finditer(selection):
+            alias = match.group(1) or match.group(2)
+            body = selection_body(selection, match.end() - 1)
+            result[alias] = self._connection(repo, CONNECTIONS[match.group(2)], match.group(3) or "", body, variables)
+        return result
+
+    def _connection(self, repo, metric, arguments, body, variables):
+        states = re.search(r"states:\s*\[([^\]]*)\]", arguments)
+        states = re.findall(r"\w+", states.group(1)) if states else None
+        result = {"totalCount": repo.count_states(metric, states)}
+        if "edges" not in body and "pageInfo" not in body:
+            return result
+
+        count = repo.counts[metric]
+        first = re.search(r"\bfirst:\s*(\d+)", arguments)
+        last = re.search(r"\blast:\s*(\d+)", arguments)
+        after = re.search(r"\bafter:\s*(\$\w+|\"[^\"]*\"|null)", arguments)
+        descending = re.search(r"direction:\s*DESC", arguments) is not None
+
+        if last:
+            positions = range(max(0, count - int(last.group(1))), count)
+        else:
+            start = decode_cursor(self._value(after.group(1), variables) if after else None) + 1
+            size = int(first.group(1)) if first else 100
+            positions = range(min(start, count), min(start + size, count))
+
+        result["edges"] = [repo.edge(metric, count - 1 - p if descending else p) for p in positions]
+        result["pageInfo"] = {
+            "hasNextPage": positions.stop < count,
+            "hasPreviousPage": positions.start > 0,
+            "startCursor": encode_cursor(positions.start) if positions else None,
+            "endCursor": encode_cursor(positions.stop - 1) if positions else None,
+        }
+        return result
+
+    def _search(self, arguments, variables):
+        query = self._value(re.search(r"query:\s*(\$\w+|\"[^\"]*\")", arguments).group(1), variables) or ""
+        after = re.search(r"\bafter:\s*(\$\w+|\"[^\"]*\"|null)", arguments)
+        first = re.search(r"\bfirst:\s*(\d+)", arguments)
+        cursor = self._value(after.group(1), variables) if after else None
+        return self.search(query, cursor, int(first.group(1)) if first else 100)
+
+    def search(self, query, cursor=None, first=100):
+        """Answer an issue search such as "repo:owner/name is:pr created:a..b"."""
+        repo_match = re.search(r"repo:([^/\s]+)/(\S+)", query)
+        if not repo_match:
+            return {"issueCount": 0, "pageInfo": {"hasNextPage": False, "endCursor": None}, "edges": []}
+        repo = self.repository(repo_match.group(1), repo_match.group(2))
+        metric = "pull_requests" if re.search(r"\b(is|type):pr\b", query) else "issues"
+
+        lo, hi = repo.start, repo.end
+        created = re.search(r"created:(\S+)\.\.(\S+)", query)
+        if created:
+            lo, hi = parse_timestamp(created.group(1)), parse_timestamp(created.group(2))
+        first_index, last_index = repo.index_range(metric, lo, hi)
+        total = max(0, last_index - first_index)
+
+        # Like GitHub, only the first 1,000 results of a search can be paged through
+        reachable = min(total, SEARCH_RESULT_LIMIT)
+        start = decode_cursor(cursor) + 1
+        positions = range(min(start, reachable), min(start + first, reachable))
+        return {
+            "issueCount": total,
+            "pageInfo": {
+                "hasNextPage": positions.stop < reachable,
+                "endCursor": encode_cursor(positions.stop - 1) if positions else None,
+            },
+            "edges": [{"node": repo.edge(metric, first_index + p)["node"]} for p in positions],
+        }
+
+
+class RateLimits:
+    """Primary rate limit budget per resource, reset at the end of each window."""
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.used = {}
+        self.resets = {}
+        self._lock = threading.Lock()
+
+    def spend(self, resource, cost=1):
+        """Charge cost points, returning (allowed, headers)."""
+        limit, window = self.limits[resource]
+        now = time.time()
+        with self._lock:
+            if self.resets.get(resource, 0) <= now:
+                self.resets[resource] = int(now) + window
+                self.used[resource] = 0
+            allowed = self.used[resource] + cost <= limit
+            if allowed:
+                self.used[resource] += cost
+            return allowed, self._headers(resource)
+
+    def status(self, resource):
+        limit, window = self.limits[resource]
+        with self._lock:
+            if self.resets.get(resource, 0) <= time.time():
+                return {"limit": limit, "used": 0, "remaining": limit, "reset": int(time.time()) + window}
+            used = self.used[resource]
+            return {"limit": limit, "used": used, "remaining": limit - used, "reset": self.resets[resource]}
+
+    def _headers(self, resource):
+        limit, _ = self.limits[resource]
+        used = self.used[resource]
+        return {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(0, limit - used)),
+            "X-RateLimit-Reset": str(self.resets[resource]),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Resource": resource,
+        }
+
+
+class Cassette:
+    """Recorded responses keyed by method, path and request body, replayed in recording order."""
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.entries = {}
+        self.positions = {}
+        self._lock = threading.Lock()
+        if filename:
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            key = self.key(entry["method"], entry["path"], entry["body"])
+                            self.entries.setdefault(key, []).append(entry)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def key(method, path, body):
+        return method, path, json.dumps(body, sort_keys=True)
+
+    def match(self, method, path, body):
+        """Return the next recorded response of a request, repeating the last one once they run out."""
+        key = self.key(method, path, body)
+        with self._lock:
+            entries = self.entries.get(key)
+            if not entries:
+                return None
+            position = self.positions.get(key, 0)
+            self.positions[key] = min(position + 1, len(entries) - 1)
+            return entries[position]
+
+    def append(self, entry):
+        with self._lock:
+            with open(self.filename, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, StandinRequestHandler)
+        self.config = config
+        self.resolver = GraphQLResolver(config)
+        self._rate_limits = {}
+        self._rate_limits_lock = threading.Lock()
+        self.replay = Cassette(config.replay) if config.replay else None
+        self.recorder = Cassette(config.record) if config.record else None
+        self.random = random.Random(config.seed)
+        self.random_lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rate_limits(self, authorization):
+        """Budgets of one credential, like GitHub every token has its own."""
+        with self._rate_limits_lock:
+            if authorization not in self._rate_limits:
+                self._rate_limits[authorization] = RateLimits(self.config.rate_limits)
+            return self._rate_limits[authorization]
+
+    def roll(self):
+        with self.random_lock:
+            self.requests += 1
+            return self.random.random(), self.random.uniform(-1.0, 1.0)
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET", None)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except json.JSONDecodeError:
+            self._send(400, {"message": "Problems parsing JSON"})
+            return
+        self._handle("POST", body)
+
+    def _handle(self, method, body):
+        config = self.server.config
+        chance, jitter = self.server.roll()
+        delay = config.latency_ms + config.jitter_ms * jitter
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if self.server.recorder:
+            self._proxy(method, body)
+            return
+
+        if chance < config.error_rate:
+            self._send(502, {"message": "Server Error"})
+            return
+        if chance < config.error_rate + config.secondary_rate_limit_rate:
+            self._send(
+                403,
+                {"message": "You have exceeded a secondary rate limit. Please wait a few minutes and try again."},
+                {"Retry-After": "1"},
+            )
+            return
+
+        if self.server.replay:
+            entry = self.server.replay.match(method, self.path, body)
+            if entry:
+                self._send(entry["status"], entry["response"], entry.get("headers", {}))
+                return
+            if not config.synthetic_fallback:
+                self._send(404, {"message": f"No recorded response for {method} {self.path}"})
+                return
+
+        path = urlparse(self.path).path.rstrip("/")
+        if method == "POST" and path == "/graphql":
+            self._graphql(body or {})
+        elif method == "GET" and path == "/rate_limit":
+            rate_limits = self.server.rate_limits(self.headers.get("Authorization"))
+            resources = {name: rate_limits.status(name) for name in config.rate_limits}
+            self._send(200, {"resources": resources, "rate": resources["core"]})
+        elif method == "GET" and path == "/search/issues":
+            self._search_issues()
+        elif method == "GET" and re.fullmatch(r"/repos/[^/]+/[^/]+", path):
+            self._repository(path)
+        else:
+            self._send(404, {"message": "Not Found"})
+
+    def _charge(self, resource):
+        allowed, headers = self.server.rate_limits(self.headers.get("Authorization")).spend(resource)
+        if not allowed:
+            self._send(403, {"message": "API rate limit exceeded for user ID 0."}, headers)
+        return allowed, headers
+
+    def _graphql(self, body):
+        query = body.get("query") or ""
+        allowed, headers = self._charge("graphql")
+        if not allowed:
+            return
+        status = self.server.rate_limits(self.headers.get("Authorization")).status("graphql")
+        rate_limit = {
+            "cost": 1,
+            "remaining": status["remaining"],
+            "resetAt": format_timestamp(status["reset"]),
+        }
+        try:
+            data = self.server.resolver.resolve(query, body.get("variables") or {}, rate_limit)
+        except (ValueError, AttributeError) as e:
+            self._send(200, {"errors": [{"message": str(e)}]}, headers)
+            return
+        self._send(200, {"data": data}, headers)
+
+    def _search_issues(self):
+        allowed, headers = self._charge("search")
+        if not allowed:
+            return
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        search = self.server.resolver.search(query.replace("+", " "))
+        self._send(200, {"total_count": search["issueCount"], "incomplete_results": False, "items": []}, headers)
+
+    def _repository(self, path):
+        _, _, owner, name = path.split("/")
+        body = self.server.resolver.repository(owner, name).rest()
+        etag = '"' + hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()[:32] + '"'
+
+        # Conditional requests answered with 304 do not count against the rate limit
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, None, {"ETag": etag})
+            return
+        allowed, headers = self._charge("core")
+        if allowed:
+            self._send(200, body, dict(headers, ETag=etag))
+
+    def _proxy(self, method, body):
+        skipped = ("host", "content-length")
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in skipped}
+        upstream = self.server.config.upstream + self.path
+        try:
+            response = requests.request(method, upstream, headers=headers, json=body, timeout=60)
+        except requests.exceptions.RequestException as e:
+            self._send(502, {"message": f"Upstream request failed: {e}"})
+            return
+
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        recorded = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        # Credentials are never written, only the request line and body
+        self.server.recorder.append(
+            {
+                "method": method,
+                "path": self.path,
+                "body": body,
+                "status": response.status_code,
+                "headers": recorded,
+                "response": payload,
+            }
+        )
+        self._send(response.status_code, payload, recorded)
+
+    def _send(self, status, payload, headers=None):
+        data = b"" if payload is None else json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            if name.lower() != "content-type":
+                self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(data)
+
+
+def start_standin(config=None, host=DEFAULT_HOST, port=0):
+    """Start a stand-in server on a background thread, port 0 picks a free port. Returns the server."""
+    server = StandinServer((host, port), config or StandinConfig())
+    thread = threading.Thread(target=server.serve_forever, name="github-standin", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded or synthetic GitHub API responses locally")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data and injected faults")
+    parser.add_argument("--stars", type=int, default=DEFAULT_COUNTS["stars"], help="Mean stargazers per repository")
+    parser.add_argument("--forks", type=int, default=DEFAULT_COUNTS["forks"], help="Mean forks per repository")
+    parser.add_argument("--issues", type=int, default=DEFAULT_COUNTS["issues"], help="Mean issues per repository")
+    parser.add_argument(
+        "--pull-requests", type=int, default=DEFAULT_COUNTS["pull_requests"], help="Mean pull requests per repository"
+    )
+    parser.add_argument("--start", default=DEFAULT_START, help="Creation time of synthetic repositories")
+    parser.add_argument("--end", default=DEFAULT_END, help="Time of the last synthetic edge")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- variation of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 502")
+    parser.add_argument(
+        "--secondary-rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests answered with a secondary rate limit 403 and Retry-After",
+    )
+    parser.add_argument("--rate-limit", type=int, default=5000, help="Hourly core and GraphQL budget")
+    parser.add_argument("--search-rate-limit", type=int, default=30, help="Per-minute search budget")
+    parser.add_argument("--replay", help="Serve responses recorded in this JSONL cassette")
+    parser.add_argument(
+        "--strict", action="store_true", help="Answer requests missing from the cassette with 404, not synthetic data"
+    )
+    parser.add_argument("--record", help="Proxy requests to --upstream and append them to this JSONL cassette")
+    parser.add_argument("--upstream", default="https://api.github.com", help="API recorded from in --record mode")
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        counts={
+            "stars": args.stars,
+            "forks": args.forks,
+            "issues": args.issues,
+            "pull_requests": args.pull_requests,
+        },
+        start=args.start,
+        end=args.end,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        secondary_rate_limit_rate=args.secondary_rate_limit_rate,
+        rate_limits={
+            "core": (args.rate_limit, 3600),
+            "graphql": (args.rate_limit, 3600),
+            "search": (args.search_rate_limit, 60),
+        },
+        replay=args.replay,
+        record=args.record,
+        upstream=args.upstream if args.record else None,
+        synthetic_fallback=not args.strict,
+    )
+    server = StandinServer((args.host, args.port), config)
+    mode = "recording" if args.record else "replaying" if args.replay else "synthetic"
+    print(f"Serving {mode} GitHub API stand-in on {server.url}")
+    print(f"  GITHUB_API_URL={server.url} GITHUB_GRAPHQL_URL={server.url}/graphql")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
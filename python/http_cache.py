@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Conditional-Request Cache for GitHub REST Snapshots
+
+Stores the ETag / Last-Modified validators and body of REST GET responses on disk and
+revalidates them with If-None-Match / If-Modified-Since. GitHub answers an unchanged
+resource with 304 Not Modified, which does not count against the rate limit and carries
+no body. The cache is bounded in size, least recently used entries are evicted first.
+
+The cache directory defaults to .http_cache and can be moved with the GITHUB_HTTP_CACHE
+environment variable, setting it to "off" disables caching.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from atomic_io import atomic_write_json
+
+DEFAULT_CACHE_DIR = ".http_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Eviction frees space down to this share of the limit so it does not run on every store
+EVICTION_TARGET = 0.9
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ConditionalCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._sizes = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith(".json"):
+                self._sizes[entry.name] = entry.stat().st_size
+        self._total = sum(self._sizes.values())
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """
+        Key entries by URL only.
+
+        Workflows get a new GITHUB_TOKEN on every run, a key on the credentials would never match
+        the restored cache. The cached resources are public repositories, which read the same for
+        every token.
+        """
+        return f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def get_json(self, http: requests.Session, url: str, headers: Dict[str, str]) -> Dict:
+        """GET url and return its JSON body, revalidating a cached copy instead of downloading it again."""
+        key = self.cache_key(url)
+        entry = self._load(key)
+
+        request_headers = dict(headers)
+        if entry and entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = http.get(url, headers=request_headers)
+        if response.status_code == 304 and entry:
+            # Refresh the entry's mtime so eviction sees it as recently used
+            self._touch(key)
+            with self._lock:
+                self.hits += 1
+            return entry["body"]
+
+        response.raise_for_status()
+        body = response.json()
+        with self._lock:
+            self.misses += 1
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._store(key, {"url": url, "etag": etag, "last_modified": last_modified, "body": body})
+        return body
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "not_modified": self.hits,
+                "fetched": self.misses,
+                "entries": len(self._sizes),
+                "bytes": self._total,
+            }
+
+    def _load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.cache_dir, key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _touch(self, key: str) -> None:
+        try:
+            os.utime(os.path.join(self.cache_dir, key))
+        except FileNotFoundError:
+            pass
+
+    def _store(self, key: str, entry: Dict) -> None:
+        path = os.path.join(self.cache_dir, key)
+        entry["stored_at"] = time.time()
+        atomic_write_json(path, entry)
+        with self._lock:
+            size = os.path.getsize(path)
+            self._total += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache is back under its target size."""
+        entries = []
+        for name in list(self._sizes):
+            try:
+                entries.append((os.stat(os.path.join(self.cache_dir, name)).st_mtime, name))
+            except FileNotFoundError:
+                self._total -= self._sizes.pop(name)
+
+        for _, name in sorted(entries):
+            if self._total <= self.max_bytes * EVICTION_TARGET:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            self._total -= self._sizes.pop(name)
+
+
+def get_http_cache() -> Optional[ConditionalCache]:
+    """Get the shared cache, None when GITHUB_HTTP_CACHE is set to "off"."""
+    global _cache
+
+    cache_dir = os.environ.get("GITHUB_HTTP_CACHE", DEFAULT_CACHE_DIR)
+    if cache_dir.lower() in ("off", "0", "false", ""):
+        return None
+
+    with _cache_lock:
+        if _cache is None or _cache.cache_dir != cache_dir:
+            _cache = ConditionalCache(cache_dir)
+        return _cache
+
+
+def get_json(http: requests.Session, url: str, headers: Dict[str, str]) -> Dict:
+    """GET a REST resource through the shared cache, or directly when caching is off."""
+    cache = get_http_cache()
+    if cache is not None:
+        return cache.get_json(http, url, headers)
+
+    response = http.get(url, headers=headers)
+    response.raise_for_status()
+    return response.json()
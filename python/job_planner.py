@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Batch Job Planning
+
+Fetches the star, fork, issue and pull request totals of every pending repository with the
+aliased snapshot query of fetcher.py (one request per 25 repositories) and estimates the
+GraphQL pages each repository needs. The batch initializer submits the longest jobs first,
+so a giant repository does not start last and keep one worker busy long after the others
+have finished.
+
+The same estimates drive --plan dry runs, which turn pages into GraphQL points and a
+wall-clock estimate for a worker and token count, bounded by request latency, by the hourly
+budget and by the secondary rate limit the scheduler paces against, and a RunDeadline that
+stops time-budgeted runs from starting repositories they cannot finish.
+"""
+
+import heapq
+import math
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+
+from cursor_state import METRICS
+from fetcher import (
+    SNAPSHOT_CONNECTIONS_PER_REPO,
+    SNAPSHOT_MAX_CONNECTIONS_PER_QUERY,
+    get_repository_snapshots,
+    parse_repository_url,
+)
+from rate_limiter import DEFAULT_GRAPHQL_LIMIT, DEFAULT_POINTS_PER_MINUTE, DEFAULT_RESERVE
+from run_metrics import get_run_metrics
+from totals_index import get_totals_index
+
+# Every connection walk asks for first: 100
+PAGE_SIZE = 100
+
+# Request latency assumed when no previous run report tells the real one
+DEFAULT_PAGE_SECONDS = 1.0
+DEFAULT_REST_SECONDS = 0.5
+
+# GitHub-hosted runners cancel jobs after six hours, or earlier with timeout-minutes
+ACTIONS_JOB_LIMIT_MINUTES = 360
+REST_HOURLY_LIMIT = 5000
+
+# Seconds kept back before a deadline to save finished repositories and flush the journal
+DEFAULT_DEADLINE_MARGIN = 180
+
+# Keys of the snapshot data holding the total of each metric
+SNAPSHOT_TOTALS = {
+    "stars": "stars",
+    "forks": "forks",
+    "issues": "total_issues",
+    "pull_requests": "total_pull_requests",
+}
+
+
+def estimate_metric_pages(snapshot, previous=None):
+    """
+    Return {metric: pages} to walk, only the edges added since previous totals for a re-sync.
+
+    A walk always requests at least one page, even when it finds no new edges.
+    """
+    previous = previous or {}
+    pages = {}
+    for metric in METRICS:
+        new_edges = snapshot.get(SNAPSHOT_TOTALS[metric], 0) - previous.get(f"total_{metric}", 0)
+        pages[metric] = max(1, math.ceil(new_edges / PAGE_SIZE))
+    return pages
+
+
+def load_previous_totals(output_dir, incremental=False, store=None):
+    """Return {owner/repo: totals} of the data a re-sync resumes from, empty for a fresh load."""
+    if not incremental:
+        return {}
+    if store:
+        return {f"{owner}/{repo}": totals for owner, repo, totals in store.load_summaries()}
+    if not os.path.isdir(output_dir):
+        return {}
+    previous = {}
+    for filename, summary in get_totals_index(output_dir).summaries().items():
+        owner, _, repo = filename[: -len(".json")].partition("_")
+        previous[f"{owner}/{repo}"] = summary
+    return previous
+
+
+def plan_jobs(urls, token, output_dir="repo_data", incremental=False, store=None):
+    """
+    Estimate the pages of every repository and return its jobs, longest first.
+
+    Each job is a dict with url, repo, pages per metric, total_pages and known; repositories
+    the snapshot query could not see are costed at the median so they are neither started
+    first nor left to the end.
+    """
+    repos = {}
+    for url in urls:
+        try:
+            repos[url] = parse_repository_url(url.strip().rstrip("/"))
+        except ValueError:
+            repos[url] = None
+    snapshots = get_repository_snapshots(sorted({repo for repo in repos.values() if repo}), token)
+    previous = load_previous_totals(output_dir, incremental, store)
+
+    jobs = []
+    for url, repo in repos.items():
+        snapshot = snapshots.get(repo) if repo else None
+        key = "/".join(repo) if repo else url
+        pages = estimate_metric_pages(snapshot, previous.get(key)) if snapshot else {}
+        # One extra request checks access to the repository before the walks
+        jobs.append(
+            {"url": url, "repo": key, "pages": pages, "total_pages": 1 + sum(pages.values()), "known": bool(snapshot)}
+        )
+
+    known = [job["total_pages"] for job in jobs if job["known"]]
+    default = math.ceil(statistics.median(known)) if known else 1
+    for job in jobs:
+        if not job["known"]:
+            job["total_pages"] = default
+
+    # Longest processing time first keeps the makespan close to the optimum on a fixed worker count
+    return sorted(jobs, key=lambda job: -job["total_pages"])
+
+
+def summarize_plan(jobs):
+    """Return the totals of a plan as a dict for printing and the run report."""
+    pages_by_metric = {metric: sum(job["pages"].get(metric, 0) for job in jobs) for metric in METRICS}
+    largest = jobs[0] if jobs else None
+    return {
+        "repositories": len(jobs),
+        "unknown": sum(1 for job in jobs if not job["known"]),
+        "total_pages": sum(job["total_pages"] for job in jobs),
+        "pages_by_metric": pages_by_metric,
+        "largest": {"repo": largest["repo"], "pages": largest["total_pages"]} if largest else None,
+    }
+
+
+def print_plan(summary):
+    print(
+        f"[PLAN] {summary['repositories']} repositories, ~{summary['total_pages']:,} GraphQL pages "
+        f"({', '.join(f'{metric}: {pages:,}' for metric, pages in summary['pages_by_metric'].items())})"
+    )
+    if summary["largest"]:
+        print(f"[PLAN] Largest job: {summary['largest']['repo']} (~{summary['largest']['pages']:,} pages)")
+    if summary["unknown"]:
+        print(f"[PLAN] {summary['unknown']} repositories not found by the totals query, costed at the median")
+
+
+def snapshot_queries(repo_count):
+    """Return the aliased snapshot queries fetching the totals of repo_count repositories."""
+    return math.ceil(repo_count / (SNAPSHOT_MAX_CONNECTIONS_PER_QUERY // SNAPSHOT_CONNECTIONS_PER_REPO))
+
+
+def critical_path_pages(job, split_threshold=0):
+    """
+    Return the pages a repository takes from start to finish.
+
+    Its metric walks run side by side, so the longest walk decides, and walks above the split
+    threshold page from both ends at once.
+    """
+    if not job["known"]:
+        return max(1, math.ceil(job["total_pages"] / len(METRICS)))
+    longest = 0
+    for pages in job["pages"].values():
+        if split_threshold and pages * PAGE_SIZE > split_threshold:
+            pages = math.ceil(pages / 2)
+        longest = max(longest, pages)
+    return 1 + longest
+
+
+def estimate_batch_run(
+    jobs,
+    workers,
+    tokens,
+    page_seconds=DEFAULT_PAGE_SECONDS,
+    split_threshold=0,
+    hourly_limit=DEFAULT_GRAPHQL_LIMIT,
+    points_per_minute=DEFAULT_POINTS_PER_MINUTE,
+):
+    """Estimate the GraphQL points and wall-clock seconds of a batch run over planned jobs."""
+    # Every page costs one point, plus the planning query of the run itself
+    points = sum(job["total_pages"] for job in jobs) + snapshot_queries(len(jobs))
+
+    # Jobs are taken longest first by whichever worker frees up first
+    loads = [0.0] * max(1, workers)
+    for job in jobs:
+        heapq.heapreplace(loads, loads[0] + critical_path_pages(job, split_threshold) * page_seconds)
+
+    tokens = max(1, tokens)
+    # The scheduler spends each token's budget at full speed and waits for the reset once it is used up
+    window_points = tokens * max(1, hourly_limit - DEFAULT_RESERVE)
+    resets = math.ceil(points / window_points) - 1
+    bounds = {
+        "latency": max(loads),
+        "secondary limit": points * 60 / (tokens * points_per_minute),
+        # Equal to the secondary limit bound until the run needs a reset
+        "hourly budget": resets * 3600 + (points - resets * window_points) * 60 / (tokens * points_per_minute),
+    }
+    bound = max(bounds, key=bounds.get)
+    return {
+        "repositories": len(jobs),
+        "workers": workers,
+        "tokens": tokens,
+        "paced": True,
+        "page_seconds": page_seconds,
+        "points": points,
+        "hourly_budget": tokens * hourly_limit,
+        "rest_requests": 0,
+        "rest_budget": tokens * REST_HOURLY_LIMIT,
+        "bounds": {name: round(seconds, 1) for name, seconds in bounds.items()},
+        "bound": bound,
+        "seconds": round(bounds[bound], 1),
+    }
+
+
+def estimate_daily_run(repo_count, engine, concurrency=1, tokens=1, request_seconds=None):
+    """Estimate the requests, GraphQL points and wall-clock seconds of a fetcher.py run."""
+    if engine == "batched":
+        # One aliased snapshot query per chunk, no REST calls
+        graphql_requests = snapshot_queries(repo_count)
+        rest_requests = 0
+        request_seconds = request_seconds or DEFAULT_PAGE_SECONDS
+        latency = graphql_requests * request_seconds
+    else:
+        # One REST repository call and one GraphQL count query per repository, unchanged
+        # repositories revalidated from the HTTP cache cost no REST quota
+        graphql_requests = repo_count
+        rest_requests = repo_count
+        request_seconds = request_seconds or DEFAULT_REST_SECONDS
+        latency = repo_count * 2 * request_seconds / (concurrency if engine == "async" else 1)
+
+    tokens = max(1, tokens)
+    return {
+        "repositories": repo_count,
+        "engine": engine,
+        "tokens": tokens,
+        # fetcher.py is not paced by the scheduler, requests over the budget are rejected
+        "paced": False,
+        "page_seconds": request_seconds,
+        "points": graphql_requests,
+        "hourly_budget": tokens * DEFAULT_GRAPHQL_LIMIT,
+        "rest_requests": rest_requests,
+        "rest_budget": tokens * REST_HOURLY_LIMIT,
+        "bounds": {"latency": round(latency, 1)},
+        "bound": "latency",
+        "seconds": round(latency, 1),
+    }
+
+
+def check_limits(estimate, job_limit_minutes=ACTIONS_JOB_LIMIT_MINUTES):
+    """Return warnings for estimates that exceed the hourly budgets or the job time limit."""
+    warnings = []
+    if estimate["points"] > estimate["hourly_budget"]:
+        resets = math.ceil(estimate["points"] / estimate["hourly_budget"]) - 1
+        outcome = f"the run waits for {resets} rate limit reset(s)" if estimate["paced"] else "requests past it fail"
+        warnings.append(
+            f"{estimate['points']:,} GraphQL points exceed the hourly budget of {estimate['hourly_budget']:,} "
+            f"for {estimate['tokens']} token(s), {outcome}"
+        )
+    if estimate["rest_requests"] > estimate["rest_budget"]:
+        warnings.append(
+            f"{estimate['rest_requests']:,} REST requests exceed the hourly budget of {estimate['rest_budget']:,}"
+        )
+    limit_seconds = job_limit_minutes * 60
+    if estimate["seconds"] > limit_seconds:
+        runs = math.ceil(estimate["seconds"] / limit_seconds)
+        if estimate["bound"] == "latency":
+            advice = f"use more workers or split it with --shard i/{runs}"
+        else:
+            advice = f"add tokens or spread it over {runs} runs"
+        warnings.append(
+            f"Estimated {format_duration(estimate['seconds'])} exceeds the {job_limit_minutes}-minute job limit, "
+            f"{advice}"
+        )
+    return warnings
+
+
+def format_duration(seconds):
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {seconds:02d}s"
+
+
+def print_plan_table(jobs):
+    """Print the estimated pages per metric of every planned repository."""
+    width = max([len(job["repo"]) for job in jobs] + [len("repository")])
+    header = "".join(f"{metric:>15}" for metric in METRICS)
+    print(f"{'repository':<{width}}{header}{'total':>10}")
+    for job in jobs:
+        pages = "".join(f"{job['pages'].get(metric, '?'):>15}" for metric in METRICS)
+        print(f"{job['repo']:<{width}}{pages}{job['total_pages']:>10}")
+
+
+def print_estimate(estimate, warnings):
+    """Print a run estimate and its warnings."""
+    bounds = ", ".join(f"{name} {format_duration(seconds)}" for name, seconds in estimate["bounds"].items())
+    print(f"[PLAN] {estimate['points']:,} GraphQL points, {estimate['rest_requests']:,} REST requests")
+    print(
+        f"[PLAN] Estimated wall clock: {format_duration(estimate['seconds'])} bound by {estimate['bound']} "
+        f"({bounds}; {estimate['page_seconds']:.2f}s per request)"
+    )
+    for warning in warnings:
+        print(f"[PLAN] Warning: {warning}")
+    if not warnings:
+        print("[PLAN] Fits the hourly budget and the job time limit")
+
+
+class RunDeadline:
+    def __init__(self, ends_at, margin=DEFAULT_DEADLINE_MARGIN, page_seconds=DEFAULT_PAGE_SECONDS):
+        self.ends_at = ends_at
+        self.margin = margin
+        # Used until the run has walked pages of its own
+        self.page_seconds = page_seconds
+
+    @classmethod
+    def parse(cls, deadline=None, time_budget=None, margin=DEFAULT_DEADLINE_MARGIN, page_seconds=DEFAULT_PAGE_SECONDS):
+        """Build a deadline from an ISO 8601 time or from minutes counted from now, raising ValueError if invalid."""
+        ends = []
+        if deadline:
+            try:
+                moment = datetime.fromisoformat(deadline)
+            except ValueError:
+                raise ValueError(f"Invalid deadline '{deadline}', expected an ISO 8601 time such as 2025-01-01T06:00Z")
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            ends.append(moment.timestamp())
+        if time_budget is not None:
+            if time_budget <= 0:
+                raise ValueError("Time budget must be greater than 0 minutes")
+            ends.append(time.time() + time_budget * 60)
+        if not ends:
+            return None
+        return cls(min(ends), margin, page_seconds)
+
+    def remaining(self):
+        """Seconds left for new work, the margin is already taken off."""
+        return self.ends_at - self.margin - time.time()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def seconds_per_page(self):
+        """Seconds a walk has taken per page in this run, rate-limit pacing included."""
+        return get_run_metrics().page_seconds() or self.page_seconds
+
+    def can_finish(self, pages):
+        """Return whether a repository whose longest walk is pages long fits in the time left."""
+        return pages * self.seconds_per_page() <= self.remaining()
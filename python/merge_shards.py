@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Shard Output Merger
+
+Combines the outputs of runs started with --shard i/N into the working tree and then
+generates the README files once:
+
+    python python/merge_shards.py shard-1 shard-2 shard-3 shard-4
+
+Every shard directory holds the repo_data directory and the run_report*.json files of one
+shard. A repository is taken from a shard when its data file, cursor state or live values
+(last_commit, open_issues) differ from the ones in ./repo_data. Shards are disjoint, so a
+repository changed by two shards means they overlapped; the one fetched last wins.
+
+Checkpoint journals are carried over the same way, so shards stopped by a deadline resume
+their walks in the next sharded run.
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+
+from atomic_io import atomic_write_json
+from checkpoint import CHECKPOINT_DIR
+from columnar_format import COLUMNAR_EXTENSION, read_summary
+from cursor_state import CURSOR_STATE_DIR
+from readme_generator import generate_readme_english, generate_readme_korean, load_existing_repo_data
+from run_metrics import DEFAULT_REPORT_FILE, merge_reports
+from totals_index import get_totals_index
+
+DATA_EXTENSIONS = (".json", COLUMNAR_EXTENSION)
+LIVE_KEYS = ("last_commit", "open_issues")
+
+
+def shard_data_dir(shard_dir):
+    """Return the repo_data directory of a shard, which may also be passed directly."""
+    nested = os.path.join(shard_dir, "repo_data")
+    return nested if os.path.isdir(nested) else shard_dir
+
+
+def same_file(path, other):
+    """Return whether two files exist with identical content."""
+    if not os.path.exists(path) or not os.path.exists(other):
+        return os.path.exists(path) == os.path.exists(other)
+    if os.path.getsize(path) != os.path.getsize(other):
+        return False
+    with open(path, "rb") as f, open(other, "rb") as g:
+        return f.read() == g.read()
+
+
+def repo_files(data_dir, name):
+    """Return the data and cursor files of one repository relative to its repo_data directory."""
+    files = [f"{name}{extension}" for extension in DATA_EXTENSIONS]
+    files.append(os.path.join(CURSOR_STATE_DIR, f"{name}.json"))
+    return [path for path in files if os.path.exists(os.path.join(data_dir, path))]
+
+
+def fetched_at(data_dir, name, summary):
+    """Return when a shard last fetched a repository, from its totals index or its data file."""
+    if summary.get("fetched_at"):
+        return summary["fetched_at"]
+    columnar_file = os.path.join(data_dir, f"{name}{COLUMNAR_EXTENSION}")
+    if os.path.exists(columnar_file):
+        try:
+            return read_summary(columnar_file).get("fetched_at", "")
+        except (OSError, ValueError):
+            return ""
+    return ""
+
+
+def collect_changes(shard_dirs, target_dir):
+    """Return {repository name: [candidate, ...]} for every repository some shard changed."""
+    target_summaries = get_totals_index(target_dir).summaries() if os.path.isdir(target_dir) else {}
+    changes = {}
+
+    for shard_dir in shard_dirs:
+        data_dir = shard_data_dir(shard_dir)
+        summaries = get_totals_index(data_dir).summaries()
+        names = {
+            os.path.splitext(filename)[0]
+            for filename in os.listdir(data_dir)
+            if os.path.splitext(filename)[1] in DATA_EXTENSIONS
+        }
+        changed = 0
+        for name in sorted(names):
+            summary = summaries.get(f"{name}.json", {})
+            target_summary = target_summaries.get(f"{name}.json", {})
+            files = repo_files(data_dir, name)
+            files_changed = [
+                path for path in files if not same_file(os.path.join(data_dir, path), os.path.join(target_dir, path))
+            ]
+            live = {key: summary[key] for key in LIVE_KEYS if key in summary}
+            live_changed = any(target_summary.get(key) != value for key, value in live.items())
+            if not files_changed and not live_changed:
+                continue
+            changed += 1
+            changes.setdefault(name, []).append(
+                {
+                    "shard": shard_dir,
+                    "data_dir": data_dir,
+                    "files": files,
+                    "live": live,
+                    "fetched_at": fetched_at(data_dir, name, summary),
+                }
+            )
+        print(f"Shard {shard_dir}: {changed} of {len(names)} repositories changed")
+    return changes
+
+
+def apply_changes(changes, target_dir):
+    """Copy the winning shard's files of every changed repository into target_dir."""
+    index = get_totals_index(target_dir)
+    conflicts = 0
+    for name, candidates in sorted(changes.items()):
+        # Later shards win ties so the merge follows the order the shards were given in
+        winner = max(enumerate(candidates), key=lambda item: (item[1]["fetched_at"], item[0]))[1]
+        if len(candidates) > 1:
+            conflicts += 1
+            shards = ", ".join(candidate["shard"] for candidate in candidates)
+            print(f"Warning: {name} was changed by several shards ({shards}), keeping {winner['shard']}")
+
+        for path in winner["files"]:
+            destination = os.path.join(target_dir, path)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copy2(os.path.join(winner["data_dir"], path), destination)
+
+        json_file = os.path.join(target_dir, f"{name}.json")
+        if os.path.exists(json_file):
+            with open(json_file, "rb") as f:
+                content = f.read()
+            index.update(json_file, json.loads(content), content, **winner["live"])
+    index.flush()
+    return conflicts
+
+
+def read_journals(checkpoint_dir):
+    """Return {filename: content} of the checkpoint journals in a directory."""
+    if not os.path.isdir(checkpoint_dir):
+        return {}
+    journals = {}
+    for filename in os.listdir(checkpoint_dir):
+        with open(os.path.join(checkpoint_dir, filename), "rb") as f:
+            journals[filename] = f.read()
+    return journals
+
+
+def merge_checkpoints(shard_dirs, target_dir):
+    """
+    Copy the checkpoint journals shards wrote and remove the ones they cleared after completing.
+
+    Every shard starts from the same tree and still holds the old journals of the other shards,
+    so a journal is only taken from a shard whose copy differs from the pre-merge baseline.
+    """
+    target_checkpoints = os.path.join(target_dir, CHECKPOINT_DIR)
+    baseline = read_journals(target_checkpoints)
+    copied, removed = 0, 0
+    for shard_dir in shard_dirs:
+        shard_checkpoints = os.path.join(shard_data_dir(shard_dir), CHECKPOINT_DIR)
+        if not os.path.isdir(shard_checkpoints):
+            # Nothing to carry, and without the directory cleared journals cannot be told apart
+            continue
+        journals = read_journals(shard_checkpoints)
+        for filename, content in sorted(journals.items()):
+            if baseline.get(filename) == content:
+                continue
+            os.makedirs(target_checkpoints, exist_ok=True)
+            shutil.copy2(os.path.join(shard_checkpoints, filename), os.path.join(target_checkpoints, filename))
+            copied += 1
+        # A baseline journal the shard no longer has was cleared by it
+        for filename in sorted(set(baseline) - set(journals)):
+            destination = os.path.join(target_checkpoints, filename)
+            if os.path.exists(destination):
+                os.remove(destination)
+                removed += 1
+    if copied or removed:
+        print(f"Checkpoint journals: {copied} carried over, {removed} cleared")
+
+
+def merge_run_reports(shard_dirs, report_file):
+    """Merge the run reports of all shards into one report file."""
+    reports = []
+    for shard_dir in shard_dirs:
+        for path in sorted(glob.glob(os.path.join(shard_dir, "run_report*.json"))):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    reports.append(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Failed to read run report {path}: {e}")
+    if not reports:
+        print("Warning: No shard run reports found")
+        return None
+
+    report = merge_reports(reports, "sharded")
+    atomic_write_json(report_file, report)
+    print(f"Merged {len(reports)} run reports into {report_file}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the outputs of sharded runs and generate the README once")
+    parser.add_argument("shards", nargs="+", help="Shard output directories holding repo_data and run_report*.json")
+    parser.add_argument(
+        "--report", default=DEFAULT_REPORT_FILE, help=f"Merged JSON run report file (default: {DEFAULT_REPORT_FILE})"
+    )
+    parser.add_argument("--no-readme", action="store_true", help="Merge only, do not generate the README files")
+    args = parser.parse_args()
+
+    missing = [shard_dir for shard_dir in args.shards if not os.path.isdir(shard_dir)]
+    if missing:
+        print(f"ERROR: Shard directories not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    # README generation and the fetchers read repo_data from the working directory
+    target_dir = "repo_data"
+    os.makedirs(target_dir, exist_ok=True)
+
+    changes = collect_changes(args.shards, target_dir)
+    conflicts = apply_changes(changes, target_dir)
+    print(f"Merged {len(changes)} changed repositories from {len(args.shards)} shards ({conflicts} conflicts)")
+    merge_checkpoints(args.shards, target_dir)
+
+    merge_run_reports(args.shards, args.report)
+
+    if args.no_readme:
+        return
+
+    repo_data = load_existing_repo_data()
+    if not repo_data:
+        print("No repository data found. Skipping README generation.")
+        return
+    print("Generating README files...")
+    generate_readme_english(repo_data)
+    generate_readme_korean(repo_data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Staged Fetch Pipeline
+
+Runs the work of a fetch run as three stages on their own threads, connected by bounded
+queues:
+- fetch workers only do network I/O and hand their results downstream
+- aggregator workers do the CPU work (merging per-day counts, building and encoding documents)
+- a single writer owns repo_data (or the SQLite store), so writes never contend
+
+A full queue blocks the stage feeding it, so memory is bounded by the queue depths and the
+run goes as fast as its slowest stage, which should be the API. Time a stage spends blocked
+on a full queue is recorded as the "backpressure" stage of the run metrics.
+
+An error escaping a stage thread (a write context that cannot be entered, an on_error handler
+that raises) is recorded, the stages keep draining their queues so no producer blocks, later
+payloads are dropped, and close() re-raises the error.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from run_metrics import get_run_metrics
+
+DEFAULT_QUEUE_DEPTH = 8
+DEFAULT_AGGREGATE_WORKERS = 2
+
+_STOP = object()
+
+
+class Done:
+    """Final result of an item that skips the remaining stages, such as a skipped or failed repository."""
+
+    def __init__(self, result):
+        self.result = result
+
+
+class StagedPipeline:
+    def __init__(
+        self,
+        aggregate,
+        write,
+        aggregate_workers=DEFAULT_AGGREGATE_WORKERS,
+        queue_depth=DEFAULT_QUEUE_DEPTH,
+        on_result=None,
+        on_error=None,
+        write_context=None,
+    ):
+        self.aggregate = aggregate
+        self.write = write
+        self.aggregate_workers = max(1, aggregate_workers)
+        self.on_result = on_result
+        self.on_error = on_error or (lambda payload, error: {"status": "error", "reason": str(error)})
+        # Entered by the writer thread around all of its writes, e.g. a store transaction
+        self.write_context = write_context or nullcontext
+        self.aggregate_queue = queue.Queue(maxsize=queue_depth)
+        self.write_queue = queue.Queue(maxsize=queue_depth)
+        self.results = []
+        self.error = None
+        self._aggregators = []
+        self._writer = None
+        self._writer_stopped = False
+
+    def start(self):
+        for index in range(self.aggregate_workers):
+            thread = threading.Thread(target=self._aggregate_loop, name=f"aggregate-{index}", daemon=True)
+            thread.start()
+            self._aggregators.append(thread)
+        self._writer = threading.Thread(target=self._write_loop, name="writer", daemon=True)
+        self._writer.start()
+        return self
+
+    def put(self, payload):
+        """Hand a fetched payload to the aggregators, blocking while their queue is full."""
+        self._put(self.aggregate_queue, payload)
+
+    def close(self):
+        """Wait until every payload put so far has been written and return the results in completion order."""
+        for _ in self._aggregators:
+            self.aggregate_queue.put(_STOP)
+        for thread in self._aggregators:
+            thread.join()
+        self.write_queue.put(_STOP)
+        self._writer.join()
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+    def run(self, items, fetch, fetch_workers):
+        """Fetch every item on fetch_workers threads and feed the results through the pipeline."""
+        self.start()
+
+        def fetch_and_put(item):
+            # After a stage failed the run is lost, so the remaining items are not fetched
+            if self.error is None:
+                self.put(self._call(fetch, item))
+
+        with ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as executor:
+            for _ in executor.map(fetch_and_put, items):
+                pass
+        return self.close()
+
+    def _call(self, stage, payload):
+        if isinstance(payload, Done):
+            return payload
+        try:
+            return stage(payload)
+        except Exception as e:
+            return Done(self.on_error(payload, e))
+
+    def _fail(self, stage, error):
+        if self.error is None:
+            self.error = error
+        print(f"Error: Pipeline {stage} stage failed: {error}")
+
+    @staticmethod
+    def _put(target, payload):
+        if target.full():
+            with get_run_metrics().stage("backpressure"):
+                target.put(payload)
+        else:
+            target.put(payload)
+
+    def _aggregate_loop(self):
+        while True:
+            payload = self.aggregate_queue.get()
+            if payload is _STOP:
+                return
+            if self.error is not None:
+                continue
+            try:
+                outcome = self._call(self.aggregate, payload)
+            except Exception as e:
+                self._fail("aggregate", e)
+                continue
+            self._put(self.write_queue, outcome)
+
+    def _write_loop(self):
+        try:
+            with self.write_context():
+                self._write_until_stop()
+        except Exception as e:
+            self._fail("write", e)
+        # Keep taking payloads so the aggregators never block on a full queue
+        while not self._writer_stopped:
+            self._writer_stopped = self.write_queue.get() is _STOP
+
+    def _write_until_stop(self):
+        while True:
+            payload = self.write_queue.get()
+            if payload is _STOP:
+                self._writer_stopped = True
+                return
+            if self.error is not None:
+                continue
+            outcome = self._call(self.write, payload)
+            result = outcome.result if isinstance(outcome, Done) else outcome
+            if result is None:
+                continue
+            self.results.append(result)
+            if self.on_result:
+                try:
+                    self.on_result(result)
+                except Exception as e:
+                    print(f"Warning: Failed to report pipeline result: {e}")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Rate-Limit-Aware Request Scheduler
+
+Token-bucket pacing for GitHub API requests driven by the live budget reported in
+the GraphQL rateLimit field and the X-RateLimit-* response headers:
+- Spends the remaining primary budget at full speed, spreading only its last minute over the reset window
+- Caps the request rate below GitHub's secondary (per-minute) limit
+- Waits for the reset when the budget is exhausted and honours Retry-After
+- Routes requests across a pool of tokens to the one with the most budget left
+"""
+
+import threading
+import time
+from datetime import datetime
+
+# GitHub GraphQL secondary limit is 2,000 points per minute, stay well below it
+DEFAULT_POINTS_PER_MINUTE = 1000
+DEFAULT_BURST = 20
+DEFAULT_RESERVE = 50
+SECONDARY_LIMIT_BACKOFF = 60
+
+# Budget assumed for a token that has not reported its rate limit yet, so unused tokens are tried first
+DEFAULT_GRAPHQL_LIMIT = 5000
+
+
+class RateLimitScheduler:
+    def __init__(
+        self,
+        resource="graphql",
+        reserve=DEFAULT_RESERVE,
+        burst=DEFAULT_BURST,
+        points_per_minute=DEFAULT_POINTS_PER_MINUTE,
+    ):
+        self.resource = resource
+        self.reserve = reserve
+        self.burst = burst
+        self.points_per_minute = points_per_minute
+
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.last_cost = 1
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _sustainable_rate(self, now):
+        """Points per second that can be spent without running into the reserve before reset."""
+        secondary_rate = self.points_per_minute / 60.0
+        if self.remaining is None or self.reset_at is None:
+            return secondary_rate
+
+        usable = self.remaining - self.reserve
+        window = self.reset_at - now
+        if window <= 0:
+            # Reset already passed, the next response will report the fresh budget
+            return secondary_rate
+        if usable <= 0:
+            return 0.0
+        # Full speed while the budget covers another minute of it, only the last of it is spread to the reset
+        if usable >= self.points_per_minute:
+            return secondary_rate
+        return min(secondary_rate, usable / window)
+
+    def _refill(self, rate):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * rate)
+
+    def acquire(self, cost=None):
+        """Block until a request of the given point cost may be sent, return the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                cost = cost or self.last_cost
+                now = time.time()
+                rate = self._sustainable_rate(now)
+                self._refill(rate)
+
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif rate <= 0:
+                    # Budget exhausted, hold every caller until the window resets
+                    self._blocked_until = max(self._blocked_until, self.reset_at + 1)
+                    wait = self._blocked_until - now
+                elif self._tokens >= cost:
+                    self._tokens -= cost
+                    if self.remaining is not None:
+                        self.remaining -= cost
+                    return waited
+                else:
+                    wait = (cost - self._tokens) / rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def update_from_headers(self, headers):
+        """Update the budget from X-RateLimit-* response headers."""
+        resource = headers.get("X-RateLimit-Resource")
+        if resource and resource != self.resource:
+            return
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_at = int(headers["X-RateLimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self._lock:
+            self.remaining = remaining
+            self.reset_at = reset_at
+            if "X-RateLimit-Limit" in headers:
+                self.limit = int(headers["X-RateLimit-Limit"])
+
+    def update_from_graphql(self, rate_limit):
+        """Update the budget from a GraphQL rateLimit { cost remaining resetAt } field."""
+        if not rate_limit:
+            return
+
+        with self._lock:
+            if rate_limit.get("cost") is not None:
+                self.last_cost = max(1, int(rate_limit["cost"]))
+            if rate_limit.get("remaining") is not None:
+                self.remaining = int(rate_limit["remaining"])
+            if rate_limit.get("resetAt"):
+                reset_at = datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00"))
+                self.reset_at = reset_at.timestamp()
+
+    @staticmethod
+    def retry_after(response):
+        """Return seconds to wait if the response was rejected by a rate limit, otherwise None."""
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            return float(retry_after)
+        if response.headers.get("X-RateLimit-Remaining") == "0" and response.headers.get("X-RateLimit-Reset"):
+            return max(int(response.headers["X-RateLimit-Reset"]) - time.time(), 0) + 1
+        if "secondary rate limit" in response.text.lower():
+            return SECONDARY_LIMIT_BACKOFF
+        return None
+
+    @staticmethod
+    def graphql_retry_after(response, result):
+        """Return seconds to wait if a GraphQL result reports a RATE_LIMITED error, otherwise None."""
+        if not any(error.get("type") == "RATE_LIMITED" for error in result.get("errors") or []):
+            return None
+        if response.headers.get("X-RateLimit-Reset"):
+            return max(int(response.headers["X-RateLimit-Reset"]) - time.time(), 0) + 1
+        return SECONDARY_LIMIT_BACKOFF
+
+    def backoff(self, seconds):
+        """Hold every caller for the given number of seconds."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+            self._tokens = 0.0
+
+    def available(self):
+        """Points that can be spent before the reserve, 0 while backing off, None while the budget is unknown."""
+        with self._lock:
+            now = time.time()
+            if now < self._blocked_until:
+                return 0
+            if self.remaining is None or self.reset_at is None or self.reset_at <= now:
+                return None
+            return max(0, self.remaining - self.reserve)
+
+    def resumes_at(self):
+        """Time the budget becomes usable again after being exhausted or backed off."""
+        with self._lock:
+            return max(self._blocked_until, self.reset_at or 0.0)
+
+    def status(self):
+        """Return the last known budget for progress output."""
+        with self._lock:
+            return {"limit": self.limit, "remaining": self.remaining, "reset_at": self.reset_at}
+
+
+class PooledToken:
+    def __init__(self, index, token, scheduler):
+        self.index = index
+        self.token = token
+        self.scheduler = scheduler
+        self.requests = 0
+        self.cost = 0
+        self.rate_limited = 0
+        self.drained_until = None
+        self._lock = threading.Lock()
+
+    @property
+    def label(self):
+        """Identify the token in output without revealing it."""
+        return f"token{self.index} (...{self.token[-4:]})"
+
+    def record(self, response=None, rate_limit=None, rate_limited=False):
+        """
+        Update this token's budget and usage from a response and its GraphQL rateLimit field.
+
+        rate_limited counts a rejection only the response body shows, such as a RATE_LIMITED error.
+        """
+        if response is not None:
+            self.scheduler.update_from_headers(response.headers)
+        self.scheduler.update_from_graphql(rate_limit)
+        with self._lock:
+            if response is not None:
+                self.requests += 1
+                if self.scheduler.retry_after(response) is not None:
+                    self.rate_limited += 1
+            if rate_limited:
+                self.rate_limited += 1
+            if rate_limit and rate_limit.get("cost") is not None:
+                self.cost += int(rate_limit["cost"])
+
+
+class TokenPool:
+    """Spreads requests over several tokens, each paced by its own scheduler."""
+
+    def __init__(self, tokens, **scheduler_options):
+        self.tokens = [
+            PooledToken(index, token, RateLimitScheduler(**scheduler_options)) for index, token in enumerate(tokens)
+        ]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def acquire(self):
+        """Pick the token with the most budget left, wait for its scheduler and return it."""
+        with self._lock:
+            now = time.time()
+            scored = []
+            for pooled in self.tokens:
+                # A drained token stays out of rotation until its window resets, late responses do not revive it
+                if pooled.drained_until is not None and now < pooled.drained_until:
+                    scored.append((0, pooled))
+                    continue
+                if pooled.drained_until is not None:
+                    pooled.drained_until = None
+                    print(f"[TOKENS] {pooled.label} available again")
+
+                available = pooled.scheduler.available()
+                if available is None:
+                    available = DEFAULT_GRAPHQL_LIMIT
+                if available == 0:
+                    pooled.drained_until = pooled.scheduler.resumes_at()
+                    print(f"[TOKENS] {pooled.label} drained after {pooled.requests} requests, {pooled.cost} points")
+                scored.append((available, pooled))
+
+            usable = [(available, pooled) for available, pooled in scored if available > 0]
+            if usable:
+                chosen = max(usable, key=lambda item: item[0])[1]
+            else:
+                # Every token is drained, wait on the one whose budget comes back first
+                chosen = min(self.tokens, key=lambda pooled: pooled.scheduler.resumes_at())
+        chosen.scheduler.acquire()
+        return chosen
+
+    def status(self):
+        """Return the combined last known budget of the pool for progress output."""
+        statuses = [pooled.scheduler.status() for pooled in self.tokens]
+        known = [status for status in statuses if status["remaining"] is not None]
+        return {
+            "limit": sum(status["limit"] or 0 for status in known) if known else None,
+            "remaining": sum(status["remaining"] for status in known) if known else None,
+            "reset_at": min(status["reset_at"] for status in known) if known else None,
+        }
+
+    def usage(self):
+        """Return per-token usage for the final report."""
+        report = []
+        for pooled in self.tokens:
+            status = pooled.scheduler.status()
+            with pooled._lock:
+                report.append(
+                    {
+                        "token": pooled.label,
+                        "requests": pooled.requests,
+                        "cost": pooled.cost,
+                        "rate_limited": pooled.rate_limited,
+                        "remaining": status["remaining"],
+                        "limit": status["limit"],
+                        "reset_at": status["reset_at"],
+                    }
+                )
+        return report
@@ -5,13 +5,18 @@ README generation module for the repository tracker.
 Handles generation of English and Korean README files with data collection capability.
 """
 
-import json
+import argparse
 import os
 import re
 from datetime import datetime
 from typing import Dict, List, Optional
 
 import requests
+from columnar_format import COLUMNAR_EXTENSION, read_summary
+from github_client import GITHUB_API_URL, build_headers, get_github_token, get_session
+from http_cache import get_json
+from sqlite_store import RepoDataStore
+from totals_index import get_totals_index
 
 
 def generate_readme_english(repo_data: List[Dict], output_file: str = "README.md") -> None:
@@ -284,8 +289,26 @@ def update_readme_timestamp(output_file: str = "README.md") -> None:
         print(f"Failed to update timestamp in {output_file}: {e}")
 
 
-def load_existing_repo_data() -> List[Dict]:
-    """Load repository data from existing repo_data files."""
+def load_existing_repo_data(store: Optional[RepoDataStore] = None) -> List[Dict]:
+    """Load repository data from existing repo_data files, or from the totals table of a SQLite store."""
+    if store is not None:
+        all_repo_data = [
+            {
+                "name": repo_name,
+                "html_url": f"https://github.com/{owner}/{repo_name}",
+                "stars": totals.get("total_stars", 0),
+                "forks": totals.get("total_forks", 0),
+                "open_issues": 0,  # Will be updated if we have current data
+                "total_issues": totals.get("total_issues", 0),
+                "total_pull_requests": totals.get("total_pull_requests", 0),
+                "last_commit": totals.get("last_commit", ""),
+                "fetched_at": totals.get("fetched_at", ""),
+            }
+            for owner, repo_name, totals in store.load_summaries()
+        ]
+        print(f"Loaded data for {len(all_repo_data)} repositories from {store.path}")
+        return all_repo_data
+
     repo_data_dir = "repo_data"
     
     if not os.path.exists(repo_data_dir):
@@ -294,19 +317,31 @@ def load_existing_repo_data() -> List[Dict]:
     
     all_repo_data = []
     
-    # Get all JSON files in repo_data directory
-    for filename in os.listdir(repo_data_dir):
-        if not filename.endswith(".json"):
+    # JSON files are read through the totals index, only files changed since it was written are parsed
+    summaries = get_totals_index(repo_data_dir).summaries()
+
+    # Get all JSON files in repo_data directory, plus columnar files without a JSON twin
+    filenames = os.listdir(repo_data_dir)
+    json_names = {filename[: -len(".json")] for filename in filenames if filename.endswith(".json")}
+    for filename in filenames:
+        name_part, extension = os.path.splitext(filename)
+        if extension == COLUMNAR_EXTENSION and name_part in json_names:
+            continue
+        if extension not in (".json", COLUMNAR_EXTENSION):
             continue
             
         repo_file_path = os.path.join(repo_data_dir, filename)
         
         try:
-            with open(repo_file_path, "r", encoding="utf-8") as f:
-                repo_data = json.load(f)
+            if extension == COLUMNAR_EXTENSION:
+                # Totals live in the fixed header, the series are never decoded
+                repo_data = read_summary(repo_file_path)
+            elif filename in summaries:
+                repo_data = summaries[filename]
+            else:
+                continue
             
             # Extract owner and repo name from filename
-            name_part = filename.replace(".json", "")
             if "_" in name_part:
                 owner, repo_name = name_part.split("_", 1)
                 
@@ -316,7 +351,7 @@ def load_existing_repo_data() -> List[Dict]:
                     "html_url": f"https://github.com/{owner}/{repo_name}",
                     "stars": repo_data.get("total_stars", 0),
                     "forks": repo_data.get("total_forks", 0),
-                    "open_issues": 0,  # Will be updated if we have current data
+                    "open_issues": repo_data.get("open_issues", 0),  # Will be updated if we have current data
                     "total_issues": repo_data.get("total_issues", 0),
                     "total_pull_requests": repo_data.get("total_pull_requests", 0),
                     "last_commit": repo_data.get("last_commit", ""),
@@ -333,30 +368,14 @@ def load_existing_repo_data() -> List[Dict]:
     return all_repo_data
 
 
-def get_github_token() -> Optional[str]:
-    """Get GitHub token from environment or file."""
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        return token
-    try:
-        with open("access_token.txt", "r") as f:
-            return f.read().strip()
-    except FileNotFoundError:
-        return None
-
-
 def get_current_repo_data(owner: str, repo: str, token: Optional[str] = None) -> Optional[Dict]:
     """Get current repository data from GitHub API for README generation."""
-    headers = {"User-Agent": "Python-Framework-Tracker"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
+    headers = build_headers(token)
 
     try:
         # Get basic repository data
-        repo_url = f"https://api.github.com/repos/{owner}/{repo}"
-        response = requests.get(repo_url, headers=headers)
-        response.raise_for_status()
-        repo_data = response.json()
+        repo_url = f"{GITHUB_API_URL}/repos/{owner}/{repo}"
+        repo_data = get_json(get_session(), repo_url, headers)
 
         return {
             "name": repo,
@@ -375,9 +394,9 @@ def get_current_repo_data(owner: str, repo: str, token: Optional[str] = None) ->
         return None
 
 
-def update_repo_data_with_current() -> List[Dict]:
+def update_repo_data_with_current(store: Optional[RepoDataStore] = None) -> List[Dict]:
     """Update repository data with current GitHub data where possible."""
-    existing_data = load_existing_repo_data()
+    existing_data = load_existing_repo_data(store)
     token = get_github_token()
     
     if not token:
@@ -415,12 +434,17 @@ def update_repo_data_with_current() -> List[Dict]:
 
 def main():
     """Main execution function for standalone README generation."""
+    parser = argparse.ArgumentParser(description="Generate README files from local repository data")
+    parser.add_argument("--store", help="Read repository data from this SQLite store instead of repo_data JSON files")
+    args = parser.parse_args()
+
     print("Starting README generation...")
+    store = RepoDataStore(args.store) if args.store else None
     
     try:
         # Load and update repository data
         print("Loading repository data...")
-        repo_data = update_repo_data_with_current()
+        repo_data = update_repo_data_with_current(store)
         
         if not repo_data:
             print("No repository data found. Exiting.")
@@ -436,6 +460,9 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
         exit(1)
+    finally:
+        if store:
+            store.close()
 
 
 if __name__ == "__main__":
@@ -10,15 +10,47 @@ import argparse
 import json
 import os
 import sys
-from collections import defaultdict
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from urllib.parse import urlparse
 
 import requests
 import urllib3
+from atomic_io import atomic_write_bytes, encode_json
+from cursor_state import METRICS, load_cursor_state, merge_walk, resume_cursor, save_cursor_state
+from github_client import GITHUB_GRAPHQL_URL, build_headers, get_github_token, get_session
+from rate_limiter import RateLimitScheduler
+from run_metrics import get_run_metrics
+from split_pagination import fetch_connection_counts, fetch_split
+from totals_index import SUMMARY_KEYS, get_totals_index
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Retries for requests rejected by a rate limit while a scheduler is pacing the fetcher
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Page generator, date field and display label of each metric walk
+METRIC_FETCHERS = {
+    "stars": "iter_stargazer_pages",
+    "forks": "iter_fork_pages",
+    "issues": "iter_issue_pages",
+    "pull_requests": "iter_pull_request_pages",
+}
+METRIC_DATE_FIELDS = {
+    "stars": "starredAt",
+    "forks": "createdAt",
+    "issues": "createdAt",
+    "pull_requests": "createdAt",
+}
+METRIC_LABELS = {
+    "stars": "stargazers",
+    "forks": "forks",
+    "issues": "issues",
+    "pull_requests": "pull requests",
+}
+
 
 def debug_print(message, debug=False):
     """Print debug message only if debug mode is enabled."""
@@ -27,29 +59,33 @@ def debug_print(message, debug=False):
 
 
 class GitHubFetcher:
-    def __init__(self, token=None, debug=False):
+    def __init__(
+        self, token=None, debug=False, session=None, scheduler=None, split_threshold=0, token_pool=None, deadline=None
+    ):
         self.token = token
         self.debug = debug
-        self.headers = {
-            "User-Agent": "Python-GraphQL-Fetcher",
-            "Content-Type": "application/json",
-        }
-        if self.token:
-            self.headers["Authorization"] = f"Bearer {self.token}"
-        self.graphql_url = "https://api.github.com/graphql"
+        self.scheduler = scheduler
+        # A token pool replaces the single token and scheduler, each request goes to the token with most budget
+        self.token_pool = token_pool
+        # Connections above this many edges are walked from both ends or as search ranges (0 disables)
+        self.split_threshold = split_threshold
+        # Run deadline after which no further request is sent, walks stop where they are
+        self.deadline = deadline
+        # Last endCursor and edge timestamp reached per metric, persisted for incremental re-syncs
+        self.walk_state = {}
+        self.headers = build_headers(self.token, "Python-GraphQL-Fetcher")
+        self.headers["Content-Type"] = "application/json"
+        self.graphql_url = GITHUB_GRAPHQL_URL
+        # Reuse pooled keep-alive connections across every page of every walk
+        self.session = session or get_session()
 
     @staticmethod
     def get_token():
         """Get GitHub token from environment or file."""
-        token = os.environ.get("GITHUB_TOKEN")
-        if token:
-            return token
-        try:
-            with open("access_token.txt", "r") as f:
-                return f.read().strip()
-        except FileNotFoundError:
+        token = get_github_token()
+        if not token:
             print("Error: GitHub token required for GraphQL API access.")
-            return None
+        return token
 
     @staticmethod
     def parse_url(url):
@@ -64,12 +100,70 @@ class GitHubFetcher:
         payload = {"query": query}
         if variables:
             payload["variables"] = variables
+        metrics = get_run_metrics()
+        repo = f"{variables['owner']}/{variables['name']}" if variables and "owner" in variables else None
 
         try:
-            response = requests.post(self.graphql_url, headers=self.headers, json=payload, verify=False)
+            retries = 0
+            while True:
+                pooled = None
+                result = None
+                scheduler = self.scheduler
+                headers = self.headers
+                if self.token_pool:
+                    with metrics.stage("rate_limit_wait"):
+                        pooled = self.token_pool.acquire()
+                    scheduler = pooled.scheduler
+                    headers = {**self.headers, "Authorization": f"Bearer {pooled.token}"}
+                elif scheduler:
+                    with metrics.stage("rate_limit_wait"):
+                        scheduler.acquire()
+                # Checked after the rate-limit wait, which can outlast the time left
+                if self.deadline and self.deadline.expired():
+                    raise Exception("Run deadline reached")
+
+                started = time.perf_counter()
+                try:
+                    response = self.session.post(self.graphql_url, headers=headers, json=payload, verify=False)
+                except requests.exceptions.RequestException:
+                    metrics.observe_request("graphql", time.perf_counter() - started)
+                    raise
+                metrics.observe_request("graphql", time.perf_counter() - started, response.status_code)
+                if not scheduler:
+                    break
+
+                if pooled:
+                    pooled.record(response)
+                else:
+                    scheduler.update_from_headers(response.headers)
+                retry_after = scheduler.retry_after(response)
+                if retry_after is None and response.ok:
+                    # An exhausted GraphQL budget can also come back as a RATE_LIMITED error with status 200
+                    result = response.json()
+                    retry_after = scheduler.graphql_retry_after(response, result)
+                    if retry_after is not None and pooled:
+                        pooled.record(rate_limited=True)
+                if retry_after is None or retries >= MAX_RATE_LIMIT_RETRIES:
+                    break
+
+                # A pooled token backs off alone, the retry is routed to another token
+                debug_print(f"DEBUG: Rate limited, backing off for {retry_after:.0f}s", self.debug)
+                metrics.count_retry("rate_limit")
+                scheduler.backoff(retry_after)
+                retries += 1
+
             response.raise_for_status()
 
-            result = response.json()
+            if result is None:
+                result = response.json()
+            if result.get("data"):
+                rate_limit = result["data"].get("rateLimit")
+                metrics.observe_rate_limit(rate_limit, repo)
+                if pooled:
+                    pooled.record(rate_limit=rate_limit)
+                elif scheduler:
+                    scheduler.update_from_graphql(rate_limit)
+
             if "errors" in result:
                 errors = result["errors"]
                 for error in errors:
@@ -91,8 +185,18 @@ class GitHubFetcher:
                 raise Exception(f"Rate limit error: {e}")
             raise Exception(f"Request error: {e}")
 
-    def fetch_stargazers(self, owner, repo):
-        """Fetch all stargazers using GraphQL pagination."""
+    @staticmethod
+    def _observe_page(metric, owner, repo, page, edges, started):
+        """Record the edges and latency of a walked page in the run metrics."""
+        get_run_metrics().observe_page(metric, f"{owner}/{repo}", page, len(edges), time.perf_counter() - started)
+
+    def _record_walk(self, metric, page_info, last_seen):
+        """Remember how far a metric walk got so the next sync can resume after it."""
+        if page_info.get("endCursor") and last_seen:
+            self.walk_state[metric] = {"end_cursor": page_info["endCursor"], "last_seen": last_seen}
+
+    def iter_stargazer_pages(self, owner, repo, cursor=None):
+        """Yield stargazers one GraphQL page at a time, starting after cursor when given."""
         query = """
         query($owner: String!, $name: String!, $cursor: String) {
           repository(owner: $owner, name: $name) {
@@ -101,15 +205,15 @@ class GitHubFetcher:
               edges { starredAt }
             }
           }
+          rateLimit { cost remaining resetAt }
         }
         """
 
-        stargazers = []
-        cursor = None
         page = 1
 
         try:
             while True:
+                started = time.perf_counter()
                 data = self.execute_query(query, {"owner": owner, "name": repo, "cursor": cursor})
 
                 if not data or not data.get("repository"):
@@ -124,9 +228,10 @@ class GitHubFetcher:
                     debug_print("DEBUG: No edges found in stargazers data", self.debug)
                     break
 
-                stargazers.extend(edges)
-
                 page_info = stargazers_data["pageInfo"]
+                self._observe_page("stars", owner, repo, page, edges, started)
+                self._record_walk("stars", page_info, edges[-1].get("starredAt"))
+                yield edges
                 if not page_info.get("hasNextPage"):
                     break
 
@@ -138,10 +243,8 @@ class GitHubFetcher:
                 raise Exception(f"Rate limit error while fetching stargazers for {owner}/{repo}: {e}")
             raise Exception(f"Error fetching stargazers for {owner}/{repo}: {e}")
 
-        return stargazers
-
-    def fetch_forks(self, owner, repo):
-        """Fetch all forks using GraphQL pagination."""
+    def iter_fork_pages(self, owner, repo, cursor=None):
+        """Yield forks one GraphQL page at a time, starting after cursor when given."""
         query = """
         query($owner: String!, $name: String!, $cursor: String) {
           repository(owner: $owner, name: $name) {
@@ -150,15 +253,15 @@ class GitHubFetcher:
               edges { node { createdAt } }
             }
           }
+          rateLimit { cost remaining resetAt }
         }
         """
 
-        forks = []
-        cursor = None
         page = 1
 
         try:
             while True:
+                started = time.perf_counter()
                 data = self.execute_query(query, {"owner": owner, "name": repo, "cursor": cursor})
 
                 if not data or not data.get("repository"):
@@ -170,9 +273,10 @@ class GitHubFetcher:
                 if not edges:
                     break
 
-                forks.extend(edges)
-
                 page_info = data["repository"]["forks"]["pageInfo"]
+                self._observe_page("forks", owner, repo, page, edges, started)
+                self._record_walk("forks", page_info, edges[-1].get("node", {}).get("createdAt"))
+                yield edges
                 if not page_info.get("hasNextPage"):
                     break
 
@@ -184,10 +288,8 @@ class GitHubFetcher:
                 raise Exception(f"Rate limit error while fetching forks for {owner}/{repo}: {e}")
             raise Exception(f"Error fetching forks for {owner}/{repo}: {e}")
 
-        return forks
-
-    def fetch_issues(self, owner, repo):
-        """Fetch all issues using GraphQL pagination."""
+    def iter_issue_pages(self, owner, repo, cursor=None):
+        """Yield issues one GraphQL page at a time, starting after cursor when given."""
         query = """
         query($owner: String!, $name: String!, $cursor: String) {
           repository(owner: $owner, name: $name) {
@@ -202,15 +304,15 @@ class GitHubFetcher:
               }
             }
           }
+          rateLimit { cost remaining resetAt }
         }
         """
 
-        issues = []
-        cursor = None
         page = 1
 
         try:
             while True:
+                started = time.perf_counter()
                 data = self.execute_query(query, {"owner": owner, "name": repo, "cursor": cursor})
 
                 if not data or not data.get("repository"):
@@ -228,13 +330,14 @@ class GitHubFetcher:
 
                 edges = repository_data["issues"]["edges"]
                 if not edges:
-                    if page == 1:
+                    if page == 1 and not cursor:
                         print(f"INFO: No issues found for {owner}/{repo}")
                     break
 
-                issues.extend(edges)
-
                 page_info = repository_data["issues"]["pageInfo"]
+                self._observe_page("issues", owner, repo, page, edges, started)
+                self._record_walk("issues", page_info, edges[-1].get("node", {}).get("createdAt"))
+                yield edges
                 if not page_info.get("hasNextPage"):
                     break
 
@@ -245,10 +348,8 @@ class GitHubFetcher:
                 raise Exception(f"Rate limit error while fetching issues for {owner}/{repo}: {e}")
             raise Exception(f"Error fetching issues for {owner}/{repo}: {e}")
 
-        return issues
-
-    def fetch_pull_requests(self, owner, repo):
-        """Fetch all pull requests using GraphQL pagination."""
+    def iter_pull_request_pages(self, owner, repo, cursor=None):
+        """Yield pull requests one GraphQL page at a time, starting after cursor when given."""
         query = """
         query($owner: String!, $name: String!, $cursor: String) {
           repository(owner: $owner, name: $name) {
@@ -264,15 +365,15 @@ class GitHubFetcher:
               }
             }
           }
+          rateLimit { cost remaining resetAt }
         }
         """
 
-        pull_requests = []
-        cursor = None
         page = 1
 
         try:
             while True:
+                started = time.perf_counter()
                 data = self.execute_query(query, {"owner": owner, "name": repo, "cursor": cursor})
 
                 if not data or not data.get("repository"):
@@ -292,13 +393,14 @@ class GitHubFetcher:
 
                 edges = repository_data["pullRequests"]["edges"]
                 if not edges:
-                    if page == 1:
+                    if page == 1 and not cursor:
                         print(f"INFO: No pull requests found for {owner}/{repo}")
                     break
 
-                pull_requests.extend(edges)
-
                 page_info = repository_data["pullRequests"]["pageInfo"]
+                self._observe_page("pull_requests", owner, repo, page, edges, started)
+                self._record_walk("pull_requests", page_info, edges[-1].get("node", {}).get("createdAt"))
+                yield edges
                 if not page_info.get("hasNextPage"):
                     break
 
@@ -309,32 +411,168 @@ class GitHubFetcher:
                 raise Exception(f"Rate limit error while fetching pull requests for {owner}/{repo}: {e}")
             raise Exception(f"Error fetching pull requests for {owner}/{repo}: {e}")
 
-        return pull_requests
+    def fetch_stargazers(self, owner, repo, cursor=None):
+        """Fetch all stargazers using GraphQL pagination, starting after cursor when given."""
+        return [edge for page in self.iter_stargazer_pages(owner, repo, cursor) for edge in page]
+
+    def fetch_forks(self, owner, repo, cursor=None):
+        """Fetch all forks using GraphQL pagination, starting after cursor when given."""
+        return [edge for page in self.iter_fork_pages(owner, repo, cursor) for edge in page]
+
+    def fetch_issues(self, owner, repo, cursor=None):
+        """Fetch all issues using GraphQL pagination, starting after cursor when given."""
+        return [edge for page in self.iter_issue_pages(owner, repo, cursor) for edge in page]
+
+    def fetch_pull_requests(self, owner, repo, cursor=None):
+        """Fetch all pull requests using GraphQL pagination, starting after cursor when given."""
+        return [edge for page in self.iter_pull_request_pages(owner, repo, cursor) for edge in page]
+
+    def count_metric(self, metric, owner, repo, cursor=None, counts=None, journal=None):
+        """Walk a metric connection and fold each page straight into per-day counts."""
+        counts = Counter() if counts is None else counts
+        date_field = METRIC_DATE_FIELDS[metric]
+        folded_state = None
+        try:
+            for edges in getattr(self, METRIC_FETCHERS[metric])(owner, repo, cursor):
+                with get_run_metrics().stage("aggregation"):
+                    self.count_by_date([edges], date_field, counts)
+                folded_state = self.walk_state.get(metric)
+                if journal:
+                    journal.update_metric(f"{owner}/{repo}", metric, counts, folded_state)
+        except Exception:
+            # Keep every folded page of a stopped walk, the next run resumes right after the last one
+            if journal and folded_state:
+                journal.update_metric(f"{owner}/{repo}", metric, counts, folded_state, force=True)
+            raise
+        return counts
+
+    def fetch_metrics(self, owner, repo, cursors=None, journal=None):
+        """Walk all metric connections concurrently, returning (per-day counts, errors) keyed by metric."""
+        cursors = dict(cursors or {})
+        walks = {}
+        errors = {}
+
+        # Continue walks recorded in the checkpoint journal of an interrupted run
+        initial_counts = {}
+        if journal:
+            for metric in METRIC_FETCHERS:
+                progress = journal.metric_progress(f"{owner}/{repo}", metric)
+                if not progress:
+                    continue
+                if progress["walk_state"]:
+                    self.walk_state[metric] = progress["walk_state"]
+                if progress["done"]:
+                    walks[metric] = Counter(progress["counts"])
+                elif progress["walk_state"]:
+                    cursors[metric] = progress["walk_state"]["end_cursor"]
+                    initial_counts[metric] = Counter(progress["counts"])
+
+        # Full walks of very large connections use split-range pagination to shorten the critical path
+        counts = {}
+        if self.split_threshold and not all(cursors.get(metric) for metric in METRIC_FETCHERS):
+            counts = fetch_connection_counts(self, owner, repo)
+
+        # Walks share the fetcher's session and scheduler, so they draw on one rate-limit budget
+        with ThreadPoolExecutor(max_workers=len(METRIC_FETCHERS)) as executor:
+            future_to_metric = {}
+            for metric in METRIC_FETCHERS:
+                if metric in walks:
+                    continue
+                if not cursors.get(metric) and counts.get(metric, 0) > self.split_threshold:
+                    debug_print(f"DEBUG: {owner}/{repo} {metric}: split walk of {counts[metric]} edges", self.debug)
+                    future = executor.submit(fetch_split, self, owner, repo, metric, counts)
+                else:
+                    future = executor.submit(
+                        self.count_metric, metric, owner, repo, cursors.get(metric), initial_counts.get(metric), journal
+                    )
+                future_to_metric[future] = metric
+            for future in as_completed(future_to_metric):
+                metric = future_to_metric[future]
+                try:
+                    walks[metric] = future.result()
+                    if journal:
+                        journal.update_metric(
+                            f"{owner}/{repo}", metric, walks[metric], self.walk_state.get(metric), done=True
+                        )
+                    debug_print(f"DEBUG: {owner}/{repo} {metric}: {sum(walks[metric].values())} edges", self.debug)
+                except Exception as e:
+                    errors[metric] = str(e)
+
+        return walks, errors
 
     @staticmethod
-    def group_by_date(items, date_field):
-        """Group items by date."""
-        grouped = defaultdict(int)
-        for item in items:
+    def count_by_date(pages, date_field, counts=None):
+        """Fold pages of edges into per-day counts without keeping the edges."""
+        counts = Counter() if counts is None else counts
+        for edges in pages:
             if date_field == "starredAt":
-                date_str = item.get("starredAt")
+                date_strs = [edge.get("starredAt") for edge in edges]
             elif date_field == "createdAt":
-                date_str = item.get("node", {}).get("createdAt")
+                date_strs = [edge.get("node", {}).get("createdAt") for edge in edges]
             else:
                 continue
+            # GitHub timestamps are UTC ISO 8601, the first 10 characters are the day key
+            counts.update(date_str[:10] for date_str in date_strs if date_str)
+        return counts
 
-            if date_str:
-                date_obj = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-                date_key = date_obj.strftime("%Y-%m-%d")
-                grouped[date_key] += 1
-        return dict(grouped)
+    @staticmethod
+    def group_by_date(items, date_field):
+        """Group items by date."""
+        return dict(GitHubFetcher.count_by_date([items], date_field))
 
     @staticmethod
-    def save_data(data, filename):
-        """Save data to compact JSON file."""
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    def save_data(data, filename, encoded=None):
+        """
+        Save data to compact JSON file, atomically replacing any previous version, and index its totals.
+
+        encoded is the data already passed through encode_json, when it was serialized elsewhere.
+        """
+        content = encoded if encoded is not None else encode_json(data)
+        with get_run_metrics().stage("write"):
+            atomic_write_bytes(filename, content)
+            get_totals_index(os.path.dirname(filename) or ".").update(filename, data, content)
+
+
+def merge_metric_walks(walk_state, walks, errors, existing_data, previous_state):
+    """Merge walked per-day counts into the date buckets, keeping previous data for failed metrics."""
+    by_date = {}
+    cursor_state = {}
+    for metric in METRICS:
+        existing = existing_data.get(f"{metric}_by_date", {})
+        if metric in errors:
+            by_date[metric] = existing
+            metric_state = previous_state.get(metric)
+        else:
+            by_date[metric], metric_state = merge_walk(
+                existing, walks[metric], previous_state.get(metric), walk_state.get(metric)
+            )
+        if metric_state:
+            cursor_state[metric] = metric_state
+    return by_date, cursor_state
+
+
+def build_output_data(by_date):
+    """Build a repo_data document with totals calculated from the grouped data."""
+    output_data = {f"total_{metric}": sum(by_date[metric].values()) for metric in METRICS}
+    output_data["fetched_at"] = datetime.now().isoformat()
+    for metric in METRICS:
+        output_data[f"{metric}_by_date"] = dict(sorted(by_date[metric].items()))
+    return output_data
+
+
+def aggregate_walks(walk_state, walks, errors, existing_data, previous_state, encode=True, summarize=False):
+    """
+    Merge walks and build the repo_data document, returning (output_data, encoded JSON or None, cursor_state).
+
+    Takes and returns only plain data, so it can run in a worker process. With summarize the encoded
+    document is the only copy of the history returned, output_data is cut down to its totals.
+    """
+    by_date, cursor_state = merge_metric_walks(walk_state, walks, errors, existing_data, previous_state)
+    output_data = build_output_data(by_date)
+    encoded = encode_json(output_data) if encode else None
+    if summarize and encoded is not None:
+        output_data = {key: output_data[key] for key in SUMMARY_KEYS if key in output_data}
+    return output_data, encoded, cursor_state
 
 
 def main():
@@ -342,6 +580,17 @@ def main():
     parser.add_argument("repo_url", help="GitHub repository URL")
     parser.add_argument("--output-dir", default="repo_data", help="Output directory")
     parser.add_argument("--debug", action="store_true", help="Enable debug output for detailed processing information")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Resume from saved pagination cursors and merge only new edges into an existing data file",
+    )
+    parser.add_argument(
+        "--split-threshold",
+        type=int,
+        default=0,
+        help="Walk connections with more edges than this from both ends or as search ranges (default: 0, off)",
+    )
 
     args = parser.parse_args()
 
@@ -350,15 +599,27 @@ def main():
         if not token:
             sys.exit(1)
 
-        fetcher = GitHubFetcher(token, args.debug)
+        fetcher = GitHubFetcher(
+            token, args.debug, scheduler=RateLimitScheduler(), split_threshold=args.split_threshold
+        )
         owner, repo = fetcher.parse_url(args.repo_url)
 
         # Check if file already exists
         output_filename = f"{args.output_dir}/{owner}_{repo}.json"
-        if os.path.exists(output_filename):
+        resume = args.incremental and os.path.exists(output_filename)
+        if os.path.exists(output_filename) and not resume:
             print(f"File {output_filename} already exists. Skipping...")
             return
 
+        # Saved cursors let each walk page only the edges added since the last sync
+        existing_data = {}
+        previous_state = {}
+        if resume:
+            with open(output_filename, "r", encoding="utf-8") as f:
+                existing_data = json.load(f)
+            previous_state = load_cursor_state(args.output_dir, owner, repo)
+            print(f"Resuming {owner}/{repo} from saved cursors for: {', '.join(sorted(previous_state)) or 'none'}")
+
         print(f"Fetching data for {owner}/{repo} using GraphQL...")
 
         # Test API connection first
@@ -385,68 +646,25 @@ def main():
         print(f"Total stars: {repo_info['stargazerCount']}")
         print(f"Total forks: {repo_info['forkCount']}")
 
-        # Fetch data with individual error handling
-        stargazers = None
-        forks = None
-        issues = None
-        pull_requests = None
-
-        try:
-            print("\n=== Fetching Stargazers ===")
-            stargazers = fetcher.fetch_stargazers(owner, repo)
-        except Exception as e:
-            print(f"ERROR: Failed to fetch stargazers for {owner}/{repo}: {e}")
-            sys.exit(1)
-
-        try:
-            print("\n=== Fetching Forks ===")
-            forks = fetcher.fetch_forks(owner, repo)
-        except Exception as e:
-            print(f"ERROR: Failed to fetch forks for {owner}/{repo}: {e}")
-            sys.exit(1)
+        # Walk all four connections concurrently, a failing metric does not abort the others
+        print("\n=== Fetching Stargazers, Forks, Issues and Pull Requests ===")
+        cursors = {metric: resume_cursor(previous_state, metric) for metric in METRICS}
+        walks, errors = fetcher.fetch_metrics(owner, repo, cursors)
 
-        try:
-            print("\n=== Fetching Issues ===")
-            issues = fetcher.fetch_issues(owner, repo)
-        except Exception as e:
-            print(f"ERROR: Failed to fetch issues for {owner}/{repo}: {e}")
-            sys.exit(1)
+        for metric, error in errors.items():
+            print(f"ERROR: Failed to fetch {METRIC_LABELS[metric]} for {owner}/{repo}: {error}")
 
-        try:
-            print("\n=== Fetching Pull Requests ===")
-            pull_requests = fetcher.fetch_pull_requests(owner, repo)
-        except Exception as e:
-            print(f"ERROR: Failed to fetch pull requests for {owner}/{repo}: {e}")
+        # A new data file needs every metric, a re-sync keeps the previous data of failed metrics
+        if errors and not resume:
             sys.exit(1)
 
-        # Verify all fetch operations returned valid data (not None)
-        if stargazers is None or forks is None or issues is None or pull_requests is None:
-            print(f"ERROR: One or more fetch operations returned None for {owner}/{repo} - data collection failed")
-            sys.exit(1)
+        by_date, cursor_state = merge_metric_walks(fetcher.walk_state, walks, errors, existing_data, previous_state)
+        output_data = build_output_data(by_date)
 
-        # Group by date with fallback to empty dict
-        stars_by_date = fetcher.group_by_date(stargazers, "starredAt") if stargazers else {}
-        forks_by_date = fetcher.group_by_date(forks, "createdAt") if forks else {}
-        issues_by_date = fetcher.group_by_date(issues, "createdAt") if issues else {}
-        pull_requests_by_date = fetcher.group_by_date(pull_requests, "createdAt") if pull_requests else {}
-
-        # Calculate totals from grouped data to ensure accuracy
-        total_stars = sum(stars_by_date.values()) if stars_by_date else 0
-        total_forks = sum(forks_by_date.values()) if forks_by_date else 0
-        total_issues = sum(issues_by_date.values()) if issues_by_date else 0
-        total_pull_requests = sum(pull_requests_by_date.values()) if pull_requests_by_date else 0
-
-        output_data = {
-            "total_stars": total_stars,
-            "total_forks": total_forks,
-            "total_issues": total_issues,
-            "total_pull_requests": total_pull_requests,
-            "fetched_at": datetime.now().isoformat(),
-            "stars_by_date": dict(sorted(stars_by_date.items())),
-            "forks_by_date": dict(sorted(forks_by_date.items())),
-            "issues_by_date": dict(sorted(issues_by_date.items())),
-            "pull_requests_by_date": dict(sorted(pull_requests_by_date.items())),
-        }
+        total_stars = output_data["total_stars"]
+        total_forks = output_data["total_forks"]
+        total_issues = output_data["total_issues"]
+        total_pull_requests = output_data["total_pull_requests"]
 
         # Validate data before saving - ensure totals match expectations
         if total_stars != repo_info["stargazerCount"] or total_forks != repo_info["forkCount"]:
@@ -458,6 +676,7 @@ def main():
         # Save data only if validation passes
         try:
             fetcher.save_data(output_data, output_filename)
+            save_cursor_state(args.output_dir, owner, repo, cursor_state)
         except Exception as e:
             print(f"ERROR: Failed to save data for {owner}/{repo}: {e}")
             sys.exit(1)
@@ -469,6 +688,10 @@ def main():
         print(f"Total issues fetched: {total_issues}")
         print(f"Total pull requests fetched: {total_pull_requests}")
 
+        if errors:
+            print(f"ERROR: Kept previous data for failed metrics: {', '.join(sorted(errors))}")
+            sys.exit(1)
+
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
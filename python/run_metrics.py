@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Run Instrumentation
+
+Collects request latency histograms, pages and edges per metric, GraphQL cost and remaining
+budget, retries and the time spent in aggregation and writes while a fetch runs. The totals
+are written as a JSON run report and, optionally, as a Prometheus textfile for the node
+exporter's textfile collector.
+"""
+
+import heapq
+import json
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from atomic_io import atomic_write_json, atomic_write_text
+
+DEFAULT_REPORT_FILE = "run_report.json"
+PROMETHEUS_PREFIX = "github_tracker"
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+# Repositories and pages listed in the report as the ones that dominated the run
+TOP_ENTRIES = 10
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+class RunMetrics:
+    def __init__(self, run_name="run"):
+        self.run_name = run_name
+        self.started_at = datetime.now().isoformat()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.statuses = defaultdict(Counter)
+        self.pages = defaultdict(lambda: {"pages": 0, "edges": 0, "seconds": 0.0})
+        self.repos = defaultdict(lambda: {"requests": 0, "pages": 0, "edges": 0, "seconds": 0.0, "cost": 0})
+        self.slowest_pages = []
+        self.graphql = {"queries": 0, "cost": 0, "remaining": None, "min_remaining": None, "reset_at": None}
+        self.retries = Counter()
+        self.stages = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+        self.info = {}
+
+    def observe_request(self, endpoint, seconds, status=None, repo=None):
+        """Record one API request, status None marks a request that failed before a response arrived."""
+        with self._lock:
+            histogram = self.requests.get(endpoint)
+            if histogram is None:
+                histogram = self.requests[endpoint] = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "max": 0.0,
+                    "buckets": [0] * len(LATENCY_BUCKETS),
+                }
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            histogram["max"] = max(histogram["max"], seconds)
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][index] += 1
+                    break
+            self.statuses[endpoint][str(status) if status is not None else "error"] += 1
+            if repo:
+                self.repos[repo]["requests"] += 1
+                self.repos[repo]["seconds"] += seconds
+
+    def observe_page(self, metric, repo, page, edges, seconds):
+        """Record one page of a metric walk."""
+        with self._lock:
+            totals = self.pages[metric]
+            totals["pages"] += 1
+            totals["edges"] += edges
+            totals["seconds"] += seconds
+            self.repos[repo]["pages"] += 1
+            self.repos[repo]["edges"] += edges
+            self.repos[repo]["seconds"] += seconds
+            entry = (seconds, repo, metric, page, edges)
+            if len(self.slowest_pages) < TOP_ENTRIES:
+                heapq.heappush(self.slowest_pages, entry)
+            else:
+                heapq.heappushpop(self.slowest_pages, entry)
+
+    def observe_rate_limit(self, rate_limit, repo=None):
+        """Record the rateLimit field of a GraphQL response."""
+        if not rate_limit:
+            return
+        with self._lock:
+            cost = rate_limit.get("cost") or 0
+            remaining = rate_limit.get("remaining")
+            self.graphql["queries"] += 1
+            self.graphql["cost"] += cost
+            if remaining is not None:
+                self.graphql["remaining"] = remaining
+                if self.graphql["min_remaining"] is None or remaining < self.graphql["min_remaining"]:
+                    self.graphql["min_remaining"] = remaining
+            if rate_limit.get("resetAt"):
+                self.graphql["reset_at"] = rate_limit["resetAt"]
+            if repo:
+                self.repos[repo]["cost"] += cost
+
+    def page_seconds(self):
+        """Return the mean seconds per walked page so far, None before the first page."""
+        with self._lock:
+            pages = sum(totals["pages"] for totals in self.pages.values())
+            seconds = sum(totals["seconds"] for totals in self.pages.values())
+        return seconds / pages if pages else None
+
+    def count_retry(self, reason):
+        with self._lock:
+            self.retries[reason] += 1
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block of work, such as aggregation or writes, under a named stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stages[name]["count"] += 1
+                self.stages[name]["seconds"] += elapsed
+
+    def set_info(self, key, value):
+        """Attach a value, such as cache statistics, to the report as is."""
+        with self._lock:
+            self.info[key] = value
+
+    def report(self):
+        """Return the run report as a JSON-serialisable dict."""
+        with self._lock:
+            duration = time.perf_counter() - self._started
+            requests = {}
+            for endpoint, histogram in self.requests.items():
+                requests[endpoint] = {
+                    "count": histogram["count"],
+                    "seconds": round(histogram["sum"], 6),
+                    "mean_seconds": round(histogram["sum"] / histogram["count"], 6),
+                    "max_seconds": round(histogram["max"], 6),
+                    "buckets": {
+                        _bucket_label(bound): count for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"])
+                    },
+                    "statuses": dict(self.statuses[endpoint]),
+                }
+            metrics = {
+                metric: {
+                    "pages": totals["pages"],
+                    "edges": totals["edges"],
+                    "seconds": round(totals["seconds"], 6),
+                    "pages_per_second": round(totals["pages"] / totals["seconds"], 3) if totals["seconds"] else None,
+                    "edges_per_second": round(totals["edges"] / totals["seconds"], 3) if totals["seconds"] else None,
+                }
+                for metric, totals in sorted(self.pages.items())
+            }
+            top_repos = sorted(self.repos.items(), key=lambda item: item[1]["seconds"], reverse=True)[:TOP_ENTRIES]
+            return {
+                "run": self.run_name,
+                "started_at": self.started_at,
+                "finished_at": datetime.now().isoformat(),
+                "duration_seconds": round(duration, 3),
+                "requests": requests,
+                "metrics": metrics,
+                "graphql": dict(self.graphql),
+                "retries": dict(self.retries),
+                "stages": {
+                    name: {"count": stage["count"], "seconds": round(stage["seconds"], 6)}
+                    for name, stage in sorted(self.stages.items())
+                },
+                "top_repositories": [
+                    {"repo": repo, **totals, "seconds": round(totals["seconds"], 6)} for repo, totals in top_repos
+                ],
+                "slowest_pages": [
+                    {"repo": repo, "metric": metric, "page": page, "edges": edges, "seconds": round(seconds, 6)}
+                    for seconds, repo, metric, page, edges in sorted(self.slowest_pages, reverse=True)
+                ],
+                "info": dict(self.info),
+            }
+
+    def write_report(self, filename=DEFAULT_REPORT_FILE):
+        report = self.report()
+        atomic_write_json(filename, report)
+        return report
+
+    def write_prometheus(self, filename):
+        """Write the counters in the Prometheus text exposition format."""
+        report = self.report()
+        run = _label_value(self.run_name)
+        lines = []
+
+        def metric_family(name, kind, help_text):
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+
+        def sample(name, value, **labels):
+            label_text = ",".join(f'{key}="{_label_value(label)}"' for key, label in {"run": run, **labels}.items())
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}{{{label_text}}} {_number(value)}")
+
+        metric_family("request_duration_seconds", "histogram", "GitHub API request latency.")
+        with self._lock:
+            histograms = {endpoint: dict(histogram) for endpoint, histogram in self.requests.items()}
+        for endpoint, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+                cumulative += count
+                sample("request_duration_seconds_bucket", cumulative, endpoint=endpoint, le=_bucket_label(bound))
+            sample("request_duration_seconds_sum", histogram["sum"], endpoint=endpoint)
+            sample("request_duration_seconds_count", histogram["count"], endpoint=endpoint)
+
+        metric_family("pages_total", "counter", "Connection pages fetched per metric.")
+        for metric, totals in report["metrics"].items():
+            sample("pages_total", totals["pages"], metric=metric)
+        metric_family("edges_total", "counter", "Connection edges fetched per metric.")
+        for metric, totals in report["metrics"].items():
+            sample("edges_total", totals["edges"], metric=metric)
+        metric_family("edges_per_second", "gauge", "Edges fetched per second of request time per metric.")
+        for metric, totals in report["metrics"].items():
+            if totals["edges_per_second"] is not None:
+                sample("edges_per_second", totals["edges_per_second"], metric=metric)
+
+        metric_family("graphql_cost_total", "counter", "GraphQL rate limit points spent.")
+        sample("graphql_cost_total", report["graphql"]["cost"])
+        if report["graphql"]["remaining"] is not None:
+            metric_family("graphql_remaining", "gauge", "GraphQL rate limit points left at the end of the run.")
+            sample("graphql_remaining", report["graphql"]["remaining"])
+
+        metric_family("retries_total", "counter", "Requests retried or answered by a fallback.")
+        for reason, count in sorted(report["retries"].items()):
+            sample("retries_total", count, reason=reason)
+
+        metric_family("stage_seconds_total", "counter", "Time spent per stage of the run.")
+        for name, stage in report["stages"].items():
+            sample("stage_seconds_total", stage["seconds"], stage=name)
+
+        metric_family("run_duration_seconds", "gauge", "Wall-clock duration of the run.")
+        sample("run_duration_seconds", report["duration_seconds"])
+        metric_family("run_finished_timestamp_seconds", "gauge", "Unix time the run finished.")
+        sample("run_finished_timestamp_seconds", time.time())
+
+        atomic_write_text(filename, "\n".join(lines) + "\n")
+
+
+def _bucket_label(bound):
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def observed_request_seconds(report_file=DEFAULT_REPORT_FILE, endpoint="graphql"):
+    """Return the mean request latency of an endpoint in a previous run report, None when unknown."""
+    try:
+        with open(report_file, "r", encoding="utf-8") as f:
+            histogram = json.load(f).get("requests", {}).get(endpoint)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not histogram or not histogram.get("count"):
+        return None
+    return histogram["mean_seconds"]
+
+
+def merge_reports(reports, run_name="merged"):
+    """Combine the JSON reports of runs that ran side by side, such as the shards of one batch load."""
+    requests = {}
+    metrics = defaultdict(lambda: {"pages": 0, "edges": 0, "seconds": 0.0})
+    graphql = {"queries": 0, "cost": 0, "remaining": None, "min_remaining": None, "reset_at": None}
+    retries = Counter()
+    stages = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+    top_repositories = []
+    slowest_pages = []
+
+    for report in reports:
+        for endpoint, histogram in report.get("requests", {}).items():
+            merged = requests.setdefault(
+                endpoint, {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "buckets": Counter(), "statuses": Counter()}
+            )
+            merged["count"] += histogram["count"]
+            merged["seconds"] += histogram["seconds"]
+            merged["max_seconds"] = max(merged["max_seconds"], histogram["max_seconds"])
+            merged["buckets"].update(histogram["buckets"])
+            merged["statuses"].update(histogram["statuses"])
+        for metric, totals in report.get("metrics", {}).items():
+            for key in ("pages", "edges", "seconds"):
+                metrics[metric][key] += totals[key]
+        shard_graphql = report.get("graphql", {})
+        graphql["queries"] += shard_graphql.get("queries", 0)
+        graphql["cost"] += shard_graphql.get("cost", 0)
+        for key in ("remaining", "min_remaining"):
+            if shard_graphql.get(key) is not None:
+                graphql[key] = shard_graphql[key] if graphql[key] is None else min(graphql[key], shard_graphql[key])
+        graphql["reset_at"] = max(filter(None, (graphql["reset_at"], shard_graphql.get("reset_at"))), default=None)
+        retries.update(report.get("retries", {}))
+        for name, stage in report.get("stages", {}).items():
+            stages[name]["count"] += stage["count"]
+            stages[name]["seconds"] += stage["seconds"]
+        top_repositories.extend(report.get("top_repositories", []))
+        slowest_pages.extend(report.get("slowest_pages", []))
+
+    for histogram in requests.values():
+        histogram["mean_seconds"] = round(histogram["seconds"] / histogram["count"], 6) if histogram["count"] else 0
+        histogram["seconds"] = round(histogram["seconds"], 6)
+        # Keep the bucket order of LATENCY_BUCKETS
+        histogram["buckets"] = {
+            _bucket_label(bound): histogram["buckets"].get(_bucket_label(bound), 0) for bound in LATENCY_BUCKETS
+        }
+        histogram["statuses"] = dict(histogram["statuses"])
+
+    return {
+        "run": run_name,
+        "started_at": min((report["started_at"] for report in reports), default=None),
+        "finished_at": max((report["finished_at"] for report in reports), default=None),
+        # Shards run side by side, the slowest one is the wall-clock duration
+        "duration_seconds": max((report["duration_seconds"] for report in reports), default=0),
+        "requests": requests,
+        "metrics": {
+            metric: {
+                "pages": totals["pages"],
+                "edges": totals["edges"],
+                "seconds": round(totals["seconds"], 6),
+                "pages_per_second": round(totals["pages"] / totals["seconds"], 3) if totals["seconds"] else None,
+                "edges_per_second": round(totals["edges"] / totals["seconds"], 3) if totals["seconds"] else None,
+            }
+            for metric, totals in sorted(metrics.items())
+        },
+        "graphql": graphql,
+        "retries": dict(retries),
+        "stages": {
+            name: {"count": stage["count"], "seconds": round(stage["seconds"], 6)}
+            for name, stage in sorted(stages.items())
+        },
+        "top_repositories": sorted(top_repositories, key=lambda entry: entry["seconds"], reverse=True)[:TOP_ENTRIES],
+        "slowest_pages": sorted(slowest_pages, key=lambda entry: entry["seconds"], reverse=True)[:TOP_ENTRIES],
+        "info": {
+            "shards": [
+                {
+                    "run": report.get("run"),
+                    "duration_seconds": report.get("duration_seconds"),
+                    **report.get("info", {}),
+                }
+                for report in reports
+            ]
+        },
+    }
+
+
+def get_run_metrics():
+    """Get the metrics shared by every fetcher and worker of this process."""
+    global _metrics
+
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = RunMetrics()
+        return _metrics
+
+
+def start_run(run_name):
+    """Start collecting a new run, replacing the shared metrics."""
+    global _metrics
+
+    with _metrics_lock:
+        _metrics = RunMetrics(run_name)
+        return _metrics
+
+
+def write_run_reports(report_file=DEFAULT_REPORT_FILE, prometheus_file=None):
+    """Write the JSON report and the optional Prometheus textfile of the current run."""
+    metrics = get_run_metrics()
+    try:
+        if report_file:
+            metrics.write_report(report_file)
+            print(f"Run report written to {report_file}")
+        if prometheus_file:
+            metrics.write_prometheus(prometheus_file)
+            print(f"Prometheus metrics written to {prometheus_file}")
+    except OSError as e:
+        print(f"Warning: Failed to write run report: {e}")
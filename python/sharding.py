@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Deterministic Repository Sharding
+
+Splits the repository list into N disjoint shards so N machines can each process one with
+--shard i/N (1-based). Two strategies are available:
+- hash: each repository goes to the shard picked by a SHA-256 of its owner/name, which does
+  not depend on list order, the machine or the Python hash seed
+- balanced: repositories are assigned longest first to the least loaded shard, using page
+  estimates from the totals of their existing repo_data files, so shards finish close together.
+  Only repositories with a data file have an estimate, so this helps --incremental batch runs
+  and fetcher.py runs; the pending repositories of a first batch run have none and are split
+  evenly by count
+
+Both are pure functions of repositories.json and repo_data, every machine checking out the same
+commit computes the same partition.
+"""
+
+import hashlib
+import math
+import os
+import statistics
+from urllib.parse import urlparse
+
+from cursor_state import METRICS
+from totals_index import get_totals_index
+
+SHARD_STRATEGIES = ("hash", "balanced")
+EDGES_PER_PAGE = 100
+
+
+def parse_shard(value):
+    """Parse "i/N" into (i, N), raising ValueError for anything else."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', i must be between 1 and N")
+    return index, count
+
+
+def shard_label(shard):
+    index, count = shard
+    return f"{index}-of-{count}"
+
+
+def shard_filename(filename, shard):
+    """Insert the shard label before the extension, run_report.json becomes run_report.1-of-4.json."""
+    base, extension = os.path.splitext(filename)
+    return f"{base}.{shard_label(shard)}{extension}"
+
+
+def repo_key(url):
+    """Return the case-insensitive owner/repo key of a repository URL."""
+    parts = urlparse(url.strip()).path.strip("/").split("/")
+    return "/".join(parts[:2]).lower()
+
+
+def hash_shard(key, count):
+    """Return the 1-based shard of a repository key."""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def estimate_pages(summary):
+    """Estimate the GraphQL pages a full walk of a repository needs from its totals."""
+    return 1 + sum(math.ceil(summary.get(f"total_{metric}", 0) / EDGES_PER_PAGE) for metric in METRICS)
+
+
+def load_page_estimates(data_dir="repo_data"):
+    """Return {owner/repo: estimated pages} for every repository with a data file."""
+    if not os.path.isdir(data_dir):
+        return {}
+    estimates = {}
+    for filename, summary in get_totals_index(data_dir).summaries().items():
+        owner, _, repo = filename[: -len(".json")].partition("_")
+        estimates[f"{owner}/{repo}".lower()] = estimate_pages(summary)
+    return estimates
+
+
+def assign_shards(urls, count, strategy="hash", estimates=None):
+    """Return {url: shard} assigning every URL to one of count 1-based shards."""
+    if strategy == "hash":
+        return {url: hash_shard(repo_key(url), count) for url in urls}
+    if strategy != "balanced":
+        raise ValueError(f"Unknown shard strategy '{strategy}'")
+
+    # Longest-processing-time partitioning, repositories without data count as a typical one
+    estimates = estimates or {}
+    known = [estimates[repo_key(url)] for url in urls if repo_key(url) in estimates]
+    default = statistics.median(known) if known else 1
+    costs = {url: estimates.get(repo_key(url), default) for url in urls}
+
+    loads = [0] * count
+    assignment = {}
+    for url in sorted(urls, key=lambda url: (-costs[url], repo_key(url))):
+        shard = min(range(count), key=lambda index: (loads[index], index))
+        loads[shard] += costs[url]
+        assignment[url] = shard + 1
+    return assignment
+
+
+def select_shard(urls, shard, strategy="hash", data_dir="repo_data"):
+    """Return the URLs of one shard in their original order."""
+    index, count = shard
+    estimates = load_page_estimates(data_dir) if strategy == "balanced" else None
+    if estimates is not None:
+        unknown = sum(1 for url in urls if repo_key(url) not in estimates)
+        if unknown:
+            print(
+                f"Warning: {unknown} of {len(urls)} repositories have no data file to estimate pages from, "
+                "they are balanced by count only"
+            )
+    assignment = assign_shards(urls, count, strategy, estimates)
+    return [url for url in urls if assignment[url] == index]
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Split-Range Pagination for Very Large Connections
+
+Cursor pagination is serial, every page needs the previous endCursor. For connections
+with 100k+ edges the critical path is shortened by:
+- Walking stargazers and forks from both ends at once (ASC and DESC ordering)
+- Splitting issues and pull requests into createdAt ranges through the search API
+Every page is folded straight into per-day counts, the only edges kept are the last
+pages of each bidirectional walk, which is where the two walks can overlap.
+"""
+
+import math
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Connection name, order field and edge selection of the bidirectional walks
+BIDIRECTIONAL_CONNECTIONS = {
+    "stars": ("stargazers", "STARRED_AT", "starredAt node { id }"),
+    "forks": ("forks", "CREATED_AT", "node { id createdAt }"),
+}
+
+# Search qualifier and node type of the range-split walks
+SEARCH_CONNECTIONS = {
+    "issues": ("issues", "is:issue", "Issue"),
+    "pull_requests": ("pullRequests", "is:pr", "PullRequest"),
+}
+
+# Pages kept per bidirectional walk to find the edges both walks returned where they met
+OVERLAP_PAGES = 3
+
+# The search API returns at most 1,000 results per query, keep ranges below it
+SEARCH_RESULT_LIMIT = 1000
+SEARCH_RANGE_TARGET = 900
+SPLIT_WORKERS = 4
+
+CONNECTION_COUNTS_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    createdAt
+    stargazers { totalCount }
+    forks { totalCount }
+    issues { totalCount }
+    pullRequests { totalCount }
+  }
+  rateLimit { cost remaining resetAt }
+}
+"""
+
+SEARCH_QUERY = """
+query($query: String!, $cursor: String) {
+  search(query: $query, type: ISSUE, first: 100, after: $cursor) {
+    issueCount
+    pageInfo { hasNextPage endCursor }
+    edges { node { ... on %s { id createdAt } } }
+  }
+  rateLimit { cost remaining resetAt }
+}
+"""
+
+
+def _connection_query(connection, order_field, direction, edge_fields):
+    return f"""
+    query($owner: String!, $name: String!, $cursor: String) {{
+      repository(owner: $owner, name: $name) {{
+        {connection}(first: 100, after: $cursor, orderBy: {{field: {order_field}, direction: {direction}}}) {{
+          pageInfo {{ hasNextPage endCursor }}
+          edges {{ {edge_fields} }}
+        }}
+      }}
+      rateLimit {{ cost remaining resetAt }}
+    }}
+    """
+
+
+def _tail_query(connection, order_field, edge_fields):
+    return f"""
+    query($owner: String!, $name: String!) {{
+      repository(owner: $owner, name: $name) {{
+        {connection}(last: 1, orderBy: {{field: {order_field}, direction: ASC}}) {{
+          pageInfo {{ endCursor }}
+          edges {{ {edge_fields} }}
+        }}
+      }}
+      rateLimit {{ cost remaining resetAt }}
+    }}
+    """
+
+
+def _edge_date(edge):
+    return edge.get("starredAt") or edge.get("node", {}).get("createdAt")
+
+
+def _day_counts(edges):
+    return Counter(date_str[:10] for date_str in map(_edge_date, edges) if date_str)
+
+
+def _format_search_date(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def fetch_connection_counts(fetcher, owner, repo):
+    """Fetch totalCount of every metric connection and the repository creation time."""
+    data = fetcher.execute_query(CONNECTION_COUNTS_QUERY, {"owner": owner, "name": repo})
+    repository = (data or {}).get("repository")
+    if not repository:
+        raise Exception(f"Failed to fetch connection counts for {owner}/{repo}: No data received")
+
+    return {
+        "created_at": repository["createdAt"],
+        "stars": repository["stargazers"]["totalCount"],
+        "forks": repository["forks"]["totalCount"],
+        "issues": repository["issues"]["totalCount"],
+        "pull_requests": repository["pullRequests"]["totalCount"],
+    }
+
+
+def record_tail_cursor(fetcher, owner, repo, metric):
+    """Record the ASC end cursor of a connection so incremental re-syncs can resume after a split walk."""
+    if metric in BIDIRECTIONAL_CONNECTIONS:
+        connection, order_field, edge_fields = BIDIRECTIONAL_CONNECTIONS[metric]
+    else:
+        connection = SEARCH_CONNECTIONS[metric][0]
+        order_field, edge_fields = "CREATED_AT", "node { createdAt }"
+
+    data = fetcher.execute_query(_tail_query(connection, order_field, edge_fields), {"owner": owner, "name": repo})
+    tail = ((data or {}).get("repository") or {}).get(connection)
+    if tail and tail["edges"]:
+        fetcher._record_walk(metric, tail["pageInfo"], _edge_date(tail["edges"][-1]))
+
+
+def fetch_bidirectional(fetcher, owner, repo, metric, total_count):
+    """Walk a connection from both ends at once until the two walks meet, returning per-day counts."""
+    connection, order_field, edge_fields = BIDIRECTIONAL_CONNECTIONS[metric]
+    walked = {"count": 0}
+    lock = threading.Lock()
+
+    def walk(direction):
+        query = _connection_query(connection, order_field, direction, edge_fields)
+        counts = Counter()
+        tail = deque(maxlen=OVERLAP_PAGES)
+        cursor = None
+        page_number = 1
+        while True:
+            started = time.perf_counter()
+            data = fetcher.execute_query(query, {"owner": owner, "name": repo, "cursor": cursor})
+            if not data or not data.get("repository"):
+                raise Exception(f"Failed to fetch {connection} for {owner}/{repo}: No data received")
+
+            page = data["repository"][connection]
+            if not page["edges"]:
+                break
+            fetcher._observe_page(metric, owner, repo, page_number, page["edges"], started)
+            page_number += 1
+            counts.update(_day_counts(page["edges"]))
+            tail.append([(edge["node"]["id"], _edge_date(edge)) for edge in page["edges"]])
+
+            with lock:
+                walked["count"] += len(page["edges"])
+                met = walked["count"] >= total_count
+            if met or not page["pageInfo"].get("hasNextPage"):
+                break
+            cursor = page["pageInfo"].get("endCursor")
+        return counts, tail
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        forward = executor.submit(walk, "ASC")
+        backward = executor.submit(walk, "DESC")
+        forward_counts, forward_tail = forward.result()
+        backward_counts, backward_tail = backward.result()
+
+    # Edges returned by both walks where they met are counted once
+    forward_ids = {node_id for page in forward_tail for node_id, _ in page}
+    overlap = Counter(
+        date_str[:10] for page in backward_tail for node_id, date_str in page if node_id in forward_ids and date_str
+    )
+    counts = forward_counts + backward_counts
+    counts.subtract(overlap)
+
+    record_tail_cursor(fetcher, owner, repo, metric)
+    return +counts
+
+
+def _search_range(fetcher, owner, repo, metric, query, first_page_only=False, cursor=None, counts=None, page=1):
+    """
+    Walk one search query, optionally resuming after cursor on top of counts already folded.
+
+    Returns (issueCount, per-day counts, endCursor to resume from, or None once the range is complete).
+    """
+    search_query = SEARCH_QUERY % SEARCH_CONNECTIONS[metric][2]
+    counts = Counter() if counts is None else counts
+    while True:
+        started = time.perf_counter()
+        data = fetcher.execute_query(search_query, {"query": query, "cursor": cursor})
+        if not data or not data.get("search"):
+            raise Exception(f"Search failed for '{query}': No data received")
+
+        result = data["search"]
+        fetcher._observe_page(metric, owner, repo, page, result["edges"], started)
+        page += 1
+        counts.update(_day_counts(edge for edge in result["edges"] if edge.get("node")))
+        cursor = result["pageInfo"].get("endCursor") if result["pageInfo"].get("hasNextPage") else None
+        if first_page_only or cursor is None:
+            return result["issueCount"], counts, cursor
+
+
+def plan_search_ranges(fetcher, owner, repo, metric, created_at):
+    """
+    Split the repository lifetime into createdAt ranges that each fit in one search result window.
+
+    Ranges are inclusive whole-second intervals that do not overlap, so no edge is returned
+    twice. Returns (ranges, counts): (query, first page counts, endCursor) of every range still
+    to be walked after its first page, and the per-day counts of ranges whose first page
+    already held every result.
+    """
+    _, qualifier, _ = SEARCH_CONNECTIONS[metric]
+    start = int(datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp())
+    end = int(datetime.now(timezone.utc).timestamp())
+
+    ranges = []
+    prefetched = Counter()
+    pending = [(start, end)]
+    with ThreadPoolExecutor(max_workers=SPLIT_WORKERS) as executor:
+        while pending:
+            queries = [
+                f"repo:{owner}/{repo} {qualifier} created:{_format_search_date(lo)}..{_format_search_date(hi)}"
+                for lo, hi in pending
+            ]
+            first_pages = list(executor.map(lambda q: _search_range(fetcher, owner, repo, metric, q, True), queries))
+
+            next_pending = []
+            for (lo, hi), query, (count, counts, cursor) in zip(pending, queries, first_pages):
+                if count == 0:
+                    continue
+                if cursor is None:
+                    prefetched.update(counts)
+                    continue
+                if count <= SEARCH_RESULT_LIMIT or hi <= lo:
+                    ranges.append((query, counts, cursor))
+                    continue
+                # The first page of a range that is split again is dropped, its narrower ranges refetch it
+                parts = min(math.ceil(count / SEARCH_RANGE_TARGET), hi - lo + 1)
+                bounds = [lo + (hi - lo + 1) * i // parts for i in range(parts + 1)]
+                next_pending.extend((bounds[i], bounds[i + 1] - 1) for i in range(parts))
+            pending = next_pending
+
+    return ranges, prefetched
+
+
+def fetch_search_split(fetcher, owner, repo, metric, created_at):
+    """Fetch issues or pull requests as parallel createdAt ranges through the search API."""
+    ranges, counts = plan_search_ranges(fetcher, owner, repo, metric, created_at)
+
+    # Each walk resumes after the first page its range planning already fetched
+    def walk(planned):
+        query, first_counts, cursor = planned
+        return _search_range(fetcher, owner, repo, metric, query, cursor=cursor, counts=first_counts, page=2)[1]
+
+    with ThreadPoolExecutor(max_workers=SPLIT_WORKERS) as executor:
+        for range_counts in executor.map(walk, ranges):
+            counts.update(range_counts)
+
+    record_tail_cursor(fetcher, owner, repo, metric)
+    return counts
+
+
+def fetch_split(fetcher, owner, repo, metric, counts):
+    """Fetch a large connection with the split strategy that fits its metric, returning per-day counts."""
+    if metric in BIDIRECTIONAL_CONNECTIONS:
+        return fetch_bidirectional(fetcher, owner, repo, metric, counts[metric])
+    return fetch_search_split(fetcher, owner, repo, metric, counts["created_at"])
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+SQLite Time-Series Store for Tracked Repositories
+
+An optional single-file backend for the data kept in repo_data/{owner}_{repo}.json:
+- series table of (repo, metric, day, count) rows, indexed for per-repository and
+  cross-repository date range queries
+- totals table with the totals and fetched_at of every repository
+- writes of a run grouped in one transaction
+Import from and export to the JSON layout are lossless.
+
+Usage:
+    python/sqlite_store.py import repo_data.sqlite [--input-dir repo_data]
+    python/sqlite_store.py export repo_data.sqlite [--output-dir repo_data]
+    python/sqlite_store.py top repo_data.sqlite --metric stars --since 2025-01-01 [--until 2025-01-07]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+from atomic_io import atomic_write_json
+from cursor_state import METRICS
+
+TOTAL_KEYS = tuple(f"total_{metric}" for metric in METRICS)
+SERIES_KEYS = {metric: f"{metric}_by_date" for metric in METRICS}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL UNIQUE,
+    total_stars INTEGER NOT NULL DEFAULT 0,
+    total_forks INTEGER NOT NULL DEFAULT 0,
+    total_issues INTEGER NOT NULL DEFAULT 0,
+    total_pull_requests INTEGER NOT NULL DEFAULT 0,
+    fetched_at TEXT,
+    extra TEXT NOT NULL DEFAULT '{}',
+    key_order TEXT NOT NULL DEFAULT '[]'
+);
+CREATE TABLE IF NOT EXISTS series (
+    repo_id INTEGER NOT NULL REFERENCES totals (id),
+    metric TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (repo_id, metric, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS series_metric_day ON series (metric, day);
+"""
+
+
+class RepoDataStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Transactions are managed explicitly, the connection is shared by worker threads under the lock
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def repo_key(owner, repo):
+        return f"{owner}/{repo}"
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one transaction, nested blocks join the outer one."""
+        with self._lock:
+            if self._depth == 0:
+                self.conn.execute("BEGIN")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute("COMMIT")
+
+    def has_repo(self, owner, repo):
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM totals WHERE repo = ?", (self.repo_key(owner, repo),)).fetchone()
+        return row is not None
+
+    def load_totals(self, owner, repo):
+        """Return totals, fetched_at and extra keys of a repository without its series, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(TOTAL_KEYS)}, fetched_at, extra FROM totals WHERE repo = ?",
+                (self.repo_key(owner, repo),),
+            ).fetchone()
+        if row is None:
+            return None
+        return self._totals_from_row(row)
+
+    def load_summaries(self):
+        """Return (owner, repo, totals) of every stored repository."""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT repo, {', '.join(TOTAL_KEYS)}, fetched_at, extra FROM totals ORDER BY repo"
+            ).fetchall()
+        summaries = []
+        for row in rows:
+            owner, repo = row[0].split("/", 1)
+            summaries.append((owner, repo, self._totals_from_row(row[1:])))
+        return summaries
+
+    def load_repo_data(self, owner, repo):
+        """Return a repository in the repo_data JSON layout, or None."""
+        key = self.repo_key(owner, repo)
+        with self._lock:
+            row = self.conn.execute("SELECT id, key_order FROM totals WHERE repo = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            repo_id, key_order = row[0], json.loads(row[1])
+            data = self.load_totals(owner, repo)
+            for metric, series_key in SERIES_KEYS.items():
+                rows = self.conn.execute(
+                    "SELECT day, count FROM series WHERE repo_id = ? AND metric = ? ORDER BY day", (repo_id, metric)
+                ).fetchall()
+                if rows or series_key in key_order:
+                    data[series_key] = dict(rows)
+
+        if not key_order:
+            return data
+        return {name: data[name] for name in key_order if name in data}
+
+    def save_repo_data(self, owner, repo, data, replace_series=True):
+        """
+        Upsert a repository from the repo_data JSON layout.
+
+        With replace_series the stored series become exactly the given ones, otherwise only
+        the given days are upserted, which is how a run adds today's differences.
+        """
+        key = self.repo_key(owner, repo)
+        extra = {
+            name: value
+            for name, value in data.items()
+            if name not in TOTAL_KEYS and name != "fetched_at" and name not in SERIES_KEYS.values()
+        }
+
+        with self.transaction():
+            previous = self.load_totals(owner, repo) or {}
+            totals = [data.get(name, previous.get(name, 0)) for name in TOTAL_KEYS]
+            fetched_at = data.get("fetched_at", previous.get("fetched_at"))
+            key_order = list(data.keys())
+            if not replace_series:
+                row = self.conn.execute("SELECT key_order FROM totals WHERE repo = ?", (key,)).fetchone()
+                stored_order = json.loads(row[0]) if row else []
+                key_order = stored_order + [name for name in key_order if name not in stored_order]
+                extra = {**previous, **extra}
+                for name in (*TOTAL_KEYS, "fetched_at"):
+                    extra.pop(name, None)
+
+            self.conn.execute(
+                f"""
+                INSERT INTO totals (repo, {', '.join(TOTAL_KEYS)}, fetched_at, extra, key_order)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (repo) DO UPDATE SET
+                    {', '.join(f'{name} = excluded.{name}' for name in TOTAL_KEYS)},
+                    fetched_at = excluded.fetched_at, extra = excluded.extra, key_order = excluded.key_order
+                """,
+                (key, *totals, fetched_at, json.dumps(extra, ensure_ascii=False), json.dumps(key_order)),
+            )
+            repo_id = self.conn.execute("SELECT id FROM totals WHERE repo = ?", (key,)).fetchone()[0]
+
+            for metric, series_key in SERIES_KEYS.items():
+                if series_key not in data:
+                    continue
+                if replace_series:
+                    self.conn.execute("DELETE FROM series WHERE repo_id = ? AND metric = ?", (repo_id, metric))
+                self.conn.executemany(
+                    "INSERT INTO series (repo_id, metric, day, count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (repo_id, metric, day) DO UPDATE SET count = excluded.count",
+                    [(repo_id, metric, day, count) for day, count in data[series_key].items()],
+                )
+
+    def top_gainers(self, metric, since, until=None, limit=10):
+        """Return (repo, gained) pairs with the largest sum of a metric over [since, until]."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT totals.repo, SUM(series.count) AS gained "
+                "FROM series JOIN totals ON totals.id = series.repo_id "
+                "WHERE series.metric = ? AND series.day >= ? AND series.day <= ? "
+                "GROUP BY series.repo_id ORDER BY gained DESC LIMIT ?",
+                (metric, since, until or "9999-12-31", limit),
+            ).fetchall()
+
+    def import_json(self, input_dir="repo_data"):
+        """Import every repo_data JSON file in one transaction, returning the number imported."""
+        imported = 0
+        with self.transaction():
+            for filename in sorted(os.listdir(input_dir)):
+                if not filename.endswith(".json") or "_" not in filename:
+                    continue
+                owner, repo = filename[: -len(".json")].split("_", 1)
+                with open(os.path.join(input_dir, filename), "r", encoding="utf-8") as f:
+                    self.save_repo_data(owner, repo, json.load(f))
+                imported += 1
+        return imported
+
+    def export_json(self, output_dir="repo_data"):
+        """Write every stored repository back to the JSON layout, returning the number exported."""
+        exported = 0
+        for owner, repo, _ in self.load_summaries():
+            atomic_write_json(os.path.join(output_dir, f"{owner}_{repo}.json"), self.load_repo_data(owner, repo))
+            exported += 1
+        return exported
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    @staticmethod
+    def _totals_from_row(row):
+        totals = dict(zip(TOTAL_KEYS, row[: len(TOTAL_KEYS)]))
+        if row[len(TOTAL_KEYS)] is not None:
+            totals["fetched_at"] = row[len(TOTAL_KEYS)]
+        totals.update(json.loads(row[len(TOTAL_KEYS) + 1]))
+        return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import, export and query the SQLite repo_data store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import repo_data JSON files into the store")
+    import_parser.add_argument("store", help="Path to the SQLite store")
+    import_parser.add_argument("--input-dir", default="repo_data", help="Directory with repo_data JSON files")
+
+    export_parser = subparsers.add_parser("export", help="Export the store to repo_data JSON files")
+    export_parser.add_argument("store", help="Path to the SQLite store")
+    export_parser.add_argument("--output-dir", default="repo_data", help="Directory for repo_data JSON files")
+
+    top_parser = subparsers.add_parser("top", help="List repositories with the largest gain over a date range")
+    top_parser.add_argument("store", help="Path to the SQLite store")
+    top_parser.add_argument("--metric", choices=METRICS, default="stars", help="Metric to rank by (default: stars)")
+    top_parser.add_argument("--since", required=True, help="First day of the range (YYYY-MM-DD)")
+    top_parser.add_argument("--until", help="Last day of the range (YYYY-MM-DD, default: today)")
+    top_parser.add_argument("--limit", type=int, default=10, help="Number of repositories to list (default: 10)")
+    args = parser.parse_args()
+
+    try:
+        store = RepoDataStore(args.store)
+        if args.command == "import":
+            print(f"Imported {store.import_json(args.input_dir)} repositories into {args.store}")
+        elif args.command == "export":
+            os.makedirs(args.output_dir, exist_ok=True)
+            print(f"Exported {store.export_json(args.output_dir)} repositories to {args.output_dir}")
+        else:
+            for repo, gained in store.top_gainers(args.metric, args.since, args.until, args.limit):
+                print(f"{repo}: {gained:+d} {args.metric}")
+        store.close()
+    except (OSError, sqlite3.Error, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
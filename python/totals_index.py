@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Repository Totals Index
+
+Keeps the totals, fetched_at, last_commit and open_issues of every repo_data file in
+repo_data/.index/totals.json, so README generation reads one small file instead of
+parsing every *_by_date history. Each entry records the mtime, size and SHA-256 of its
+data file. An entry whose mtime changed but whose content did not, as after a fresh
+checkout, is kept; entries whose content changed are rebuilt from the file on the next read.
+
+The index is machine-local and not committed, workflows carry it between runs with
+actions/cache.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+
+from atomic_io import atomic_write_json
+
+TOTALS_INDEX_DIR = ".index"
+SUMMARY_KEYS = (
+    "total_stars",
+    "total_forks",
+    "total_issues",
+    "total_pull_requests",
+    "fetched_at",
+    "last_commit",
+    "open_issues",
+)
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def totals_index_path(data_dir):
+    """Return the totals index file of a repo_data directory."""
+    return os.path.join(data_dir, TOTALS_INDEX_DIR, "totals.json")
+
+
+def content_digest(content):
+    """Return the SHA-256 of a data file's bytes, which survives checkouts that reset mtimes."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class TotalsIndex:
+    def __init__(self, data_dir="repo_data", flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.data_dir = data_dir
+        self.path = totals_index_path(data_dir)
+        self.flush_interval = flush_interval
+        self.entries = {}
+        self._dirty = False
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("repos", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def update(self, filename, data, content=None, **current):
+        """
+        Record the summary of a data file that was just written or checked.
+
+        content is the bytes the writer just wrote, hashed here instead of reading the file back.
+        Without it the file is only read when its entry does not match its mtime and size.
+        current holds values that only a live snapshot knows (last_commit, open_issues);
+        values not given are kept from the previous entry. Writes are throttled to one per
+        flush interval, entries left unflushed are rebuilt from their files when read.
+        """
+        key = os.path.basename(filename)
+        try:
+            stat = os.stat(filename)
+            with self._lock:
+                previous = self.entries.get(key, {})
+            unchanged = (previous.get("mtime_ns"), previous.get("size")) == (stat.st_mtime_ns, stat.st_size)
+            if content is not None:
+                digest = content_digest(content)
+            elif unchanged and previous.get("sha256"):
+                digest = previous["sha256"]
+            else:
+                with open(filename, "rb") as f:
+                    digest = content_digest(f.read())
+        except FileNotFoundError:
+            return
+
+        with self._lock:
+            entry = dict(self.entries.get(key, {}))
+            entry.update({name: data[name] for name in SUMMARY_KEYS if name in data})
+            entry.update({name: value for name, value in current.items() if value is not None})
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            entry["sha256"] = digest
+            self.entries[key] = entry
+            self._dirty = True
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._write()
+
+    def summaries(self):
+        """Return {filename: summary} for every repo_data JSON file, re-reading files whose entry is stale."""
+        summaries = {}
+        filenames = sorted(filename for filename in os.listdir(self.data_dir) if filename.endswith(".json"))
+        for filename in filenames:
+            path = os.path.join(self.data_dir, filename)
+            try:
+                stat = os.stat(path)
+                with self._lock:
+                    entry = self.entries.get(filename)
+                if entry is None or (entry.get("mtime_ns"), entry.get("size")) != (stat.st_mtime_ns, stat.st_size):
+                    with open(path, "rb") as f:
+                        content = f.read()
+                    digest = content_digest(content)
+                    if entry is None or entry.get("size") != stat.st_size or entry.get("sha256") != digest:
+                        data = json.loads(content)
+                        entry = {**(entry or {}), **{name: data[name] for name in SUMMARY_KEYS if name in data}}
+                    entry = {**entry, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+                    with self._lock:
+                        self.entries[filename] = entry
+                        self._dirty = True
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Failed to load data from {filename}: {e}")
+                continue
+            summaries[filename] = {name: entry[name] for name in SUMMARY_KEYS if name in entry}
+
+        # Entries of deleted files are dropped
+        with self._lock:
+            for filename in set(self.entries) - set(filenames):
+                del self.entries[filename]
+                self._dirty = True
+        self.flush()
+        return summaries
+
+    def flush(self):
+        with self._lock:
+            if self._dirty:
+                self._write()
+
+    def _write(self):
+        atomic_write_json(self.path, {"repos": self.entries})
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+
+def get_totals_index(data_dir="repo_data"):
+    """Get the shared index of a repo_data directory, flushed when the process exits."""
+    key = os.path.abspath(data_dir)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = TotalsIndex(data_dir)
+            atexit.register(_indexes[key].flush)
+        return _indexes[key]
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Aggregation, Persistence and README Hot Paths
+
+Generates synthetic repo_data trees and GraphQL edges at several scales and times
+GitHubFetcher.group_by_date, fetcher.update_repo_data_file, readme_generator.load_existing_repo_data
+and the two generate_readme_* functions. Results are written as JSON, and a previous results file
+can be passed with --compare to fail the run when a benchmark got slower than the threshold. Results go
+to the temp directory unless --output names another file, so runs leave nothing in the working tree.
+
+    python test/benchmark.py --scales 10,1k --output /tmp/baseline.json
+    python test/benchmark.py --compare /tmp/baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+import fetcher  # noqa: E402
+import readme_generator  # noqa: E402
+import totals_index  # noqa: E402
+from repo_data_initializer import GitHubFetcher  # noqa: E402
+from totals_index import TOTALS_INDEX_DIR  # noqa: E402
+
+# Repository counts of each scale and the days of history every repository gets
+SCALES = {
+    "10": {"repos": 10, "history_days": 3650},
+    "1k": {"repos": 1_000, "history_days": 1000},
+    "100k": {"repos": 100_000, "history_days": 90},
+}
+DEFAULT_SCALES = "10,1k"
+DEFAULT_EDGES = "1000,100000,500000"
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.25
+# Runs shorter than this are dominated by timer noise and are not compared
+MIN_COMPARED_SECONDS = 0.005
+HISTORY_END = date(2025, 1, 1)
+METRICS = ("stars", "forks", "issues", "pull_requests")
+DEFAULT_OUTPUT = os.path.join(tempfile.gettempdir(), "benchmark_results.json")
+
+
+def synthetic_edges(count, date_field, seed=0):
+    """Build count GraphQL edges with timestamps spread over ten years, in the shape of a page walk."""
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1)
+    span = int((datetime(2025, 1, 1) - start).total_seconds())
+    timestamps = sorted(rng.randrange(span) for _ in range(count))
+    stamps = [(start + timedelta(seconds=offset)).strftime("%Y-%m-%dT%H:%M:%SZ") for offset in timestamps]
+    if date_field == "starredAt":
+        return [{"starredAt": stamp} for stamp in stamps]
+    return [{"node": {"createdAt": stamp, "state": "CLOSED"}} for stamp in stamps]
+
+
+def synthetic_repo_data(history_days, rng):
+    """Build one repo_data document with history_days of per-day counts for every metric."""
+    days = [(HISTORY_END - timedelta(days=offset)).isoformat() for offset in range(history_days, 0, -1)]
+    data = {}
+    for metric, weight in zip(METRICS, (20, 4, 6, 5)):
+        by_date = {day: rng.randint(1, weight) for day in days if rng.random() < 0.7}
+        data[f"total_{metric}"] = sum(by_date.values())
+        data[f"{metric}_by_date"] = by_date
+    data["fetched_at"] = datetime.combine(HISTORY_END, datetime.min.time()).isoformat()
+    return data
+
+
+def write_repo_data_tree(root, repos, history_days, seed=0):
+    """Write repos synthetic repo_data/{owner}_{repo}.json files under root, returning their (owner, repo) pairs."""
+    rng = random.Random(seed)
+    data_dir = os.path.join(root, "repo_data")
+    os.makedirs(data_dir, exist_ok=True)
+    names = []
+    for index in range(repos):
+        owner, repo = f"owner{index // 100}", f"project{index}"
+        with open(os.path.join(data_dir, f"{owner}_{repo}.json"), "w", encoding="utf-8") as f:
+            json.dump(synthetic_repo_data(history_days, rng), f, ensure_ascii=False, separators=(",", ":"))
+        names.append((owner, repo))
+    return names
+
+
+def measure(function, repeat, setup=None):
+    """Run function repeat times with stdout silenced, returning the wall-clock seconds of each run."""
+    runs = []
+    for iteration in range(repeat):
+        if setup:
+            setup(iteration)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            runs.append(time.perf_counter() - start)
+    return runs
+
+
+def summarize(name, scale, runs, items, unit, **params):
+    best = min(runs)
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "params": params,
+        "runs": [round(run, 6) for run in runs],
+        "min": round(best, 6),
+        "median": round(statistics.median(runs), 6),
+        "mean": round(statistics.fmean(runs), 6),
+        "items": items,
+        "unit": unit,
+        "throughput": round(items / best, 2) if best > 0 else None,
+    }
+
+
+def reset_totals_index(data_dir):
+    """Drop the on-disk and in-process totals index so the next load starts cold."""
+    shutil.rmtree(os.path.join(data_dir, TOTALS_INDEX_DIR), ignore_errors=True)
+    totals_index._indexes.pop(os.path.abspath(data_dir), None)
+
+
+def bench_group_by_date(edge_counts, repeat):
+    results = []
+    for count in edge_counts:
+        for date_field in ("starredAt", "createdAt"):
+            edges = synthetic_edges(count, date_field)
+            runs = measure(lambda: GitHubFetcher.group_by_date(edges, date_field), repeat)
+            results.append(summarize("group_by_date", None, runs, count, "edges", edges=count, date_field=date_field))
+            print(f"  group_by_date {date_field} {count:,} edges: {min(runs) * 1000:.1f} ms")
+    return results
+
+
+def bench_repo_data(scale_name, repeat, workdir):
+    """Benchmark the file-based hot paths inside a generated repo_data tree of one scale."""
+    scale = SCALES[scale_name]
+    root = os.path.join(workdir, scale_name)
+    start = time.perf_counter()
+    names = write_repo_data_tree(root, scale["repos"], scale["history_days"])
+    print(f"  generated {len(names):,} repositories in {time.perf_counter() - start:.1f}s")
+
+    # update_repo_data_file and load_existing_repo_data resolve repo_data relative to the working directory
+    previous_dir = os.getcwd()
+    os.chdir(root)
+    try:
+        results = []
+        with open(os.path.join("repo_data", f"{names[0][0]}_{names[0][1]}.json"), "r", encoding="utf-8") as f:
+            base = json.load(f)
+
+        def update_all(iteration):
+            def run():
+                for owner, repo in names:
+                    current = {
+                        "stars": base["total_stars"] + iteration + 1,
+                        "forks": base["total_forks"] + iteration + 1,
+                        "total_issues": base["total_issues"],
+                        "total_pull_requests": base["total_pull_requests"],
+                        "open_issues": 0,
+                        "last_commit": "",
+                        "fetched_at": datetime.now().isoformat(),
+                    }
+                    fetcher.update_repo_data_file(owner, repo, current)
+
+            return run
+
+        runs = []
+        for iteration in range(repeat):
+            runs.extend(measure(update_all(iteration), 1))
+        totals_index.get_totals_index("repo_data").flush()
+        results.append(summarize("update_repo_data_file", scale_name, runs, len(names), "repos", **scale))
+        print(f"  update_repo_data_file: {min(runs):.3f}s")
+
+        runs = measure(readme_generator.load_existing_repo_data, repeat, lambda _: reset_totals_index("repo_data"))
+        results.append(summarize("load_existing_repo_data_cold", scale_name, runs, len(names), "repos", **scale))
+        print(f"  load_existing_repo_data (cold index): {min(runs):.3f}s")
+
+        # One untimed load rebuilds the index, the timed ones then only read it
+        runs = measure(readme_generator.load_existing_repo_data, repeat + 1)[1:]
+        results.append(summarize("load_existing_repo_data_warm", scale_name, runs, len(names), "repos", **scale))
+        print(f"  load_existing_repo_data (warm index): {min(runs):.3f}s")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            repo_data = readme_generator.load_existing_repo_data()
+        for name, generate in (
+            ("generate_readme_english", readme_generator.generate_readme_english),
+            ("generate_readme_korean", readme_generator.generate_readme_korean),
+        ):
+            runs = measure(lambda: generate([dict(item) for item in repo_data], "README.bench.md"), repeat)
+            results.append(summarize(name, scale_name, runs, len(repo_data), "repos", **scale))
+            print(f"  {name}: {min(runs):.3f}s")
+        return results
+    finally:
+        reset_totals_index(os.path.join(root, "repo_data"))
+        os.chdir(previous_dir)
+
+
+def git_commit():
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(results, baseline_file, threshold):
+    """Print benchmarks whose best time grew by more than threshold over the baseline, returning their count."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = {
+            (entry["benchmark"], entry["scale"], json.dumps(entry["params"], sort_keys=True)): entry
+            for entry in json.load(f)["results"]
+        }
+
+    regressions = 0
+    for entry in results:
+        previous = baseline.get((entry["benchmark"], entry["scale"], json.dumps(entry["params"], sort_keys=True)))
+        if not previous or max(previous["min"], entry["min"]) < MIN_COMPARED_SECONDS:
+            continue
+        ratio = entry["min"] / previous["min"]
+        if ratio > threshold:
+            regressions += 1
+            print(
+                f"REGRESSION {entry['benchmark']} [{entry['scale']}]: "
+                f"{previous['min']:.4f}s -> {entry['min']:.4f}s ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark aggregation, persistence and README generation")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help=f"Comma-separated scales of {', '.join(SCALES)}")
+    parser.add_argument("--edges", default=DEFAULT_EDGES, help="Comma-separated edge counts for group_by_date")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per benchmark, the best is kept")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"JSON results file, {DEFAULT_OUTPUT} by default")
+    parser.add_argument("--compare", help="Previous results file to check for regressions")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Slowdown ratio reported as a regression"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the generated data directory")
+    args = parser.parse_args()
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(unknown)}")
+    edge_counts = [int(count) for count in args.edges.split(",") if count.strip()]
+
+    results = []
+    print("Benchmarking group_by_date")
+    results.extend(bench_group_by_date(edge_counts, args.repeat))
+
+    workdir = tempfile.mkdtemp(prefix="repo-bench-")
+    try:
+        for scale in scales:
+            print(f"Benchmarking repo_data paths at {scale} repositories")
+            results.extend(bench_repo_data(scale, args.repeat, workdir))
+    finally:
+        if args.keep:
+            print(f"Generated data kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{regressions} benchmark(s) regressed by more than {args.threshold:.2f}x")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,18 +6,9 @@ from datetime import datetime, timedelta, timezone
 
 import requests
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
 
-def get_github_token():
-    """Get GitHub token from environment or file."""
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        return token
-
-    try:
-        with open("access_token.txt", "r") as f:
-            return f.read().strip()
-    except FileNotFoundError:
-        return None
+from github_client import GITHUB_API_URL, get_github_token, get_session  # noqa: E402
 
 
 def check_rate_limit():
@@ -30,7 +21,7 @@ def check_rate_limit():
     headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github.v3+json"}
 
     try:
-        response = requests.get("https://api.github.com/rate_limit", headers=headers)
+        response = get_session().get(f"{GITHUB_API_URL}/rate_limit", headers=headers)
         response.raise_for_status()
 
         data = response.json()
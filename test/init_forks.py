@@ -29,7 +29,7 @@ class GitHubForksFetcher:
         }
         if self.token:
             self.headers["Authorization"] = f"Bearer {self.token}"
-        self.graphql_url = "https://api.github.com/graphql"
+        self.graphql_url = os.environ.get("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
 
     @staticmethod
     def get_token():
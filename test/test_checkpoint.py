@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Journal Checks Against the Stand-in
+
+Runs under pytest or directly:
+
+    python test/test_checkpoint.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from checkpoint import CheckpointJournal, checkpoint_path  # noqa: E402
+from github_standin import StandinConfig, start_standin  # noqa: E402
+from repo_data_initializer import GitHubFetcher  # noqa: E402
+
+COUNTS = {"stars": 450, "forks": 120, "issues": 250, "pull_requests": 130}
+
+
+class CountingSession(requests.Session):
+    """Counts GraphQL requests and drops the connection once a limit of answered requests is reached."""
+
+    def __init__(self, limit=None):
+        super().__init__()
+        self.limit = limit
+        self.answered = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, **kwargs):
+        with self._lock:
+            if self.limit is not None and self.answered >= self.limit:
+                raise requests.ConnectionError("connection dropped")
+            self.answered += 1
+        return super().post(url, **kwargs)
+
+
+def walk(server, session, journal=None):
+    fetcher = GitHubFetcher("token", session=session)
+    fetcher.graphql_url = f"{server.url}/graphql"
+    return fetcher.fetch_metrics("octo", "demo", journal=journal)
+
+
+def test_interrupted_walks_resume_from_the_journal():
+    server = start_standin(StandinConfig(counts=COUNTS))
+    try:
+        clean = CountingSession()
+        expected, errors = walk(server, clean)
+        assert not errors, errors
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            path = checkpoint_path(output_dir)
+            interrupted = CountingSession(limit=6)
+            _, errors = walk(server, interrupted, CheckpointJournal(path))
+            assert errors, "the dropped connection should have stopped some walks"
+
+            # A restarted run only knows what the journal file holds
+            resumed = CountingSession()
+            walks, errors = walk(server, resumed, CheckpointJournal(path))
+            assert not errors, errors
+            assert walks == expected
+
+            # Every page folded before the interruption is not fetched again
+            assert interrupted.answered + resumed.answered == clean.answered, (
+                interrupted.answered,
+                resumed.answered,
+                clean.answered,
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_done_repository_and_clear():
+    with tempfile.TemporaryDirectory() as output_dir:
+        path = checkpoint_path(output_dir, "batch-1-of-2")
+        journal = CheckpointJournal(path)
+        journal.update_metric("octo/demo", "stars", {"2024-01-01": 3}, {"end_cursor": "c", "last_seen": "x"})
+        journal.mark_repo_done("octo/other")
+
+        restarted = CheckpointJournal(path)
+        assert restarted.summary() == (1, 1)
+        assert restarted.is_repo_done("octo/other")
+        assert restarted.metric_progress("octo/demo", "stars")["counts"] == {"2024-01-01": 3}
+
+        restarted.clear()
+        assert not os.path.exists(path)
+        assert CheckpointJournal(path).summary() == (0, 0)
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
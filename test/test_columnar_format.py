@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Columnar repo_data Format Checks
+
+Runs under pytest or directly:
+
+    python test/test_columnar_format.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from columnar_format import (  # noqa: E402
+    COLUMNAR_EXTENSION,
+    convert_directory,
+    decode,
+    encode,
+    load_columnar,
+    read_header,
+    read_summary,
+    save_columnar,
+)
+
+REPO_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "repo_data")
+
+DOCUMENT = {
+    "total_stars": 5,
+    "total_forks": 1,
+    "total_issues": 0,
+    "total_pull_requests": 2,
+    "fetched_at": "2025-01-02T03:04:05.123456",
+    "stars_by_date": {"2015-03-01": 2, "2024-12-31": 3},
+    "forks_by_date": {"2016-02-29": 1},
+    "issues_by_date": {},
+    "pull_requests_by_date": {"1999-12-31": 1, "1970-01-01": 1},
+}
+
+
+def test_document_round_trip():
+    assert decode(encode(DOCUMENT)) == DOCUMENT
+
+
+def test_key_order_extra_keys_and_missing_series():
+    document = {
+        "name": "demo",
+        "stars_by_date": {"2020-01-01": -3, "2020-01-02": 300000},
+        "total_stars": 299997,
+        "tags": ["a", "ü"],
+    }
+    decoded = decode(encode(document))
+    assert decoded == document
+    assert list(decoded) == list(document)
+
+
+def test_header_and_summary_skip_the_series():
+    with tempfile.TemporaryDirectory() as data_dir:
+        filename = os.path.join(data_dir, f"octo_demo{COLUMNAR_EXTENSION}")
+        save_columnar(filename, dict(DOCUMENT, last_commit="2025-01-01"))
+
+        header = read_header(filename)
+        assert header == {key: DOCUMENT[key] for key in list(DOCUMENT)[:5]}
+        assert read_summary(filename) == dict(header, last_commit="2025-01-01")
+
+
+def test_fetched_at_too_long_is_rejected():
+    try:
+        encode(dict(DOCUMENT, fetched_at="x" * 33))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a fetched_at longer than the header field was accepted")
+
+
+def test_directory_round_trip():
+    """Every committed repo_data file converts to columnar and back without change."""
+    with tempfile.TemporaryDirectory() as columnar_dir, tempfile.TemporaryDirectory() as json_dir:
+        converted, _, _ = convert_directory(REPO_DATA_DIR, columnar_dir, to_columnar=True)
+        assert converted > 0
+        assert convert_directory(columnar_dir, json_dir, to_columnar=False)[0] == converted
+
+        for filename in os.listdir(json_dir):
+            with open(os.path.join(REPO_DATA_DIR, filename), "r", encoding="utf-8") as f:
+                original = json.load(f)
+            with open(os.path.join(json_dir, filename), "r", encoding="utf-8") as f:
+                assert json.load(f) == original, filename
+            columnar_file = os.path.join(columnar_dir, filename[: -len(".json")] + COLUMNAR_EXTENSION)
+            assert load_columnar(columnar_file) == original, filename
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
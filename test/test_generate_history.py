@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Repository History Aggregator Checks
+
+Runs under pytest or directly:
+
+    python test/test_generate_history.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from atomic_io import atomic_write_json  # noqa: E402
+from generate_history_from_repo_data import build_histories, list_repo_files, update_histories  # noqa: E402
+
+REPO_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "repo_data")
+METRIC_KEYS = ("stars", "forks", "issues", "pull_requests")
+
+
+def read_repositories(output_file):
+    with open(output_file, "r", encoding="utf-8") as f:
+        return json.load(f)["repositories"]
+
+
+def running_totals(data):
+    """Reference cumulative history computed with plain Python."""
+    days = sorted({day for metric in METRIC_KEYS for day in data.get(f"{metric}_by_date") or {}})
+    entry = {"dates": days}
+    for metric in METRIC_KEYS:
+        series = data.get(f"{metric}_by_date") or {}
+        total = 0
+        entry[metric] = []
+        for day in days:
+            total += series.get(day, 0)
+            entry[metric].append(total)
+    return entry
+
+
+def full_rebuild(input_dir):
+    with tempfile.TemporaryDirectory() as scratch:
+        rebuild_dir = os.path.join(scratch, "repo_data")
+        shutil.copytree(input_dir, rebuild_dir, ignore=shutil.ignore_patterns(".*"))
+        output_file = os.path.join(scratch, "histories.json")
+        build_histories(rebuild_dir, output_file, chunk_size=3)
+        return read_repositories(output_file)
+
+
+def edit(path, change):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    change(data)
+    atomic_write_json(path, data)
+
+
+def test_full_build_matches_running_sums():
+    with tempfile.TemporaryDirectory() as workdir:
+        input_dir = os.path.join(workdir, "repo_data")
+        shutil.copytree(REPO_DATA_DIR, input_dir, ignore=shutil.ignore_patterns(".*"))
+        output_file = os.path.join(workdir, "histories.json")
+        count = build_histories(input_dir, output_file, chunk_size=7)
+        repositories = read_repositories(output_file)
+        assert count == len(repositories) == len(list_repo_files(REPO_DATA_DIR))
+
+        for filename in list_repo_files(REPO_DATA_DIR):
+            with open(os.path.join(REPO_DATA_DIR, filename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            name = filename[: -len(".json")].replace("_", "/", 1)
+            assert repositories[name] == running_totals(data), name
+
+
+def test_incremental_update_matches_full_rebuild():
+    with tempfile.TemporaryDirectory() as workdir:
+        input_dir = os.path.join(workdir, "repo_data")
+        os.makedirs(input_dir)
+        filenames = list_repo_files(REPO_DATA_DIR)[:8]
+        for filename in filenames:
+            shutil.copy2(os.path.join(REPO_DATA_DIR, filename), input_dir)
+        output_file = os.path.join(workdir, "histories.json")
+        build_histories(input_dir, output_file, chunk_size=3)
+
+        def append_day(data):
+            data["stars_by_date"]["2099-01-01"] = 7
+            data["forks_by_date"]["2099-01-02"] = 1
+
+        def edit_old_day(data):
+            day = min(data["stars_by_date"])
+            data["stars_by_date"][day] += 5
+
+        edit(os.path.join(input_dir, filenames[0]), append_day)
+        edit(os.path.join(input_dir, filenames[1]), edit_old_day)
+        os.remove(os.path.join(input_dir, filenames[2]))
+        os.utime(os.path.join(input_dir, filenames[3]))
+        shutil.copy2(os.path.join(REPO_DATA_DIR, list_repo_files(REPO_DATA_DIR)[8]), input_dir)
+
+        stats = update_histories(input_dir, output_file, chunk_size=3)
+        assert stats == {"unchanged": 5, "appended": 1, "rebuilt": 1, "added": 1, "removed": 1}, stats
+        assert read_repositories(output_file) == full_rebuild(input_dir)
+
+        # A second run without changes reads nothing and rewrites nothing
+        before = os.stat(output_file).st_mtime_ns
+        stats = update_histories(input_dir, output_file, chunk_size=3)
+        assert stats["unchanged"] == 8 and os.stat(output_file).st_mtime_ns == before, stats
+
+
+def test_foreign_output_forces_full_rebuild():
+    with tempfile.TemporaryDirectory() as workdir:
+        input_dir = os.path.join(workdir, "repo_data")
+        shutil.copytree(REPO_DATA_DIR, input_dir, ignore=shutil.ignore_patterns(".*"))
+        output_file = os.path.join(workdir, "histories.json")
+        build_histories(input_dir, output_file)
+
+        assert update_histories(input_dir, os.path.join(workdir, "other.json")) is None
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write('{"generated_at":"someone else","repositories":{\n}}\n')
+        assert update_histories(input_dir, output_file) is None
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Conditional-Request Cache Checks Against the Stand-in
+
+Runs under pytest or directly:
+
+    python test/test_http_cache.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from github_client import build_headers, create_session  # noqa: E402
+from github_standin import start_standin  # noqa: E402
+from http_cache import ConditionalCache  # noqa: E402
+
+
+def fetch_twice(first_token, second_token):
+    """Fetch one repository in two runs sharing a cache directory, return the second run's stats."""
+    server = start_standin()
+    try:
+        url = f"{server.url}/repos/octo/demo"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first_run = ConditionalCache(cache_dir)
+            body = first_run.get_json(create_session(), url, build_headers(first_token))
+
+            # A new run restores the cache directory but starts with fresh state
+            second_run = ConditionalCache(cache_dir)
+            assert second_run.get_json(create_session(), url, build_headers(second_token)) == body
+            return second_run.stats()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unchanged_resource_is_revalidated():
+    stats = fetch_twice("token-a", "token-a")
+    assert stats["not_modified"] == 1 and stats["fetched"] == 0, stats
+
+
+def test_new_token_still_revalidates():
+    """Workflows get a new GITHUB_TOKEN on every run, the restored cache must still match."""
+    stats = fetch_twice("token-a", "token-b")
+    assert stats["not_modified"] == 1 and stats["fetched"] == 0, stats
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
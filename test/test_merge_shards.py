@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Shard Merge Checks
+
+Runs under pytest or directly:
+
+    python test/test_merge_shards.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from atomic_io import atomic_write_json  # noqa: E402
+from checkpoint import CHECKPOINT_DIR  # noqa: E402
+from cursor_state import CURSOR_STATE_DIR  # noqa: E402
+from merge_shards import apply_changes, collect_changes, merge_checkpoints  # noqa: E402
+from totals_index import get_totals_index  # noqa: E402
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_merge_keeps_updated_and_cleared_journals():
+    """One shard updated its journal and the other cleared its own, the stale copies must not win."""
+    workdir = tempfile.mkdtemp(prefix="merge-test-")
+    try:
+        target = os.path.join(workdir, "repo_data")
+        write(os.path.join(target, CHECKPOINT_DIR, "batch-1-of-2.json"), '{"repos": {"old": 1}}')
+        write(os.path.join(target, CHECKPOINT_DIR, "batch-2-of-2.json"), '{"repos": {"old": 2}}')
+
+        # Both shards start from a copy of the same tree
+        shards = []
+        for index in (1, 2):
+            shard = os.path.join(workdir, f"shard-{index}")
+            shutil.copytree(target, os.path.join(shard, "repo_data"))
+            shards.append(shard)
+        shard_1_journals = os.path.join(shards[0], "repo_data", CHECKPOINT_DIR)
+        shard_2_journals = os.path.join(shards[1], "repo_data", CHECKPOINT_DIR)
+        write(os.path.join(shard_1_journals, "batch-1-of-2.json"), '{"repos": {"new": 1}}')
+        os.remove(os.path.join(shard_2_journals, "batch-2-of-2.json"))
+
+        merge_checkpoints(shards, target)
+        assert read(os.path.join(target, CHECKPOINT_DIR, "batch-1-of-2.json")) == '{"repos": {"new": 1}}'
+        assert not os.path.exists(os.path.join(target, CHECKPOINT_DIR, "batch-2-of-2.json"))
+
+        # The same with the shards given the other way round
+        write(os.path.join(target, CHECKPOINT_DIR, "batch-1-of-2.json"), '{"repos": {"old": 1}}')
+        write(os.path.join(target, CHECKPOINT_DIR, "batch-2-of-2.json"), '{"repos": {"old": 2}}')
+        merge_checkpoints(list(reversed(shards)), target)
+        assert read(os.path.join(target, CHECKPOINT_DIR, "batch-1-of-2.json")) == '{"repos": {"new": 1}}'
+        assert not os.path.exists(os.path.join(target, CHECKPOINT_DIR, "batch-2-of-2.json"))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def test_new_journal_is_carried():
+    """A shard stopped by a deadline for the first time leaves a journal the baseline does not have."""
+    workdir = tempfile.mkdtemp(prefix="merge-test-")
+    try:
+        target = os.path.join(workdir, "repo_data")
+        os.makedirs(target)
+        shard = os.path.join(workdir, "shard-1")
+        write(os.path.join(shard, "repo_data", CHECKPOINT_DIR, "batch-1-of-2.json"), '{"repos": {}}')
+
+        merge_checkpoints([shard], target)
+        assert read(os.path.join(target, CHECKPOINT_DIR, "batch-1-of-2.json")) == '{"repos": {}}'
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def test_changed_repositories_are_merged():
+    """Each shard's changed repositories and live values reach the target, unchanged copies do not."""
+    workdir = tempfile.mkdtemp(prefix="merge-test-")
+    try:
+        target = os.path.join(workdir, "repo_data")
+        for name in ("octo_a", "octo_b", "octo_c"):
+            atomic_write_json(os.path.join(target, f"{name}.json"), {"total_stars": 1, "fetched_at": "2025-01-01"})
+        get_totals_index(target).summaries()
+
+        shards = []
+        for index in (1, 2):
+            shard = os.path.join(workdir, f"shard-{index}")
+            shutil.copytree(target, os.path.join(shard, "repo_data"))
+            shards.append(shard)
+        shard_1_data = os.path.join(shards[0], "repo_data")
+        shard_2_data = os.path.join(shards[1], "repo_data")
+        atomic_write_json(os.path.join(shard_1_data, "octo_a.json"), {"total_stars": 5, "fetched_at": "2025-01-02"})
+        atomic_write_json(os.path.join(shard_1_data, CURSOR_STATE_DIR, "octo_a.json"), {"stars": {"end_cursor": "x"}})
+        get_totals_index(shard_1_data).update(os.path.join(shard_1_data, "octo_a.json"), {"total_stars": 5})
+        # A fetcher run only changes the live values kept in the totals index
+        get_totals_index(shard_2_data).update(os.path.join(shard_2_data, "octo_b.json"), {}, open_issues=7)
+        get_totals_index(shard_2_data).flush()
+        get_totals_index(shard_1_data).flush()
+
+        changes = collect_changes(shards, target)
+        assert sorted(changes) == ["octo_a", "octo_b"], changes
+        assert apply_changes(changes, target) == 0
+
+        assert read(os.path.join(target, "octo_a.json")) == read(os.path.join(shard_1_data, "octo_a.json"))
+        assert os.path.exists(os.path.join(target, CURSOR_STATE_DIR, "octo_a.json"))
+        summaries = get_totals_index(target).summaries()
+        assert summaries["octo_a.json"]["total_stars"] == 5
+        assert summaries["octo_b.json"]["open_issues"] == 7
+        assert summaries["octo_c.json"]["total_stars"] == 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
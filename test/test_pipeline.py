@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Staged Pipeline Checks
+
+Runs under pytest or directly:
+
+    python test/test_pipeline.py
+"""
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from pipeline import Done, StagedPipeline  # noqa: E402
+
+
+def run_with_timeout(pipeline, items, fetch, timeout=10):
+    """Run a pipeline on a thread and return (results, error), failing when it hangs."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["results"] = pipeline.run(items, fetch, 4)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline run hung"
+    return outcome.get("results"), outcome.get("error")
+
+
+def test_every_item_is_written():
+    written = []
+    pipeline = StagedPipeline(lambda n: n * 10, lambda n: written.append(n) or n, queue_depth=1)
+
+    results, error = run_with_timeout(pipeline, range(50), lambda n: n)
+
+    assert error is None
+    assert sorted(results) == [n * 10 for n in range(50)]
+    assert sorted(written) == sorted(results)
+
+
+def test_stage_errors_become_results():
+    def aggregate(n):
+        if n == 3:
+            raise ValueError("bad payload")
+        return n
+
+    pipeline = StagedPipeline(aggregate, lambda n: n, on_error=lambda payload, error: f"failed {payload}")
+
+    results, error = run_with_timeout(pipeline, range(5), lambda n: n)
+
+    assert error is None
+    assert sorted(results, key=str) == [0, 1, 2, 4, "failed 3"]
+
+
+def test_done_skips_remaining_stages():
+    pipeline = StagedPipeline(lambda n: n + 1, lambda n: n + 1)
+
+    results, error = run_with_timeout(pipeline, [1, 2], lambda n: Done("skipped") if n == 1 else n)
+
+    assert error is None
+    assert sorted(results, key=str) == [4, "skipped"]
+
+
+def test_failing_write_context_fails_the_run():
+    """A writer that cannot start (e.g. BEGIN fails) must not leave the producers blocked."""
+
+    @contextmanager
+    def broken_transaction():
+        raise RuntimeError("database is locked")
+        yield
+
+    pipeline = StagedPipeline(lambda n: n, lambda n: n, queue_depth=1, write_context=broken_transaction)
+
+    results, error = run_with_timeout(pipeline, range(50), lambda n: n)
+
+    assert results is None
+    assert isinstance(error, RuntimeError) and "database is locked" in str(error)
+
+
+def test_raising_error_handler_fails_the_run():
+    """An on_error that raises in the writer fails the run instead of killing the writer silently."""
+
+    def write(n):
+        raise OSError("disk full")
+
+    def on_error(payload, error):
+        raise KeyError("url")
+
+    pipeline = StagedPipeline(lambda n: n, write, queue_depth=1, on_error=on_error)
+
+    results, error = run_with_timeout(pipeline, range(50), lambda n: n)
+
+    assert results is None
+    assert isinstance(error, KeyError)
+
+
+def test_close_fails_after_put_from_callers():
+    """Callers feeding the pipeline with put() get the error from close()."""
+
+    def aggregate(n):
+        raise ValueError("broken")
+
+    def on_error(payload, error):
+        raise error
+
+    pipeline = StagedPipeline(aggregate, lambda n: n, queue_depth=1, on_error=on_error).start()
+    for n in range(20):
+        pipeline.put(n)
+
+    try:
+        pipeline.close()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("close() did not re-raise the stage error")
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Rate Limit Scheduler Checks
+
+Runs under pytest or directly:
+
+    python test/test_rate_limiter.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from rate_limiter import DEFAULT_RESERVE, RateLimitScheduler, TokenPool  # noqa: E402
+from repo_data_initializer import GitHubFetcher  # noqa: E402
+
+
+def test_exhausted_budget_holds_every_thread():
+    """A second thread arriving while the first waits for the reset must wait too."""
+    scheduler = RateLimitScheduler()
+    scheduler.remaining = DEFAULT_RESERVE
+    scheduler.reset_at = time.time() + 2
+
+    waited = {}
+
+    def acquire(name):
+        waited[name] = scheduler.acquire()
+
+    first = threading.Thread(target=acquire, args=("first",))
+    first.start()
+    time.sleep(0.2)
+    second = threading.Thread(target=acquire, args=("second",))
+    second.start()
+    first.join()
+    second.join()
+
+    assert waited["first"] >= 2.0, waited
+    assert waited["second"] >= 1.5, waited
+
+
+def test_exhausted_token_stays_drained_in_pool():
+    """A spent token keeps its known budget, so the pool routes around it while it waits."""
+    pool = TokenPool(["token-a", "token-b"])
+    spent, fresh = pool.tokens
+    spent.scheduler.remaining = DEFAULT_RESERVE
+    spent.scheduler.reset_at = time.time() + 1
+    fresh.scheduler.remaining = 4000
+    fresh.scheduler.reset_at = time.time() + 60
+
+    waiting = threading.Thread(target=spent.scheduler.acquire)
+    waiting.start()
+    time.sleep(0.2)
+    try:
+        assert spent.scheduler.available() == 0
+        assert pool.acquire() is fresh
+    finally:
+        waiting.join()
+
+
+def test_large_budget_runs_at_secondary_rate():
+    """With most of the hourly budget left requests are not spread over the whole window."""
+    scheduler = RateLimitScheduler(burst=1, points_per_minute=600)
+    scheduler.remaining = 4990
+    scheduler.reset_at = time.time() + 3600
+
+    started = time.monotonic()
+    for _ in range(11):
+        scheduler.acquire(1)
+    elapsed = time.monotonic() - started
+
+    # 10 points after the burst at 10 points per second
+    assert elapsed < 2.0, elapsed
+
+
+def test_low_budget_is_spread_to_the_reset():
+    """Near the reserve the last points are spread over the rest of the window."""
+    scheduler = RateLimitScheduler(points_per_minute=600)
+    scheduler.remaining = DEFAULT_RESERVE + 100
+    scheduler.reset_at = time.time() + 3600
+
+    assert scheduler._sustainable_rate(time.time()) < 0.1
+
+
+class RateLimitedSession:
+    """Answers requests of the first token with a GraphQL RATE_LIMITED error, like GitHub does with status 200."""
+
+    def __init__(self, limited_token):
+        self.limited_token = limited_token
+        self.tokens = []
+
+    def post(self, url, headers=None, **kwargs):
+        token = headers["Authorization"].split()[-1]
+        self.tokens.append(token)
+        response = requests.Response()
+        response.status_code = 200
+        if token == self.limited_token:
+            response.headers["X-RateLimit-Remaining"] = "0"
+            response.headers["X-RateLimit-Reset"] = str(int(time.time()) + 60)
+            body = {"data": None, "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}
+        else:
+            body = {"data": {"repository": {"name": "demo"}, "rateLimit": {"cost": 1, "remaining": 4000}}}
+        response._content = json.dumps(body).encode("utf-8")
+        return response
+
+
+def test_graphql_rate_limited_error_drains_token():
+    """A RATE_LIMITED error with status 200 backs the token off and retries on another one."""
+    pool = TokenPool(["token-a", "token-b"])
+    limited, fresh = pool.tokens
+    # The limited token looks best, so it is picked first
+    limited.scheduler.remaining = 4990
+    limited.scheduler.reset_at = time.time() + 3600
+    fresh.scheduler.remaining = 3000
+    fresh.scheduler.reset_at = time.time() + 3600
+    session = RateLimitedSession("token-a")
+    fetcher = GitHubFetcher("token-a", session=session, token_pool=pool)
+
+    data = fetcher.execute_query("query { repository { name } }", {"owner": "octo", "name": "demo"})
+
+    assert data["repository"]["name"] == "demo"
+    assert session.tokens == ["token-a", "token-b"], session.tokens
+    assert limited.rate_limited == 1
+    assert limited.scheduler.available() == 0
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
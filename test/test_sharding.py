@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Repository Sharding Checks
+
+Runs under pytest or directly:
+
+    python test/test_sharding.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from atomic_io import atomic_write_json  # noqa: E402
+from sharding import assign_shards, parse_shard, select_shard, shard_filename  # noqa: E402
+
+URLS = [f"https://github.com/org{index % 7}/proj{index}" for index in range(60)]
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for value in ("0/4", "5/4", "1/0", "a/b", "1", "1/2/3"):
+        try:
+            parse_shard(value)
+        except ValueError:
+            continue
+        raise AssertionError(f"{value} was accepted")
+
+
+def test_shard_filename():
+    assert shard_filename("run_report.json", (1, 4)) == "run_report.1-of-4.json"
+
+
+def test_hash_shards_are_disjoint_and_order_independent():
+    shards = [select_shard(URLS, (index, 3)) for index in (1, 2, 3)]
+    assert sorted(url for shard in shards for url in shard) == sorted(URLS)
+    assert all(shards), [len(shard) for shard in shards]
+
+    # Another machine may list the repositories in another order or case
+    reordered = [url.replace("org", "ORG") for url in reversed(URLS)]
+    assignment = assign_shards(reordered, 3)
+    for index, shard in enumerate(shards, 1):
+        assert all(assignment[url.replace("org", "ORG")] == index for url in shard)
+
+
+def test_balanced_shards_split_estimated_pages_evenly():
+    with tempfile.TemporaryDirectory() as data_dir:
+        # One large repository and many small ones
+        for index, url in enumerate(URLS[:20]):
+            owner, repo = url.split("/")[-2:]
+            stars = 40_000 if index == 0 else 900 + index * 100
+            atomic_write_json(os.path.join(data_dir, f"{owner}_{repo}.json"), {"total_stars": stars})
+
+        shards = [select_shard(URLS[:20], (index, 2), "balanced", data_dir) for index in (1, 2)]
+        assert sorted(url for shard in shards for url in shard) == sorted(URLS[:20])
+        # The shard holding the large repository takes only a few of the small ones
+        large_shard = next(shard for shard in shards if URLS[0] in shard)
+        assert len(large_shard) < 10, [len(shard) for shard in shards]
+
+
+def test_balanced_without_data_splits_by_count():
+    with tempfile.TemporaryDirectory() as data_dir:
+        shards = [select_shard(URLS, (index, 4), "balanced", data_dir) for index in range(1, 5)]
+        assert [len(shard) for shard in shards] == [15, 15, 15, 15]
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Split-Range Pagination Checks Against the Stand-in
+
+Runs under pytest or directly:
+
+    python test/test_split_pagination.py
+"""
+
+import os
+import sys
+import threading
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from github_standin import StandinConfig, start_standin  # noqa: E402
+from repo_data_initializer import GitHubFetcher  # noqa: E402
+from split_pagination import fetch_connection_counts, fetch_split  # noqa: E402
+
+COUNTS = {"stars": 1500, "forks": 350, "issues": 2600, "pull_requests": 300}
+
+
+class RecordingFetcher(GitHubFetcher):
+    """Records the variables of every query sent."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = []
+        self._sent_lock = threading.Lock()
+
+    def execute_query(self, query, variables=None):
+        with self._sent_lock:
+            self.sent.append(dict(variables or {}))
+        return super().execute_query(query, variables)
+
+
+def make_fetcher(server):
+    fetcher = RecordingFetcher("token")
+    fetcher.graphql_url = f"{server.url}/graphql"
+    return fetcher
+
+
+def with_standin(check):
+    server = start_standin(StandinConfig(counts=COUNTS))
+    try:
+        check(server)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_search_split_matches_serial_walk():
+    def check(server):
+        expected = make_fetcher(server).count_metric("issues", "octo", "demo")
+
+        fetcher = make_fetcher(server)
+        counts = fetch_connection_counts(fetcher, "octo", "demo")
+        assert counts["issues"] > 1000, counts
+        assert fetch_split(fetcher, "octo", "demo", "issues", counts) == expected
+
+        # Every search page is requested once, ranges resume after the page planning fetched
+        pages = Counter((sent["query"], sent["cursor"]) for sent in fetcher.sent if "query" in sent)
+        repeated = [page for page, times in pages.items() if times > 1]
+        assert not repeated, repeated
+        assert fetcher.walk_state["issues"]["end_cursor"]
+
+    with_standin(check)
+
+
+def test_bidirectional_split_matches_serial_walk():
+    def check(server):
+        expected = make_fetcher(server).count_metric("stars", "octo", "demo")
+
+        fetcher = make_fetcher(server)
+        counts = fetch_connection_counts(fetcher, "octo", "demo")
+        assert fetch_split(fetcher, "octo", "demo", "stars", counts) == expected
+        assert fetcher.walk_state["stars"]["end_cursor"]
+
+    with_standin(check)
+
+
+def test_fetch_metrics_splits_above_threshold():
+    def check(server):
+        expected, errors = make_fetcher(server).fetch_metrics("octo", "demo")
+        assert not errors, errors
+
+        fetcher = make_fetcher(server)
+        fetcher.split_threshold = 1000
+        walks, errors = fetcher.fetch_metrics("octo", "demo")
+        assert not errors, errors
+        assert walks == expected
+
+    with_standin(check)
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
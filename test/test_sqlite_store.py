@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+SQLite Store Checks
+
+Runs under pytest or directly:
+
+    python test/test_sqlite_store.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from sqlite_store import RepoDataStore  # noqa: E402
+
+REPO_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "repo_data")
+
+DOCUMENT = {
+    "total_stars": 5,
+    "total_forks": 1,
+    "total_issues": 0,
+    "total_pull_requests": 0,
+    "fetched_at": "2025-01-02T03:04:05",
+    "stars_by_date": {"2024-12-30": 2, "2024-12-31": 3},
+    "forks_by_date": {"2024-12-31": 1},
+    "issues_by_date": {},
+    "pull_requests_by_date": {},
+}
+
+
+def test_import_export_round_trip():
+    """Every committed repo_data file comes back from the store unchanged, key order included."""
+    with tempfile.TemporaryDirectory() as workdir:
+        store = RepoDataStore(os.path.join(workdir, "repo_data.sqlite"))
+        imported = store.import_json(REPO_DATA_DIR)
+        assert imported > 0
+        output_dir = os.path.join(workdir, "exported")
+        assert store.export_json(output_dir) == imported
+        store.close()
+
+        for filename in os.listdir(output_dir):
+            with open(os.path.join(REPO_DATA_DIR, filename), "r", encoding="utf-8") as f:
+                original = json.load(f)
+            with open(os.path.join(output_dir, filename), "r", encoding="utf-8") as f:
+                exported = json.load(f)
+            assert exported == original, filename
+            assert list(exported) == list(original), filename
+
+
+def test_daily_update_upserts_days():
+    with tempfile.TemporaryDirectory() as workdir:
+        store = RepoDataStore(os.path.join(workdir, "repo_data.sqlite"))
+        store.save_repo_data("octo", "demo", dict(DOCUMENT, language="Python"))
+
+        # A daily run only sends the changed totals and today's differences
+        store.save_repo_data(
+            "octo",
+            "demo",
+            {"total_stars": 9, "stars_by_date": {"2024-12-31": 4, "2025-01-01": 3}, "fetched_at": "2025-01-02"},
+            replace_series=False,
+        )
+
+        data = store.load_repo_data("octo", "demo")
+        assert data["total_stars"] == 9 and data["total_forks"] == 1
+        assert data["stars_by_date"] == {"2024-12-30": 2, "2024-12-31": 4, "2025-01-01": 3}
+        assert data["language"] == "Python"
+        assert list(data) == list(DOCUMENT) + ["language"]
+        assert store.load_totals("octo", "demo")["fetched_at"] == "2025-01-02"
+        store.close()
+
+
+def test_top_gainers():
+    with tempfile.TemporaryDirectory() as workdir:
+        store = RepoDataStore(os.path.join(workdir, "repo_data.sqlite"))
+        store.save_repo_data("octo", "demo", DOCUMENT)
+        store.save_repo_data("octo", "other", dict(DOCUMENT, stars_by_date={"2024-12-31": 10, "2023-01-01": 50}))
+
+        assert store.top_gainers("stars", "2024-12-31") == [("octo/other", 10), ("octo/demo", 3)]
+        assert store.top_gainers("stars", "2024-12-30", limit=1) == [("octo/other", 10)]
+        store.close()
+
+
+def test_failed_transaction_rolls_back():
+    with tempfile.TemporaryDirectory() as workdir:
+        store = RepoDataStore(os.path.join(workdir, "repo_data.sqlite"))
+        try:
+            with store.transaction():
+                store.save_repo_data("octo", "demo", DOCUMENT)
+                with store.transaction():
+                    store.save_repo_data("octo", "other", DOCUMENT)
+                raise RuntimeError("writer failed")
+        except RuntimeError:
+            pass
+
+        assert not store.has_repo("octo", "demo")
+        assert not store.has_repo("octo", "other")
+        assert store.load_summaries() == []
+        store.close()
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")
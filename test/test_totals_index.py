@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Totals Index Checks
+
+Runs under pytest or directly:
+
+    python test/test_totals_index.py
+"""
+
+import builtins
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+import totals_index  # noqa: E402
+from atomic_io import atomic_write_bytes, encode_json  # noqa: E402
+from totals_index import TotalsIndex, content_digest  # noqa: E402
+
+DATA = {"total_stars": 3, "total_forks": 1, "total_issues": 0, "total_pull_requests": 0, "fetched_at": "2025-01-01"}
+
+
+class CountingOpen:
+    """Counts the files the totals index module opens."""
+
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, path, *args, **kwargs):
+        self.paths.append(path)
+        return builtins.open(path, *args, **kwargs)
+
+
+def test_written_content_is_not_read_back():
+    with tempfile.TemporaryDirectory() as data_dir:
+        filename = os.path.join(data_dir, "octo_demo.json")
+        content = encode_json(DATA)
+        atomic_write_bytes(filename, content)
+        index = TotalsIndex(data_dir, flush_interval=3600)
+
+        counting_open = CountingOpen()
+        totals_index.open = counting_open
+        try:
+            index.update(filename, DATA, content, last_commit="2025-01-02")
+            # A checked but unchanged file keeps its digest without being read
+            index.update(filename, DATA, open_issues=4)
+        finally:
+            del totals_index.open
+
+        assert filename not in counting_open.paths, counting_open.paths
+        entry = index.entries["octo_demo.json"]
+        assert entry["sha256"] == content_digest(content)
+        assert entry["last_commit"] == "2025-01-02" and entry["open_issues"] == 4
+
+
+def test_changed_file_without_content_is_hashed():
+    with tempfile.TemporaryDirectory() as data_dir:
+        filename = os.path.join(data_dir, "octo_demo.json")
+        atomic_write_bytes(filename, encode_json(DATA))
+        index = TotalsIndex(data_dir, flush_interval=3600)
+        index.update(filename, DATA)
+
+        changed = dict(DATA, total_stars=4)
+        atomic_write_bytes(filename, encode_json(changed))
+        index.update(filename, changed)
+
+        assert index.entries["octo_demo.json"]["sha256"] == content_digest(encode_json(changed))
+
+
+def test_touched_file_keeps_its_entry():
+    """A checkout resets mtimes, an entry whose content still matches is not re-parsed."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        filename = os.path.join(data_dir, "octo_demo.json")
+        content = encode_json(DATA)
+        atomic_write_bytes(filename, content)
+        index = TotalsIndex(data_dir, flush_interval=3600)
+        # Only visible when the entry is kept, a re-parse would read 3 from the file
+        index.update(filename, dict(DATA, total_stars=99), content)
+        index.flush()
+
+        stat = os.stat(filename)
+        os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert TotalsIndex(data_dir).summaries()["octo_demo.json"]["total_stars"] == 99
+
+        atomic_write_bytes(filename, encode_json(dict(DATA, fetched_at="2025-01-03")))
+        assert TotalsIndex(data_dir).summaries()["octo_demo.json"]["total_stars"] == 3
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"{name}: ok")